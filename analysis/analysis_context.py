@@ -0,0 +1,332 @@
+# analysis/analysis_context.py
+"""
+公開・レポート生成用の共有分析コンテキスト
+- 日付列・入退室時刻・手術室名のパースを一度だけ実行
+- 期間スライス（直近週・直近4週・年度比較・評価期間）を一度だけ作成
+- 週次マトリクス（週 × 診療科の全身麻酔件数）を一度だけ集計
+各セクションの生成処理はこのコンテキストから計算済みの結果を受け取る
+"""
+import pandas as pd
+import numpy as np
+import logging
+from functools import cached_property
+from typing import Dict, Any, List, Optional
+
+from analysis import weekly, ranking, surgery_high_score
+
+logger = logging.getLogger(__name__)
+
+# 月別トレンド（直近12ヶ月 + 前年同月）に必要な遡及月数
+MONTHLY_TREND_MONTHS = 12
+WEEKLY_TREND_WEEKS = 8
+
+
+def _parse_clock_minutes(time_series: pd.Series) -> pd.Series:
+    """
+    入退室時刻を0時からの経過分に一括変換する（変換不可はNaN）
+    "HH:MM"、"HMM"/"HHMM"、1日を1とする小数表記に対応
+    時刻の種類は高々数千なので、ユニーク値だけをパースして各行に割り当てる
+    """
+    codes, uniques = pd.factorize(time_series)
+    if len(uniques) == 0:
+        return pd.Series(np.nan, index=time_series.index)
+    minutes = _parse_clock_values(pd.Series(uniques, dtype=object)).to_numpy()
+    parsed = np.where(codes >= 0, minutes[codes], np.nan)
+    return pd.Series(parsed, index=time_series.index)
+
+
+def _parse_clock_values(values: pd.Series) -> pd.Series:
+    text = values.astype(str).str.strip()
+
+    colon = text.str.extract(r'^(\d+):(\d+)').astype(float)
+    digits = text.str.extract(r'^(\d{1,2})(\d{2})$').astype(float)
+    hours = colon[0].fillna(digits[0])
+    minutes = colon[1].fillna(digits[1])
+
+    fraction = pd.to_numeric(text, errors='coerce')
+    fraction = fraction.where((fraction >= 0) & (fraction <= 1))
+    fraction_minutes = np.floor(fraction * 24 * 60)
+    hours = hours.fillna(fraction_minutes // 60)
+    minutes = minutes.fillna(fraction_minutes % 60)
+
+    valid = (hours < 24) & (minutes < 60)
+    return (hours * 60 + minutes).where(valid)
+
+
+class SurgeryAnalysisContext:
+    """公開用の共有分析コンテキスト（期間スライス・週次マトリクス・時刻列を一度だけ計算）"""
+
+    def __init__(self, df: pd.DataFrame, target_dict: Dict[str, float],
+                 period: str = "直近12週", analysis_base_date: Optional[pd.Timestamp] = None):
+        self.target_dict = target_dict or {}
+        self.period = period
+
+        dates = self._parse_dates(df)
+        self.latest_date = dates.max() if dates.notna().any() else None
+
+        if analysis_base_date is None or pd.isna(analysis_base_date):
+            analysis_base_date = self.latest_date
+        self.analysis_base_date = pd.Timestamp(analysis_base_date) if analysis_base_date is not None else None
+        self.analysis_end_date = (
+            weekly.get_analysis_end_date(self.analysis_base_date)
+            if self.analysis_base_date is not None else None
+        )
+
+        self.df = self._prepare_frame(df, dates)
+        self.gas_df = self.df[self.df['is_gas_20min']] if not self.df.empty else self.df
+
+        # 期間スライス
+        if self.analysis_end_date is not None and not self.df.empty:
+            end = self.analysis_end_date
+            self.recent_week_df = self._slice(end - pd.Timedelta(days=6), end)
+            self.four_weeks_df = self._slice(end - pd.Timedelta(days=27), end)
+            self.yearly_df = self._slice(self._yearly_window_start(), self.analysis_base_date)
+        else:
+            self.recent_week_df = self.four_weeks_df = self.yearly_df = self.df.iloc[0:0]
+
+        self.high_score_period = surgery_high_score._get_period_dates(self.df, period)
+        start, end = self.high_score_period
+        self.high_score_df = self._slice(start, end) if start is not None else self.df.iloc[0:0]
+
+        logger.info(f"分析コンテキスト作成: 対象{len(self.df)}件 / 元データ{len(df)}件")
+
+    # === 前処理 ===
+
+    @staticmethod
+    def _parse_dates(df: pd.DataFrame) -> pd.Series:
+        """手術実施日をdatetime型で取得（呼び出し元のDataFrameは変更しない）"""
+        if df.empty or '手術実施日_dt' not in df.columns:
+            return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        dates = df['手術実施日_dt']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        return dates
+
+    def _window_start(self) -> Optional[pd.Timestamp]:
+        """全セクションが参照する最古の日付"""
+        candidates = []
+        if self.analysis_end_date is not None:
+            candidates.append(self._yearly_window_start())
+            candidates.append(self.analysis_end_date - pd.Timedelta(weeks=WEEKLY_TREND_WEEKS - 1, days=6))
+        if self.latest_date is not None:
+            last_full_month = self.latest_date.replace(day=1) - pd.Timedelta(days=1)
+            first_month = last_full_month - pd.DateOffset(months=MONTHLY_TREND_MONTHS - 1, years=1)
+            candidates.append(first_month.replace(day=1).normalize())
+            candidates.append(self.latest_date - pd.Timedelta(weeks=12) + pd.Timedelta(days=1))
+        return min(candidates) if candidates else None
+
+    def _yearly_window_start(self) -> pd.Timestamp:
+        """年度比較（昨年度同期・前年同期4週）に必要な開始日"""
+        base = self.analysis_base_date
+        fiscal_year = base.year if base.month >= 4 else base.year - 1
+        prev_fiscal_start = pd.Timestamp(year=fiscal_year - 1, month=4, day=1)
+        prev_four_weeks_start = self.analysis_end_date - pd.Timedelta(days=27) - pd.DateOffset(years=1)
+        return min(prev_fiscal_start, prev_four_weeks_start)
+
+    def _prepare_frame(self, df: pd.DataFrame, dates: pd.Series) -> pd.DataFrame:
+        """参照期間の行だけを一度コピーし、派生列を追加する"""
+        if self.latest_date is None:
+            return df.iloc[0:0].copy()
+
+        window_start = self._window_start()
+        mask = dates.notna()
+        if window_start is not None:
+            mask &= dates >= window_start
+        frame = df.loc[mask].copy()
+        frame['手術実施日_dt'] = dates[mask]
+
+        if 'is_gas_20min' not in frame.columns:
+            frame['is_gas_20min'] = False
+        if 'is_weekday' not in frame.columns:
+            frame['is_weekday'] = frame['手術実施日_dt'].dt.weekday < 5
+        if 'week_start' not in frame.columns:
+            frame['week_start'] = (
+                frame['手術実施日_dt'] - pd.to_timedelta(frame['手術実施日_dt'].dt.dayofweek, unit='d')
+            ).dt.normalize()
+
+        self._add_time_columns(frame)
+        return frame
+
+    @staticmethod
+    def _add_time_columns(frame: pd.DataFrame) -> None:
+        """手術室名の正規化と入退室時刻のパースを一括で行う"""
+        columns = [str(c) for c in frame.columns]
+        room_col = next((c for c in columns if '手術室' in c), None)
+        start_col = next((c for c in columns if '入室' in c and '時刻' in c), None)
+        end_col = next((c for c in columns if '退室' in c and '時刻' in c), None)
+
+        if room_col and 'normalized_room' not in frame.columns:
+            rooms = frame[room_col].unique()
+            normalized = ranking._normalize_room_name(pd.Series(rooms))
+            frame['normalized_room'] = frame[room_col].map(dict(zip(rooms, normalized)))
+
+        if not (start_col and end_col):
+            return
+
+        surgery_day = frame['手術実施日_dt'].dt.normalize()
+        start_dt = surgery_day + pd.to_timedelta(_parse_clock_minutes(frame[start_col]), unit='m')
+        end_dt = surgery_day + pd.to_timedelta(_parse_clock_minutes(frame[end_col]), unit='m')
+        frame['start_datetime'] = start_dt
+        frame['end_datetime'] = end_dt
+
+        if '手術時間_時間' not in frame.columns:
+            end_adjusted = end_dt.where(end_dt >= start_dt, end_dt + pd.Timedelta(days=1))
+            duration = (end_adjusted - start_dt).dt.total_seconds() / 3600
+            frame['手術時間_時間'] = duration.where((duration >= 0.25) & (duration <= 24), 2.0)
+
+    def _slice(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        dates = self.df['手術実施日_dt']
+        return self.df[(dates >= start) & (dates <= end)]
+
+    # === 共有集計 ===
+
+    @cached_property
+    def weekly_matrix(self) -> pd.DataFrame:
+        """週 × 診療科の全身麻酔手術件数（月曜始まり）"""
+        if self.gas_df.empty:
+            return pd.DataFrame()
+        return (
+            self.gas_df.groupby(['week_start', '実施診療科'], dropna=False)
+            .size()
+            .unstack(fill_value=0)
+            .sort_index()
+        )
+
+    @cached_property
+    def weekly_df(self) -> pd.DataFrame:
+        """ハイスコア評価期間の週次データ"""
+        if self.high_score_df.empty:
+            return pd.DataFrame()
+        return surgery_high_score._prepare_weekly_data(self.high_score_df)
+
+    # === セクション別の計算結果 ===
+
+    @cached_property
+    def kpi_summary(self) -> Dict[str, Any]:
+        """基本KPI（直近4週）"""
+        try:
+            if self.analysis_end_date is None:
+                return {}
+            return ranking.get_kpi_summary(self.four_weeks_df, self.analysis_base_date)
+        except Exception as e:
+            logger.error(f"基本KPI取得エラー: {e}")
+            return {}
+
+    @cached_property
+    def yearly_comparison(self) -> Dict[str, Any]:
+        """年度比較"""
+        try:
+            if self.analysis_end_date is None:
+                return {}
+            return ranking.calculate_yearly_surgery_comparison(self.yearly_df, self.analysis_base_date)
+        except Exception as e:
+            logger.error(f"年度比較データ取得エラー: {e}")
+            return {}
+
+    @cached_property
+    def high_scores(self) -> List[Dict[str, Any]]:
+        """診療科別ハイスコア"""
+        try:
+            if self.weekly_df.empty:
+                return []
+            start_date, end_date = self.high_score_period
+            return surgery_high_score.calculate_surgery_high_scores_from_weekly(
+                self.weekly_df, self.target_dict, start_date, end_date
+            )
+        except Exception as e:
+            logger.error(f"ハイスコアデータ取得エラー: {e}")
+            return []
+
+    @cached_property
+    def department_performance(self) -> pd.DataFrame:
+        """診療科別パフォーマンス（直近4週）"""
+        try:
+            if self.analysis_end_date is None:
+                return pd.DataFrame()
+            return ranking.get_department_performance_summary(
+                self.four_weeks_df, self.target_dict, self.analysis_base_date
+            )
+        except Exception as e:
+            logger.error(f"診療科別パフォーマンスデータ取得エラー: {e}")
+            return pd.DataFrame()
+
+    @cached_property
+    def recent_week_kpi(self) -> Dict[str, Any]:
+        """直近週のKPI"""
+        try:
+            if self.recent_week_df.empty:
+                return {}
+
+            gas_df = self.recent_week_df[self.recent_week_df['is_gas_20min']]
+            gas_weekday_df = gas_df[gas_df['is_weekday']]
+
+            one_week_ago = self.analysis_end_date - pd.Timedelta(days=6)
+            num_weekdays = len(pd.bdate_range(start=one_week_ago, end=self.analysis_end_date))
+            daily_avg = len(gas_weekday_df) / num_weekdays if num_weekdays > 0 else 0.0
+
+            return {
+                "全身麻酔手術件数 (直近週)": len(gas_df),
+                "全手術件数 (直近週)": len(self.recent_week_df),
+                "平日1日あたり全身麻酔手術件数 (直近週)": f"{daily_avg:.1f}",
+            }
+        except Exception as e:
+            logger.error(f"直近週KPI取得エラー: {e}")
+            return {}
+
+    @cached_property
+    def monthly_trend(self) -> List[Dict[str, Any]]:
+        """月別トレンド（月末までデータが揃っている直近12ヶ月分 + 前年同月）"""
+        try:
+            if self.gas_df.empty:
+                return []
+
+            monthly_counts = self.gas_df['手術実施日_dt'].dt.to_period('M').value_counts()
+            end_of_last_full_month = self.latest_date.replace(day=1) - pd.Timedelta(days=1)
+
+            result = []
+            for i in range(MONTHLY_TREND_MONTHS):
+                target_month_date = end_of_last_full_month - pd.DateOffset(months=i)
+                current_year, current_month = target_month_date.year, target_month_date.month
+
+                current_count = int(monthly_counts.get(pd.Period(year=current_year, month=current_month, freq='M'), 0))
+                last_year_count = int(monthly_counts.get(pd.Period(year=current_year - 1, month=current_month, freq='M'), 0))
+
+                result.append({
+                    'month': f"{current_year}-{current_month:02d}",
+                    'month_name': f"{current_year % 100}年{current_month}月",
+                    'count': current_count,
+                    'last_year_count': last_year_count if last_year_count > 0 else None,
+                    'is_partial': False  # 全て完了した月なので常にFalse
+                })
+
+            # 月の昇順に並び替え
+            result.reverse()
+            return result
+        except Exception as e:
+            logger.error(f"月別トレンドデータ取得エラー: {e}")
+            return []
+
+    @cached_property
+    def weekly_trend(self) -> List[Dict[str, Any]]:
+        """週別トレンド（過去8週間、週次マトリクスから集計）"""
+        try:
+            if self.analysis_end_date is None or self.weekly_matrix.empty:
+                return []
+
+            weekly_totals = self.weekly_matrix.sum(axis=1)
+            result = []
+            for i in range(WEEKLY_TREND_WEEKS):
+                week_start = (self.analysis_end_date - pd.Timedelta(weeks=WEEKLY_TREND_WEEKS - 1 - i, days=6)).normalize()
+                week_end = week_start + pd.Timedelta(days=6)
+                result.append({
+                    'week': f"{week_start.year}-W{week_start.isocalendar()[1]:02d}",
+                    'week_name': f"{week_start.month}/{week_start.day}-{week_end.month}/{week_end.day}",
+                    'week_start': week_start,
+                    'week_end': week_end,
+                    'count': int(weekly_totals.get(week_start, 0)),
+                    'is_current_week': week_end == self.analysis_end_date.normalize()
+                })
+            return result
+        except Exception as e:
+            logger.error(f"週別トレンドデータ取得エラー: {e}")
+            return []
@@ -0,0 +1,88 @@
+# analysis/department_kpis.py
+"""
+全診療科のKPI一括計算
+- 実施診療科ごとの件数（全手術・全身麻酔20分以上・平日）を1回の groupby で集計し、
+  全身麻酔比率・週次実績・目標達成率・トレンド変化（直近4週 vs 前4週）を全診療科まとめて計算する
+- 診療科ごとの行位置も同じ groupby から保持し、診療科の切り替えは辞書の参照だけで済ませる
+- データセットバージョン × 目標値 × 期間ごとにキャッシュする
+"""
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+
+logger = logging.getLogger(__name__)
+
+KPI_COLUMNS = ['全手術件数', '全身麻酔件数', '全身麻酔比率(%)', '平日件数', '週次実績',
+               '週次目標', '達成率(%)', 'トレンド変化(%)']
+
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def get_department_kpis(df: pd.DataFrame, target_dict: Dict[str, float],
+                        start_date: Optional[pd.Timestamp] = None,
+                        end_date: Optional[pd.Timestamp] = None,
+                        analysis_base_date: Optional[pd.Timestamp] = None) -> Dict[str, Any]:
+    """
+    全診療科のKPI表と診療科ごとの参照用辞書
+
+    Args:
+        start_date, end_date: 週次実績の分母とする期間（省略時は週次実績・達成率を計算しない）
+        analysis_base_date: トレンド変化の完全週判定に使う基準日
+
+    Returns:
+        'table'（診療科 × KPI_COLUMNS の表）、'by_dept'（診療科 → KPIの辞書）、
+        'positions'（診療科 → df 内の行位置）
+    """
+    empty = {'table': pd.DataFrame(columns=KPI_COLUMNS), 'by_dept': {}, 'positions': {}}
+    if df.empty or '実施診療科' not in df.columns:
+        return empty
+
+    total_rows = len(df)
+    is_gas = df['is_gas_20min'].to_numpy(dtype=bool) if 'is_gas_20min' in df.columns else np.ones(total_rows, dtype=bool)
+    is_weekday = df['is_weekday'].to_numpy(dtype=bool) if 'is_weekday' in df.columns else np.ones(total_rows, dtype=bool)
+
+    flags = pd.DataFrame({'全身麻酔件数': is_gas, '平日件数': is_weekday}, index=df.index)
+    grouped = flags.groupby(df['実施診療科'].to_numpy(), sort=True)
+    table = grouped.sum().astype(np.int64)
+    table.insert(0, '全手術件数', grouped.size().astype(np.int64))
+    table.index.name = '実施診療科'
+    if table.empty:
+        return empty
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table.insert(2, '全身麻酔比率(%)', np.where(table['全手術件数'] > 0,
+                                                 table['全身麻酔件数'] / table['全手術件数'] * 100, 0.0))
+
+        weeks_in_period = (end_date - start_date).days / 7 if start_date is not None and end_date is not None else 0
+        if weeks_in_period > 0:
+            table['週次実績'] = table['全身麻酔件数'] / weeks_in_period
+        else:
+            table['週次実績'] = np.nan
+
+        targets = pd.Series(target_dict or {}, dtype=float).reindex(table.index)
+        table['週次目標'] = targets.where(targets > 0)
+        table['達成率(%)'] = table['週次実績'] / table['週次目標'] * 100
+
+    from analysis.trend_stats import get_trend_statistics
+    trend = get_trend_statistics(df, analysis_base_date, metric='週合計件数')
+    table['トレンド変化(%)'] = trend['前4週比(%)'].reindex(table.index) if not trend.empty else np.nan
+
+    table = table[KPI_COLUMNS]
+    logger.info(f"診療科KPI一括計算: {len(table)}科")
+    return {
+        'table': table,
+        'by_dept': table.to_dict('index'),
+        'positions': grouped.indices,
+    }
+
+
+def get_department_frame(df: pd.DataFrame, kpis: Dict[str, Any], dept_name: str) -> pd.DataFrame:
+    """get_department_kpis の行位置から診療科のデータを切り出す（全行との比較を行わない）"""
+    positions = kpis['positions'].get(dept_name)
+    if positions is None:
+        return df.iloc[0:0]
+    return df.iloc[positions]
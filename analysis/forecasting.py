@@ -1,12 +1,11 @@
 # analysis/forecasting.py
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.metrics import mean_squared_error, mean_absolute_error, mean_absolute_percentage_error
 import calendar
 from utils import date_helpers
 
+# statsmodels / scikit-learn は読み込みが重いため、予測・検証を実行する関数の中でのみ読み込む
+
 def _get_monthly_timeseries(df, department=None):
     """予測用の月次時系列データを生成する内部関数"""
     target_df = df[df['is_gas_20min']].copy()
@@ -27,8 +26,7 @@ def _get_monthly_timeseries(df, department=None):
         def get_weekdays(month_start):
             year, month = month_start.year, month_start.month
             _, last_day = calendar.monthrange(year, month)
-            all_days = pd.date_range(start=month_start, end=pd.Timestamp(year, month, last_day))
-            return sum(date_helpers.is_weekday(day) for day in all_days)
+            return date_helpers.count_weekdays(month_start, pd.Timestamp(year, month, last_day))
 
         monthly_summary['平日日数'] = monthly_summary['month_start'].apply(get_weekdays)
         monthly_summary['平日1日平均件数'] = np.where(
@@ -51,6 +49,9 @@ def predict_future(df, latest_date, department=None, model_type='hwes', predicti
 
     :return: (予測結果DataFrame, Plotly Figure, 予測指標辞書)
     """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from statsmodels.tsa.arima.model import ARIMA
+
     ts_data = _get_monthly_timeseries(df, department)
     if len(ts_data) < 12:
         return pd.DataFrame(), None, {"message": "予測には最低12ヶ月分のデータが必要です。"}
@@ -101,6 +102,10 @@ def validate_model(df, department=None, model_types=None, validation_period=6):
     """
     予測モデルの精度を検証（バックテスト）する。
     """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from statsmodels.tsa.arima.model import ARIMA
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, mean_absolute_percentage_error
+
     ts_data = _get_monthly_timeseries(df, department)
     if len(ts_data) < 12 + validation_period:
         return pd.DataFrame(), None, f"検証には最低{12 + validation_period}ヶ月分のデータが必要です。"
@@ -141,6 +146,9 @@ def validate_model(df, department=None, model_types=None, validation_period=6):
 
 def optimize_hwes_params(df, department=None, validation_period=6):
     """Holt-Wintersモデルの最適なパラメータを探索する"""
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from sklearn.metrics import mean_squared_error
+
     ts_data = _get_monthly_timeseries(df, department)
     if len(ts_data) < 12 + validation_period:
         return {}, "パラメータ最適化には最低{12 + validation_period}ヶ月分のデータが必要です。"
@@ -32,8 +32,7 @@ def get_monthly_summary(df, department=None):
     def get_weekdays(month_start):
         year, month = month_start.year, month_start.month
         _, last_day = calendar.monthrange(year, month)
-        all_days = pd.date_range(start=month_start, end=pd.Timestamp(year, month, last_day))
-        return sum(date_helpers.is_weekday(day) for day in all_days)
+        return date_helpers.count_weekdays(month_start, pd.Timestamp(year, month, last_day))
 
     summary['平日日数'] = summary['month_start'].apply(get_weekdays)
     summary['平日1日平均件数'] = np.where(summary['平日日数'] > 0, summary['平日件数'] / summary['平日日数'], 0).round(1)
@@ -69,7 +68,7 @@ def get_quarterly_summary(df, department=None):
     def get_weekdays_in_quarter(quarter_start):
         start_date = quarter_start
         end_date = quarter_start + pd.DateOffset(months=3) - pd.DateOffset(days=1)
-        return sum(date_helpers.is_weekday(day) for day in pd.date_range(start_date, end_date))
+        return date_helpers.count_weekdays(start_date, end_date)
 
     summary['平日日数'] = summary['quarter_start'].apply(get_weekdays_in_quarter)
     summary['平日1日平均件数'] = np.where(summary['平日日数'] > 0, summary['平日件数'] / summary['平日日数'], 0).round(1)
@@ -78,27 +78,29 @@ def calculate_operating_room_utilization(df, period_df):
         if not all([room_col, start_col, end_col]):
             return 0.0
         target_rooms = [f'OR{i}' for i in range(1, 13) if i != 11]
-        weekday_df['normalized_room'] = _normalize_room_name(weekday_df[room_col])
+        # 共有分析コンテキストで正規化・パース済みの列があれば再計算しない
+        if 'normalized_room' not in weekday_df.columns:
+            weekday_df['normalized_room'] = _normalize_room_name(weekday_df[room_col])
         filtered_df = weekday_df[weekday_df['normalized_room'].isin(target_rooms)].copy()
         if filtered_df.empty:
             return 0.0
-        filtered_df['start_datetime'] = _convert_to_datetime(filtered_df[start_col], filtered_df['手術実施日_dt'])
-        filtered_df['end_datetime'] = _convert_to_datetime(filtered_df[end_col], filtered_df['手術実施日_dt'])
+        if 'start_datetime' not in filtered_df.columns or 'end_datetime' not in filtered_df.columns:
+            filtered_df['start_datetime'] = _convert_to_datetime(filtered_df[start_col], filtered_df['手術実施日_dt'])
+            filtered_df['end_datetime'] = _convert_to_datetime(filtered_df[end_col], filtered_df['手術実施日_dt'])
         valid_time_df = filtered_df.dropna(subset=['start_datetime', 'end_datetime']).copy()
         if valid_time_df.empty:
             return 0.0
         overnight_mask = valid_time_df['end_datetime'] < valid_time_df['start_datetime']
         if overnight_mask.any():
             valid_time_df.loc[overnight_mask, 'end_datetime'] += timedelta(days=1)
-        operation_start_time, operation_end_time = time(9, 0), time(17, 15)
-        total_usage_minutes = 0
-        for _, row in valid_time_df.iterrows():
-            op_start = datetime.combine(row['手術実施日_dt'].date(), operation_start_time)
-            op_end = datetime.combine(row['手術実施日_dt'].date(), operation_end_time)
-            actual_start = max(row['start_datetime'], op_start)
-            actual_end = min(row['end_datetime'], op_end)
-            if actual_end > actual_start:
-                total_usage_minutes += (actual_end - actual_start).total_seconds() / 60
+        # 稼働時間帯（9:00〜17:15）にクリップした使用時間を一括計算
+        surgery_day = valid_time_df['手術実施日_dt'].dt.normalize()
+        op_start = surgery_day + pd.Timedelta(hours=9)
+        op_end = surgery_day + pd.Timedelta(hours=17, minutes=15)
+        actual_start = valid_time_df['start_datetime'].where(valid_time_df['start_datetime'] > op_start, op_start)
+        actual_end = valid_time_df['end_datetime'].where(valid_time_df['end_datetime'] < op_end, op_end)
+        usage_minutes = (actual_end - actual_start).dt.total_seconds() / 60
+        total_usage_minutes = usage_minutes[usage_minutes > 0].sum()
         total_weekdays = len(pd.bdate_range(start=period_df['手術実施日_dt'].min(), end=period_df['手術実施日_dt'].max()))
         total_available_minutes = total_weekdays * 11 * 495
         if total_available_minutes > 0:
@@ -0,0 +1,54 @@
+# analysis/ranking_snapshot.py
+"""
+診療科ランキングのスナップショット
+- 週報ランキング・ハイスコア評価を「データセットバージョン × 目標値 × 評価方式 × 評価期間」ごとに一度だけ計算する
+- サイドバーの評価統計とダッシュボードの評価タブはこのスナップショットを表示するだけにし、
+  他のページでのウィジェット操作（再実行）ではスコア計算を行わない
+"""
+import logging
+from typing import Any, Dict
+
+import pandas as pd
+import streamlit as st
+
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def get_ranking_snapshot(df: pd.DataFrame, target_dict: Dict[str, float],
+                         mode: str, period: str) -> Dict[str, Any]:
+    """
+    評価方式・評価期間ごとのランキングとサマリー
+
+    Args:
+        mode: 'weekly_ranking'（週報ランキング）または 'high_score'（ハイスコア評価）
+
+    Returns:
+        dept_scores（スコア順の診療科リスト）、summary、サイドバー用の集計値
+    """
+    if mode == 'weekly_ranking':
+        from analysis.weekly_surgery_ranking import (
+            calculate_weekly_surgery_ranking, generate_weekly_ranking_summary
+        )
+        dept_scores = calculate_weekly_surgery_ranking(df, target_dict, period)
+        summary = generate_weekly_ranking_summary(dept_scores) if dept_scores else {}
+    else:
+        from analysis.surgery_high_score import (
+            calculate_surgery_high_scores, generate_surgery_high_score_summary
+        )
+        dept_scores = calculate_surgery_high_scores(df, target_dict, period)
+        summary = generate_surgery_high_score_summary(dept_scores) if dept_scores else {}
+
+    dept_scores = dept_scores or []
+    stats = {
+        'total_depts': int(df['実施診療科'].dropna().nunique()) if '実施診療科' in df.columns else 0,
+        'target_depts': len(target_dict),
+        'avg_score': sum(d['total_score'] for d in dept_scores) / len(dept_scores) if dept_scores else None,
+        'high_achievers': sum(1 for d in dept_scores if d.get('achievement_rate', 0) >= 100),
+        's_grades': sum(1 for d in dept_scores if str(d.get('grade', '')).startswith('S')),
+        'top_dept': dept_scores[0] if dept_scores else None,
+    }
+    logger.info(f"ランキングスナップショット作成: {mode} / {period} ({len(dept_scores)}科)")
+    return {'mode': mode, 'period': period, 'dept_scores': dept_scores, 'summary': summary, 'stats': stats}
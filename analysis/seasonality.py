@@ -0,0 +1,116 @@
+# analysis/seasonality.py
+"""
+季節性・周期性のプロファイル
+- 手術日を整数の日番号に変換して日別件数を np.bincount で一度に集計し、
+  曜日・年間週番号・月の各プロファイルを整数コードのまま集計する（行ごとの曜日名文字列は作らない）
+- プロファイルごとに日数・合計件数・1日平均・標準偏差・95%信頼区間を返す
+- データセットバージョンをキーにキャッシュする
+"""
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+from utils import date_helpers
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_LABELS = [date_helpers.get_weekday_name_ja(code) for code in range(7)]
+Z_95 = 1.96
+
+
+def _profile(codes: np.ndarray, daily_counts: np.ndarray, labels) -> pd.DataFrame:
+    """コードごとの日数・合計・平均・標準偏差・95%信頼区間"""
+    size = len(labels)
+    days = np.bincount(codes, minlength=size)[:size]
+    total = np.bincount(codes, weights=daily_counts, minlength=size)[:size]
+    total_sq = np.bincount(codes, weights=daily_counts ** 2, minlength=size)[:size]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / days
+        variance = (total_sq - days * mean ** 2) / (days - 1)
+        std = np.sqrt(np.clip(variance, 0, None))
+        margin = Z_95 * std / np.sqrt(days)
+
+    profile = pd.DataFrame({
+        '日数': days,
+        '合計件数': total.astype(np.int64),
+        '1日平均': mean,
+        '標準偏差': np.where(days > 1, std, np.nan),
+        'CI下限': np.where(days > 1, mean - margin, np.nan),
+        'CI上限': np.where(days > 1, mean + margin, np.nan),
+    }, index=pd.Index(labels, name='区分'))
+    return profile[profile['日数'] > 0]
+
+
+@st.cache_data(ttl=3600, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def get_seasonality_profiles(df: pd.DataFrame, weekday_only: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    曜日・年間週番号・月のプロファイルと月別件数
+
+    Args:
+        weekday_only: 平日（is_weekday）のみを対象にする（土日・祝日・休診日は日数にも含めない）
+
+    Returns:
+        'weekday' / 'week_of_year' / 'month'（各プロファイル）、'monthly_totals'（年月ごとの全件数）
+    """
+    empty = {'weekday': pd.DataFrame(), 'week_of_year': pd.DataFrame(),
+             'month': pd.DataFrame(), 'monthly_totals': pd.DataFrame()}
+    if df.empty or '手術実施日_dt' not in df.columns:
+        return empty
+
+    dates = df['手術実施日_dt'].to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(dates)
+    if weekday_only and 'is_weekday' in df.columns:
+        weekday_rows = df['is_weekday'].to_numpy(dtype=bool)
+    else:
+        weekday_rows = np.ones(len(df), dtype=bool)
+    dates = dates[valid]
+    weekday_rows = weekday_rows[valid]
+    if len(dates) == 0:
+        return empty
+
+    # 日番号（期間の初日 = 0）で日別件数を集計
+    day_numbers = dates.astype(np.int64)
+    first_day = day_numbers.min()
+    offsets = day_numbers - first_day
+    span = int(offsets.max()) + 1
+    daily_counts = np.bincount(offsets[weekday_rows], minlength=span).astype(float)
+
+    calendar = np.arange(first_day, first_day + span).astype('datetime64[D]')
+    weekday_codes = ((calendar.astype(np.int64) + 3) % 7).astype(np.int64)  # 1970-01-01 は木曜
+    if weekday_only:
+        # 平日判定は暦日ごとに一度だけ（件数0の平日も日数に含める）
+        keep = date_helpers.weekday_mask(calendar)
+    else:
+        keep = np.ones(span, dtype=bool)
+
+    calendar_index = pd.DatetimeIndex(calendar[keep])
+    counts = daily_counts[keep]
+    if len(counts) == 0:
+        return empty
+
+    iso_weeks = calendar_index.isocalendar().week.to_numpy(dtype=np.int64)
+    months = calendar_index.month.to_numpy(dtype=np.int64)
+
+    # 月別件数は平日に限らず全件（年月の番号 = 年×12 + 月 - 1）
+    row_months = dates.astype('datetime64[M]').astype(np.int64)
+    first_month = row_months.min()
+    monthly = np.bincount(row_months - first_month)
+    month_labels = pd.period_range(str(np.datetime64(int(first_month), 'M')), periods=len(monthly), freq='M')
+    monthly_totals = pd.DataFrame({
+        '年月': month_labels.astype(str)[monthly > 0],
+        '件数': monthly[monthly > 0].astype(np.int64),
+    })
+
+    profiles = {
+        'weekday': _profile(weekday_codes[keep], counts, WEEKDAY_LABELS),
+        'week_of_year': _profile(iso_weeks - 1, counts, [f"第{week}週" for week in range(1, 54)]),
+        'month': _profile(months - 1, counts, [f"{month}月" for month in range(1, 13)]),
+        'monthly_totals': monthly_totals,
+    }
+    logger.info(f"季節性プロファイル計算: {len(counts)}日 / {int(counts.sum())}件")
+    return profiles
@@ -2,10 +2,12 @@
 import pandas as pd
 import streamlit as st
 
-@st.cache_data(ttl=3600)
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+
+@st.cache_data(ttl=3600, hash_funcs=DATAFRAME_HASH_FUNCS)
 def get_expanded_surgeon_df(df):
     """
-    術者列を改行で分割し、行を展開する。この処理は重いためキャッシュする。
+    術者列を改行で分割し、行を展開する。この処理は重いため、データセットバージョンをキーにキャッシュする。
     """
     if '実施術者' not in df.columns or df['実施術者'].isnull().all():
         return pd.DataFrame()
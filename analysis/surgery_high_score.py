@@ -60,13 +60,34 @@ def calculate_surgery_high_scores(df: pd.DataFrame, target_dict: Dict[str, float
             logger.warning("週次データの準備に失敗しました")
             return []
         
+        return calculate_surgery_high_scores_from_weekly(weekly_df, target_dict, start_date, end_date)
+        
+    except Exception as e:
+        logger.error(f"ハイスコア計算エラー: {e}", exc_info=True)
+        return []
+
+
+def calculate_surgery_high_scores_from_weekly(weekly_df: pd.DataFrame, target_dict: Dict[str, float],
+                                              start_date: pd.Timestamp, end_date: pd.Timestamp) -> List[Dict[str, Any]]:
+    """
+    準備済みの週次データから診療科別ハイスコアを計算
+    
+    Args:
+        weekly_df: _prepare_weekly_data 済みの評価期間データ
+        target_dict: 診療科別目標値辞書 {診療科名: 週次目標件数}
+        start_date: 評価期間の開始日
+        end_date: 評価期間の終了日
+    
+    Returns:
+        診療科スコアリスト（スコア順ソート済み）
+    """
+    try:
         dept_scores = []
-        departments = weekly_df['実施診療科'].dropna().unique()
+        dept_groups = weekly_df.groupby('実施診療科', sort=False)
         
-        logger.info(f"対象診療科: {len(departments)}科")
+        logger.info(f"対象診療科: {dept_groups.ngroups}科")
         
-        for dept in departments:
-            dept_data = weekly_df[weekly_df['実施診療科'] == dept]
+        for dept, dept_data in dept_groups:
             if len(dept_data) < 3:
                 logger.debug(f"診療科 {dept}: データ不足 ({len(dept_data)}件)")
                 continue
@@ -0,0 +1,195 @@
+# analysis/trend_stats.py
+"""
+週次トレンド統計
+- 全身麻酔20分以上の手術を「週 × 系列（各診療科 + 病院全体）」の集計行列に一度で変換し、
+  週合計件数・平日件数・実データ平日数・平日1日平均件数・4週移動平均を全系列まとめて計算する
+- 直近/前4週比較、前週差、変動係数、次週予測などのトレンド指標を行列の列方向に一括計算し、
+  系列ごとに1行の表として返す（ページ側は表示するだけ）
+- データセットバージョン × 分析基準日ごとにキャッシュし、診療科を切り替えても再計算しない
+"""
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analysis.weekly import get_analysis_end_date
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+
+logger = logging.getLogger(__name__)
+
+HOSPITAL_TOTAL = '病院全体'
+MOVING_AVERAGE_WEEKS = 4
+SUMMARY_COLUMNS = ['週', '週合計件数', '平日件数', '実データ平日数', '平日1日平均件数']
+
+
+def _weekly_counts(week_codes: np.ndarray, series_codes: np.ndarray, n_weeks: int, n_series: int,
+                   weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """(週, 系列) ごとの件数行列"""
+    flat = np.bincount(week_codes * n_series + series_codes, weights=weights, minlength=n_weeks * n_series)
+    return flat.reshape(n_weeks, n_series)
+
+
+def _distinct_days(week_codes: np.ndarray, series_codes: np.ndarray, day_numbers: np.ndarray,
+                   n_weeks: int, n_series: int) -> np.ndarray:
+    """(週, 系列) ごとの手術実施日のユニーク日数"""
+    if len(day_numbers) == 0:
+        return np.zeros((n_weeks, n_series), dtype=np.int64)
+    triples = np.unique(np.stack([week_codes, series_codes, day_numbers]), axis=1)
+    return _weekly_counts(triples[0], triples[1], n_weeks, n_series)
+
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def get_weekly_matrices(df: pd.DataFrame, analysis_base_date: Optional[pd.Timestamp] = None,
+                        use_complete_weeks: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    週 × 系列の集計行列（weekly.get_summary と同じ定義の値を全診療科・病院全体まとめて計算）
+
+    Args:
+        analysis_base_date: 完全週の判定に使う基準日（省略時はデータの最新日）
+        use_complete_weeks: 基準日以前に完了した週のみを対象にする
+
+    Returns:
+        '週合計件数' / '平日件数' / '実データ平日数' / '平日1日平均件数' / '4週移動平均' の行列
+        （行: 週（月曜日）、列: 診療科 + 病院全体。データのない週は0件）
+    """
+    if df.empty or not {'is_gas_20min', 'week_start', '手術実施日_dt'}.issubset(df.columns):
+        return {}
+
+    target_df = df[df['is_gas_20min']]
+    if use_complete_weeks:
+        base_date = analysis_base_date if analysis_base_date is not None else df['手術実施日_dt'].max()
+        analysis_end_date = get_analysis_end_date(pd.Timestamp(base_date))
+        if analysis_end_date is not None:
+            target_df = target_df[target_df['手術実施日_dt'] <= analysis_end_date]
+    if target_df.empty:
+        return {}
+
+    week_codes, weeks = pd.factorize(target_df['week_start'], sort=True)
+    dept_codes, depts = pd.factorize(target_df['実施診療科'], sort=True)
+    # 診療科が欠損の行は病院全体にだけ数える
+    has_dept = dept_codes >= 0
+    n_weeks, n_depts = len(weeks), len(depts)
+
+    is_weekday = target_df['is_weekday'].to_numpy(dtype=bool)
+    day_numbers = target_df['手術実施日_dt'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    # 病院全体は最後の列（系列コード = 診療科数）
+    week_all = np.concatenate([week_codes[has_dept], week_codes])
+    series_all = np.concatenate([dept_codes[has_dept], np.full(len(week_codes), n_depts)])
+    weekday_all = np.concatenate([is_weekday[has_dept], is_weekday])
+    days_all = np.concatenate([day_numbers[has_dept], day_numbers])
+    n_series = n_depts + 1
+
+    totals = _weekly_counts(week_all, series_all, n_weeks, n_series)
+    weekday_counts = _weekly_counts(week_all[weekday_all], series_all[weekday_all], n_weeks, n_series)
+    weekday_days = _distinct_days(week_all[weekday_all], series_all[weekday_all], days_all[weekday_all],
+                                  n_weeks, n_series)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_avg = np.where(weekday_days > 0, weekday_counts / weekday_days, 0).round(1)
+
+    index = pd.DatetimeIndex(weeks, name='週')
+    columns = pd.Index(list(depts) + [HOSPITAL_TOTAL], name='系列')
+    matrices = {
+        '週合計件数': pd.DataFrame(totals.astype(np.int64), index=index, columns=columns),
+        '平日件数': pd.DataFrame(weekday_counts.astype(np.int64), index=index, columns=columns),
+        '実データ平日数': pd.DataFrame(weekday_days.astype(np.int64), index=index, columns=columns),
+        '平日1日平均件数': pd.DataFrame(daily_avg, index=index, columns=columns),
+    }
+    matrices['4週移動平均'] = matrices['平日1日平均件数'].rolling(MOVING_AVERAGE_WEEKS).mean()
+    logger.info(f"週次集計行列作成: {n_weeks}週 × {n_series}系列")
+    return matrices
+
+
+def get_weekly_summary(df: pd.DataFrame, analysis_base_date: Optional[pd.Timestamp] = None,
+                       department: Optional[str] = None, use_complete_weeks: bool = True) -> pd.DataFrame:
+    """
+    1系列の週次サマリー（weekly.get_summary と同じ列 + 4週移動平均。集計行列のキャッシュから切り出す）
+
+    診療科を指定した場合も、期間内で手術のなかった週は0件の週として含める
+    """
+    matrices = get_weekly_matrices(df, analysis_base_date, use_complete_weeks)
+    series = department or HOSPITAL_TOTAL
+    if not matrices or series not in matrices['週合計件数'].columns:
+        return pd.DataFrame()
+
+    summary = pd.DataFrame({name: matrices[name][series] for name in SUMMARY_COLUMNS[1:] + ['4週移動平均']})
+    return summary.reset_index()
+
+
+def trend_statistics(matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    週 × 系列の行列から、系列ごとのトレンド指標を列方向に一括計算
+
+    Returns:
+        系列ごとに1行: 週数・平均・標準偏差・最大・最小・最大幅・変動係数・直近週・前週差・
+        直近2週/4週/6週平均・前4週平均・前4週比(%)・前半4週/6週平均・次週予測・予測下限/上限・予測信頼性
+    """
+    values = matrix.to_numpy(dtype=float)
+    n_weeks = len(values)
+    if n_weeks == 0:
+        return pd.DataFrame(index=matrix.columns)
+
+    def window_mean(start: int, stop: Optional[int] = None) -> np.ndarray:
+        window = values[start:stop]
+        return window.mean(axis=0) if len(window) else np.full(values.shape[1], np.nan)
+
+    mean = values.mean(axis=0)
+    std = values.std(axis=0, ddof=1) if n_weeks > 1 else np.full(values.shape[1], np.nan)
+    recent_2 = window_mean(-2)
+    recent_4 = window_mean(-4)
+    previous_4 = window_mean(-8, -4) if n_weeks >= 8 else np.full(values.shape[1], np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(mean > 0, std / mean, np.nan)
+        change_pct = np.where(previous_4 > 0, (recent_4 / previous_4 - 1) * 100, 0.0)
+        # 直近2週/4週の比でトレンドを補正（6週以上ある場合のみ）
+        trend_factor = np.where((n_weeks >= 6) & (recent_4 > 0), recent_2 / recent_4, 1.0)
+    change_pct = np.where(np.isnan(previous_4), np.nan, change_pct)
+    prediction = recent_4 * trend_factor
+    margin = std * 0.5
+
+    reliability = np.select(
+        [(n_weeks >= 8) & (cv < 0.2), (n_weeks >= 6) & (cv < 0.3)],
+        ['高', '中'], default='低'
+    )
+
+    stats = pd.DataFrame({
+        '週数': n_weeks,
+        '平均': mean,
+        '標準偏差': std,
+        '最大': values.max(axis=0),
+        '最小': values.min(axis=0),
+        '最大幅': values.max(axis=0) - values.min(axis=0),
+        '変動係数': cv,
+        '直近週': values[-1],
+        '前週差': values[-1] - values[-2] if n_weeks >= 2 else np.nan,
+        '直近2週平均': recent_2,
+        '直近4週平均': recent_4,
+        '直近6週平均': window_mean(-6),
+        '前4週平均': previous_4,
+        '前4週比(%)': change_pct,
+        '前半4週平均': window_mean(0, 4),
+        '前半6週平均': window_mean(0, 6),
+        '次週予測': prediction,
+        '予測下限': prediction - margin,
+        '予測上限': prediction + margin,
+        '予測信頼性': reliability,
+    }, index=matrix.columns)
+    return stats
+
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def get_trend_statistics(df: pd.DataFrame, analysis_base_date: Optional[pd.Timestamp] = None,
+                         metric: str = '平日1日平均件数', use_complete_weeks: bool = True) -> pd.DataFrame:
+    """
+    全診療科・病院全体のトレンド指標（系列ごとに1行）
+
+    Args:
+        metric: 指標の対象とする値（'平日1日平均件数' または '週合計件数' など get_weekly_matrices のキー）
+    """
+    matrices = get_weekly_matrices(df, analysis_base_date, use_complete_weeks)
+    if not matrices or metric not in matrices:
+        return pd.DataFrame()
+    return trend_statistics(matrices[metric])
@@ -85,9 +85,10 @@ def get_weekly_trend_data(df: pd.DataFrame, analysis_base_date: pd.Timestamp, we
         if df.empty:
             return []
 
-        # 日付列をdatetime型に変換
-        df['手術実施日_dt'] = pd.to_datetime(df['手術実施日_dt'], errors='coerce')
-        df.dropna(subset=['手術実施日_dt'], inplace=True)
+        # 日付列をdatetime型に変換（呼び出し元のDataFrameは変更しない）
+        if not pd.api.types.is_datetime64_any_dtype(df['手術実施日_dt']):
+            df = df.assign(手術実施日_dt=pd.to_datetime(df['手術実施日_dt'], errors='coerce'))
+        df = df.dropna(subset=['手術実施日_dt'])
         
         # 分析終了日を取得
         analysis_end_date = get_analysis_end_date(analysis_base_date)
@@ -6,7 +6,7 @@
 import streamlit as st
 import logging
 from ui.session_manager import SessionManager
-from ui.page_router import PageRouter
+from ui.page_router import get_router
 from ui.sidebar import SidebarManager  # SidebarManagerをインポート
 
 # 基本設定
@@ -34,8 +34,7 @@ def main():
         SidebarManager.render()
         
         # メインコンテンツ表示
-        router = PageRouter()
-        router.render_current_page()
+        get_router().render_current_page()
         
     except Exception as e:
         logger.error(f"アプリケーション実行エラー: {e}", exc_info=True)
@@ -0,0 +1,306 @@
+# backup_store.py - 差分バックアップ（内容アドレス方式）
+"""
+保存データのバックアップを、パーティション単位の内容ハッシュで重複排除して保存する
+- DataFrameを手術実施月ごと（日付列がない場合は一定行数ごと）のパーティションに分割
+- 各パーティションは行内容の順に並べ替え、インデックスを含めない内容ハッシュをファイル名として objects/ に一度だけ保存
+  （他の月の行の追加・修正でインデックスや同日内の行順が変わっても、内容が同じ月は同じオブジェクトになる）
+- 元の行順とインデックスはスナップショットごとの小さなオブジェクトとして別に保存
+- スナップショットはパーティションのハッシュ一覧（マニフェスト）だけを snapshots/ に保存
+- 変更のないパーティションは過去のスナップショットと共有されるため、
+  バックアップの容量・時間は変更されたパーティションの分だけになる
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 2: パーティションは内容順・インデックスなしで保存し、行順とインデックスを別オブジェクトで復元
+MANIFEST_FORMAT = 2
+SNAPSHOT_PREFIX = "snapshot_"
+DEFAULT_MAX_SNAPSHOTS = 10
+# 日付列がない場合のパーティション行数
+PARTITION_ROWS = 50000
+PARTITION_DATE_COLUMNS = ['手術実施日_dt', '日付', 'date']
+# パーティション内の並べ替えに優先して使う行の識別子
+PARTITION_SORT_KEY = 'unique_op_id'
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """一時ファイルに書いてから置き換える（書き込み途中のファイルを残さない）"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def content_order(part: pd.DataFrame) -> np.ndarray:
+    """行順に依存しない並べ替え順（unique_op_id があればそれを優先し、行内容のハッシュ順）"""
+    keys = []
+    try:
+        keys.append(pd.util.hash_pandas_object(part, index=False).to_numpy())
+    except TypeError:
+        pass
+    if PARTITION_SORT_KEY in part.columns:
+        keys.append(part[PARTITION_SORT_KEY].astype(str).to_numpy())
+    if not keys:
+        return np.arange(len(part))
+    return np.lexsort(keys)
+
+
+def partition_hash(part: pd.DataFrame) -> str:
+    """パーティションの内容ハッシュ（列名・型・値から計算。インデックスは含めない）"""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in part.dtypes.items()]).encode('utf-8'))
+    try:
+        digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    except TypeError:
+        # ハッシュ化できない値（リスト等）を含む列はシリアライズ結果で代用
+        digest.update(pickle.dumps(part, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class BackupStore:
+    """内容アドレス方式のバックアップストア"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+    # ----- オブジェクト -----
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.pkl")
+
+    def _put_object(self, digest: str, obj: Any) -> int:
+        """オブジェクトを保存（既にあれば何もしない）。新たに書き込んだバイト数を返す"""
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(path, data)
+        return len(data)
+
+    def _get_object(self, digest: str) -> Any:
+        with open(self._object_path(digest), 'rb') as f:
+            return pickle.load(f)
+
+    # ----- パーティション分割 -----
+
+    @staticmethod
+    def _partition(df: pd.DataFrame) -> Tuple[str, List[Tuple[str, np.ndarray]]]:
+        """
+        行位置のパーティションに分割
+
+        Returns:
+            (分割方法, [(パーティションキー, 行位置配列), ...])
+        """
+        date_col = next((col for col in PARTITION_DATE_COLUMNS if col in df.columns), None)
+        if date_col is not None and pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            dates = df[date_col]
+            months = (dates.dt.year * 100 + dates.dt.month).fillna(-1).to_numpy(dtype=np.int64)
+            keys, codes = np.unique(months, return_inverse=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+            groups = [
+                (f"{key // 100:04d}-{key % 100:02d}" if key >= 0 else "none", order[bounds[i]:bounds[i + 1]])
+                for i, key in enumerate(keys)
+            ]
+            return "month", groups or [("none", order)]
+
+        positions = np.arange(len(df))
+        chunks = [positions[i:i + PARTITION_ROWS] for i in range(0, len(df), PARTITION_ROWS)] or [positions]
+        return "rows", [(str(i), chunk) for i, chunk in enumerate(chunks)]
+
+    # ----- スナップショット -----
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+
+    def _new_snapshot_id(self, created_at: datetime) -> str:
+        base = f"{SNAPSHOT_PREFIX}{created_at.strftime('%Y%m%d_%H%M%S')}"
+        snapshot_id, suffix = base, 1
+        while os.path.exists(self._manifest_path(snapshot_id)):
+            snapshot_id = f"{base}_{suffix}"
+            suffix += 1
+        return snapshot_id
+
+    def create_snapshot(self, saved_data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+                        max_snapshots: int = DEFAULT_MAX_SNAPSHOTS) -> Optional[str]:
+        """
+        保存データ（main_data.pkl と同じ形式の辞書）のスナップショットを作成
+
+        Returns:
+            スナップショットID（失敗時はNone）
+        """
+        try:
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            df = saved_data.get('df')
+            created_at = datetime.now()
+            added_bytes = 0
+
+            partitions = []
+            order_digest = None
+            index_digest = None
+            partition_by = None
+            if isinstance(df, pd.DataFrame):
+                partition_by, groups = self._partition(df)
+                stored_positions = []
+                for key, positions in groups:
+                    part = df.iloc[positions]
+                    # 内容順に並べ替えてインデックスを外す（行順・インデックスの変化でハッシュが変わらない）
+                    sort_order = content_order(part)
+                    part = part.iloc[sort_order].reset_index(drop=True)
+                    stored_positions.append(positions[sort_order])
+                    digest = partition_hash(part)
+                    added_bytes += self._put_object(digest, part)
+                    partitions.append({'key': key, 'hash': digest, 'rows': int(len(positions))})
+
+                # 保存順と元の行順が異なる場合は元の行順を別オブジェクトとして保存
+                concatenated = np.concatenate(stored_positions) if stored_positions else np.arange(0)
+                if not np.array_equal(concatenated, np.arange(len(df))):
+                    inverse = np.empty_like(concatenated)
+                    inverse[concatenated] = np.arange(len(concatenated))
+                    order_digest = hashlib.sha256(inverse.astype(np.int64).tobytes()).hexdigest()
+                    added_bytes += self._put_object(order_digest, inverse)
+
+                # 既定の連番以外のインデックスは別オブジェクトとして保存
+                if not df.index.equals(pd.RangeIndex(len(df))):
+                    index_data = pickle.dumps(df.index, protocol=pickle.HIGHEST_PROTOCOL)
+                    index_digest = hashlib.sha256(index_data).hexdigest()
+                    added_bytes += self._put_object(index_digest, df.index)
+
+            extras = {k: v for k, v in saved_data.items() if k != 'df'}
+            extras_data = pickle.dumps(extras, protocol=pickle.HIGHEST_PROTOCOL)
+            extras_digest = hashlib.sha256(extras_data).hexdigest()
+            added_bytes += self._put_object(extras_digest, extras)
+
+            snapshot_id = self._new_snapshot_id(created_at)
+            manifest = {
+                'format': MANIFEST_FORMAT,
+                'snapshot_id': snapshot_id,
+                'created_at': created_at.isoformat(),
+                'rows': int(len(df)) if isinstance(df, pd.DataFrame) else 0,
+                'partition_by': partition_by,
+                'partitions': partitions,
+                'order': order_digest,
+                'index': index_digest,
+                'extras': extras_digest,
+                'added_bytes': added_bytes,
+                'metadata': metadata,
+            }
+            _atomic_write(
+                self._manifest_path(snapshot_id),
+                json.dumps(manifest, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+            )
+
+            logger.info(f"スナップショット作成: {snapshot_id}（パーティション{len(partitions)}件 / 追加 {added_bytes / 1024:.1f} KB）")
+            self.prune(max_snapshots)
+            return snapshot_id
+        except Exception as e:
+            logger.error(f"スナップショット作成エラー: {e}")
+            return None
+
+    def read_manifest(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path(snapshot_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"マニフェスト読み込みエラー {snapshot_id}: {e}")
+            return None
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """スナップショットのマニフェスト一覧（新しい順）"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        manifests = []
+        for name in os.listdir(self.snapshots_dir):
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(".json"):
+                manifest = self.read_manifest(name[:-len(".json")])
+                if manifest is not None:
+                    manifests.append(manifest)
+        manifests.sort(key=lambda m: m.get('created_at', ''), reverse=True)
+        return manifests
+
+    def load_snapshot(self, snapshot_id: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        スナップショットから保存データを組み立てる
+
+        Returns:
+            (保存データ辞書, メタデータ)
+        """
+        manifest = self.read_manifest(snapshot_id)
+        if manifest is None:
+            raise FileNotFoundError(f"スナップショットが見つかりません: {snapshot_id}")
+
+        saved_data = dict(self._get_object(manifest['extras']))
+        if manifest.get('partition_by') is not None:
+            parts = [self._get_object(part['hash']) for part in manifest['partitions']]
+            legacy = manifest.get('format', 1) < 2
+            # 形式1のパーティションは元のインデックスを保持している
+            df = pd.concat(parts, ignore_index=not legacy) if len(parts) > 1 else parts[0]
+            if manifest.get('order'):
+                df = df.iloc[self._get_object(manifest['order'])]
+            if not legacy:
+                df.index = self._get_object(manifest['index']) if manifest.get('index') else pd.RangeIndex(len(df))
+            saved_data['df'] = df
+        return saved_data, manifest.get('metadata')
+
+    def snapshot_size(self, manifest: Dict[str, Any]) -> int:
+        """スナップショットが参照するオブジェクトの合計サイズ（共有分を含む）"""
+        digests = [part['hash'] for part in manifest.get('partitions', [])]
+        digests += [d for d in (manifest.get('order'), manifest.get('index'), manifest.get('extras')) if d]
+        total = 0
+        for digest in digests:
+            try:
+                total += os.path.getsize(self._object_path(digest))
+            except OSError:
+                continue
+        return total
+
+    def prune(self, max_snapshots: int = DEFAULT_MAX_SNAPSHOTS) -> int:
+        """古いスナップショットを削除し、どこからも参照されないオブジェクトを削除"""
+        removed = 0
+        for manifest in self.list_snapshots()[max_snapshots:]:
+            try:
+                os.remove(self._manifest_path(manifest['snapshot_id']))
+                removed += 1
+            except Exception as e:
+                logger.warning(f"古いスナップショット削除エラー: {e}")
+        if removed:
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self) -> int:
+        """どのスナップショットからも参照されないオブジェクトを削除"""
+        referenced = set()
+        for manifest in self.list_snapshots():
+            referenced.update(part['hash'] for part in manifest.get('partitions', []))
+            referenced.update(d for d in (manifest.get('order'), manifest.get('index'), manifest.get('extras')) if d)
+
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                if filename.endswith(".pkl") and filename[:-len(".pkl")] not in referenced:
+                    try:
+                        os.remove(os.path.join(dirpath, filename))
+                        removed += 1
+                    except Exception as e:
+                        logger.warning(f"未参照オブジェクト削除エラー: {e}")
+        if removed:
+            logger.info(f"未参照のバックアップオブジェクトを削除: {removed}件")
+        return removed
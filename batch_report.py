@@ -0,0 +1,195 @@
+# batch_report.py - 週次レポートのバッチ実行（ブラウザなし・cron向け）
+"""
+保存済みデータを読み込み、ランキング・メトリクスCSV・PDF・HTMLの各ステージを画面操作なしで実行する
+
+    python batch_report.py --output-dir reports
+    python batch_report.py --stages metrics,pdf --base-date 2025-03-31
+    GITHUB_TOKEN=... python batch_report.py --stages html --publish --repo owner/name
+
+- 読み込み後の各ステージは独立しているため並列に実行し、ステージごとの所要時間を表示する
+- Streamlit は読み込まない（画面用の関数はそれぞれの関数内でのみ streamlit を読み込む）
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("ranking", "metrics", "pdf", "html")
+DEFAULT_OUTPUT_DIR = "reports"
+
+
+def _write_json(path: str, data: Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+
+
+def run_ranking(df, target_dict, args) -> str:
+    """週報ランキング（診療科別スコア）をJSONで出力"""
+    from analysis.weekly_surgery_ranking import calculate_weekly_surgery_ranking, generate_weekly_ranking_summary
+
+    dept_scores = calculate_weekly_surgery_ranking(df, target_dict, args.period)
+    path = os.path.join(args.output_dir, f"{args.base_date:%Y%m%d}_週報ランキング.json")
+    _write_json(path, {
+        "period": args.period,
+        "analysis_base_date": args.base_date,
+        "summary": generate_weekly_ranking_summary(dept_scores),
+        "departments": dept_scores,
+    })
+    return path
+
+
+def run_metrics(df, target_dict, args) -> str:
+    """メトリクスCSVを出力"""
+    from reporting.surgery_metrics_exporter import SurgeryMetricsExporter
+
+    exporter = SurgeryMetricsExporter()
+    metrics_df, filename = exporter.export_metrics_csv(df, target_dict, args.base_date, args.period_type)
+    path = os.path.join(args.output_dir, filename)
+    metrics_df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def run_pdf(df, target_dict, args) -> str:
+    """診療科別PDFを一括生成してZIPで出力"""
+    from reporting.pdf_exporter import generate_department_reports_zip
+
+    zip_buffer, count = generate_department_reports_zip(
+        df, target_dict, args.base_date, args.period_type, bundle=args.bundle_pdf
+    )
+    if zip_buffer is None:
+        raise ValueError("PDFを生成できる診療科データがありません")
+    path = os.path.join(args.output_dir, f"{args.base_date:%Y%m%d}_診療科別レポート_{args.period_type}.zip")
+    with open(path, "wb") as f:
+        f.write(zip_buffer.getvalue())
+    return f"{path}（{count}件）"
+
+
+def run_html(df, target_dict, args) -> str:
+    """複数ページのダッシュボードを生成してローカルに保存（--publish 時はGitHubにも公開）"""
+    from reporting.surgery_github_publisher import SurgeryGitHubPublisher
+
+    repo_owner, _, repo_name = (args.repo or "/").partition("/")
+    publisher = SurgeryGitHubPublisher(os.environ.get("GITHUB_TOKEN", ""), repo_owner, repo_name, args.branch)
+    files = publisher.generate_multipage_site(
+        df, target_dict, args.period, args.base_date, args.ga_id, precompress=args.precompress
+    )
+    if not files:
+        raise ValueError("サイトの生成に失敗しました")
+
+    folder = os.path.join(args.output_dir, "site")
+    success, message = publisher.save_site_locally(files, folder)
+    if not success:
+        raise OSError(message)
+    if args.publish:
+        success, message = publisher.publish_multipage_site(files)
+        if not success:
+            raise RuntimeError(message)
+    return message
+
+
+STAGE_FUNCTIONS: Dict[str, Callable] = {
+    "ranking": run_ranking,
+    "metrics": run_metrics,
+    "pdf": run_pdf,
+    "html": run_html,
+}
+
+
+def _run_stage(name: str, df, target_dict, args) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        output = STAGE_FUNCTIONS[name](df, target_dict, args)
+        result = {"stage": name, "ok": True, "output": output}
+    except Exception as e:
+        logger.error(f"ステージ {name} でエラー: {e}", exc_info=True)
+        result = {"stage": name, "ok": False, "output": str(e)}
+    result["seconds"] = time.perf_counter() - started
+    logger.info(f"ステージ完了: {name} ({result['seconds']:.2f}秒)")
+    return result
+
+
+def run_pipeline(args) -> List[Dict[str, Any]]:
+    """データを読み込み、指定ステージを並列に実行する"""
+    from data_persistence import load_data_from_file
+
+    started = time.perf_counter()
+    df, target_data, _ = load_data_from_file(mode=args.load_mode)
+    load_result = {"stage": "load", "ok": df is not None and not df.empty,
+                   "output": f"{len(df):,}件" if df is not None else "保存データがありません",
+                   "seconds": time.perf_counter() - started}
+    if not load_result["ok"]:
+        return [load_result]
+
+    target_dict = target_data or {}
+    if args.base_date is None:
+        args.base_date = df["手術実施日_dt"].max()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    workers = args.workers or len(args.stages)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stage") as executor:
+        futures = [executor.submit(_run_stage, name, df, target_dict, args) for name in args.stages]
+        return [load_result] + [future.result() for future in futures]
+
+
+def _parse_stages(value: str) -> List[str]:
+    stages = [stage.strip() for stage in value.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"不明なステージ: {', '.join(unknown)}（指定可能: {', '.join(STAGES)}）")
+    return stages
+
+
+def _parse_date(value: str) -> pd.Timestamp:
+    return pd.Timestamp(datetime.strptime(value, "%Y-%m-%d"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="手術分析レポートのバッチ実行")
+    parser.add_argument("--stages", type=_parse_stages, default=list(STAGES),
+                        help=f"実行するステージ（カンマ区切り、既定: {','.join(STAGES)}）")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="出力先フォルダ")
+    parser.add_argument("--base-date", type=_parse_date, default=None,
+                        help="分析基準日 YYYY-MM-DD（既定: データの最新日）")
+    parser.add_argument("--period", default="直近12週", help="ランキング・ダッシュボードの評価期間")
+    parser.add_argument("--period-type", default="週次", choices=["週次", "月次", "全期間"],
+                        help="メトリクス・PDFの集計単位")
+    parser.add_argument("--load-mode", default=None, choices=["auto", "pickle"], help="保存データの読み込み方法")
+    parser.add_argument("--workers", type=int, default=None, help="並列実行するステージ数（既定: ステージ数）")
+    parser.add_argument("--bundle-pdf", action="store_true", help="全診療科をまとめたPDFも同梱する")
+    parser.add_argument("--precompress", action="store_true", help="サイトの .gz/.br を事前生成する")
+    parser.add_argument("--ga-id", default=None, help="Google Analytics ID")
+    parser.add_argument("--publish", action="store_true", help="サイトをGitHubに公開する（環境変数 GITHUB_TOKEN が必要）")
+    parser.add_argument("--repo", default=None, help="公開先リポジトリ owner/name")
+    parser.add_argument("--branch", default="main", help="公開先ブランチ")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.publish and not (args.repo and os.environ.get("GITHUB_TOKEN")):
+        print("--publish には --repo と環境変数 GITHUB_TOKEN が必要です", file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    results = run_pipeline(args)
+
+    print()
+    print(f"{'ステージ':<10}{'結果':<6}{'秒':>8}  出力")
+    for result in results:
+        status = "OK" if result["ok"] else "NG"
+        print(f"{result['stage']:<10}{status:<6}{result['seconds']:>8.2f}  {result['output']}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -165,62 +165,39 @@ def create_high_score_sidebar_section():
 
 def display_unified_stats(df: pd.DataFrame, target_dict: Dict[str, float], 
                          mode: str, period: str):
-    """統合された統計表示"""
+    """統合された統計表示（ランキングはスナップショットから表示し、再実行ごとには計算しない）"""
     try:
         st.sidebar.markdown("**📈 評価統計**")
         
-        # 基本統計
-        total_depts = len(df['実施診療科'].dropna().unique()) if '実施診療科' in df.columns else 0
-        target_depts = len(target_dict)
-        
-        st.sidebar.metric("評価対象科", f"{target_depts}科")
-        st.sidebar.metric("総診療科数", f"{total_depts}科")
-        
-        # 評価モード別の詳細統計
         try:
-            if mode == 'weekly_ranking':
-                from analysis.weekly_surgery_ranking import calculate_weekly_surgery_ranking
-                dept_scores = calculate_weekly_surgery_ranking(df, target_dict, period)
-                
-                if dept_scores:
-                    avg_score = sum(d['total_score'] for d in dept_scores) / len(dept_scores)
-                    high_achievers = len([d for d in dept_scores if d['achievement_rate'] >= 100])
-                    s_grades = len([d for d in dept_scores if d['grade'].startswith('S')])
-                    
-                    st.sidebar.metric("平均スコア", f"{avg_score:.1f}点")
-                    st.sidebar.metric("目標達成科", f"{high_achievers}科")
-                    st.sidebar.metric("S評価科数", f"{s_grades}科")
-                    
-                    # 今週の1位
-                    if dept_scores:
-                        top_dept = dept_scores[0]
-                        st.sidebar.markdown("**🥇 今週の1位**")
-                        st.sidebar.markdown(f"**{top_dept['display_name']}**")
-                        st.sidebar.markdown(f"{top_dept['total_score']:.1f}点 ({top_dept['grade']})")
-            
-            else:  # high_score mode
-                from analysis.surgery_high_score import calculate_surgery_high_scores
-                dept_scores = calculate_surgery_high_scores(df, target_dict, period)
-                
-                if dept_scores:
-                    avg_score = sum(d['total_score'] for d in dept_scores) / len(dept_scores)
-                    high_achievers = len([d for d in dept_scores if d['achievement_rate'] >= 100])
-                    
-                    st.sidebar.metric("平均スコア", f"{avg_score:.1f}点")
-                    st.sidebar.metric("目標達成科", f"{high_achievers}科")
-                    
-                    # ハイスコア1位
-                    if dept_scores:
-                        top_dept = dept_scores[0]
-                        st.sidebar.markdown("**🏆 ハイスコア1位**")
-                        st.sidebar.markdown(f"**{top_dept['display_name']}**")
-                        st.sidebar.markdown(f"{top_dept['total_score']:.1f}点 ({top_dept['grade']})")
-        
+            from analysis.ranking_snapshot import get_ranking_snapshot
+            stats = get_ranking_snapshot(df, target_dict, mode, period)['stats']
         except ImportError:
             st.sidebar.info("評価エンジン準備中...")
+            return
         except Exception as e:
             logger.debug(f"詳細統計計算エラー: {e}")
             st.sidebar.info("統計計算中...")
+            return
+        
+        # 基本統計
+        st.sidebar.metric("評価対象科", f"{stats['target_depts']}科")
+        st.sidebar.metric("総診療科数", f"{stats['total_depts']}科")
+        
+        # 評価モード別の詳細統計
+        top_dept = stats['top_dept']
+        if top_dept is None:
+            return
+        
+        st.sidebar.metric("平均スコア", f"{stats['avg_score']:.1f}点")
+        st.sidebar.metric("目標達成科", f"{stats['high_achievers']}科")
+        if mode == 'weekly_ranking':
+            st.sidebar.metric("S評価科数", f"{stats['s_grades']}科")
+            st.sidebar.markdown("**🥇 今週の1位**")
+        else:  # high_score mode
+            st.sidebar.markdown("**🏆 ハイスコア1位**")
+        st.sidebar.markdown(f"**{top_dept['display_name']}**")
+        st.sidebar.markdown(f"{top_dept['total_score']:.1f}点 ({top_dept['grade']})")
     
     except Exception as e:
         logger.error(f"統計表示エラー: {e}")
@@ -1,10 +1,9 @@
 # config/style_config.py
 import pandas as pd
-import plotly.io as pio
-import streamlit as st
 
 def load_dashboard_css():
     """ダッシュボード用のカスタムCSSを読み込み"""
+    import streamlit as st
     st.markdown("""
     <style>
         /* メインコンテナのスタイルなど */
@@ -51,6 +50,12 @@ YOY_MARKER = dict(size=7, symbol='diamond', color=YOY_COLOR)
 PREDICTION_MARKER = dict(size=6, color=PREDICTION_COLOR)
 PREDICTION_ACTUAL_MARKER = dict(size=6, color=PREDICTION_ACTUAL_COLOR)
 
+# --- 描画方式 ---
+# 1系列の点数がこれを超える折れ線・散布図は WebGL（Scattergl）で描画する
+WEBGL_POINT_THRESHOLD = 1000
+# 日別推移などの時系列は、1系列あたりこの点数（グラフ幅のピクセル数の目安）まで間引いて描画する
+DOWNSAMPLE_POINT_BUDGET = 600
+
 # --- フォント定義 ---
 ANNOTATION_FONT = dict(color=ANNOTATION_COLOR, size=12)
 TITLE_FONT_SIZE = 16
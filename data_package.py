@@ -0,0 +1,167 @@
+# data_package.py - データパッケージ（他端末への移行用）のストリーミング入出力
+"""
+データパッケージの形式と読み書き
+- tar形式のコンテナに、メンバーを1つずつ圧縮して追記する（zstd、未導入ならgzip）
+- データ本体は一定行数ごとのチャンクに分けて書き出し、全体を一度にメモリへ載せない
+- 各メンバーのSHA-256とサイズを末尾の manifest.json に記録する
+- 読み込みはtarを先頭から順に読み、ハッシュを計算しながら作業ディレクトリへ展開し、
+  マニフェストと一致したものだけを返す（許可したメンバー名以外は展開しない）
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_FORMAT = 1
+PACKAGE_EXTENSION = ".tar"
+MANIFEST_NAME = "manifest.json"
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+READ_BLOCK_SIZE = 1024 * 1024
+
+# 展開を許可するメンバー名（パスの書き換え・任意ファイルの展開を防ぐ）
+_MEMBER_PATTERN = re.compile(r"^(data/part-\d{5}|extras|metadata|settings)\.[a-z]+\.(zst|gz)$")
+
+
+def default_codec() -> str:
+    return "zst" if ZSTD_AVAILABLE else "gz"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstd形式のパッケージを読み込むには 'pip install zstandard' が必要です")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+class PackageWriter:
+    """データパッケージを書き出すライター（メンバーごとに圧縮して追記）"""
+
+    def __init__(self, fileobj, codec: Optional[str] = None):
+        self.codec = codec or default_codec()
+        self._tar = tarfile.open(fileobj=fileobj, mode="w|")
+        self._entries = []
+
+    def add(self, name: str, data: bytes, **info) -> None:
+        """メンバーを追加（name は拡張子なし。圧縮形式の拡張子はここで付ける）"""
+        stored = compress(data, self.codec)
+        member = f"{name}.{self.codec}"
+        tarinfo = tarfile.TarInfo(member)
+        tarinfo.size = len(stored)
+        tarinfo.mtime = int(time.time())
+        self._tar.addfile(tarinfo, io.BytesIO(stored))
+        self._entries.append({
+            "name": member,
+            "sha256": hashlib.sha256(stored).hexdigest(),
+            "size": len(stored),
+            "raw_size": len(data),
+            **info,
+        })
+
+    def close(self, **manifest_fields) -> Dict[str, Any]:
+        """マニフェストを末尾に書いて閉じる"""
+        manifest = {
+            "format": PACKAGE_FORMAT,
+            "created_at": datetime.now().isoformat(),
+            "codec": self.codec,
+            **manifest_fields,
+            "files": self._entries,
+        }
+        data = json.dumps(manifest, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        tarinfo = tarfile.TarInfo(MANIFEST_NAME)
+        tarinfo.size = len(data)
+        tarinfo.mtime = int(time.time())
+        self._tar.addfile(tarinfo, io.BytesIO(data))
+        self._tar.close()
+        return manifest
+
+
+def extract_verified(package_path: str, staging_dir: str) -> Dict[str, Any]:
+    """
+    パッケージを先頭から順に読み、ハッシュを確認しながら staging_dir に展開
+
+    Returns:
+        マニフェスト
+
+    Raises:
+        ValueError: 不正なメンバー名・チェックサム不一致・メンバーの過不足
+    """
+    digests: Dict[str, Dict[str, Any]] = {}
+    manifest = None
+
+    with tarfile.open(package_path, mode="r|") as tar:
+        for member in tar:
+            if member.name == MANIFEST_NAME:
+                manifest = json.load(tar.extractfile(member))
+                continue
+            if not member.isfile() or not _MEMBER_PATTERN.match(member.name):
+                raise ValueError(f"パッケージに不正なメンバーが含まれています: {member.name}")
+
+            dest = os.path.join(staging_dir, *member.name.split("/"))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            digest = hashlib.sha256()
+            size = 0
+            source = tar.extractfile(member)
+            with open(dest, "wb") as f:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b""):
+                    digest.update(block)
+                    size += len(block)
+                    f.write(block)
+            digests[member.name] = {"sha256": digest.hexdigest(), "size": size}
+
+    if manifest is None:
+        raise ValueError("パッケージにマニフェストがありません")
+    if manifest.get("format") != PACKAGE_FORMAT:
+        raise ValueError(f"未対応のパッケージ形式です: {manifest.get('format')}")
+
+    expected = {entry["name"]: entry for entry in manifest.get("files", [])}
+    if set(expected) != set(digests):
+        missing = sorted(set(expected) - set(digests))
+        unexpected = sorted(set(digests) - set(expected))
+        raise ValueError(f"パッケージの内容がマニフェストと一致しません（不足: {missing} / 余分: {unexpected}）")
+    for name, entry in expected.items():
+        actual = digests[name]
+        if actual["sha256"] != entry["sha256"] or actual["size"] != entry["size"]:
+            raise ValueError(f"チェックサムが一致しません: {name}")
+
+    logger.info(f"パッケージ検証完了: {len(expected)}ファイル")
+    return manifest
+
+
+def read_member(staging_dir: str, entry: Dict[str, Any], codec: str) -> bytes:
+    """展開済みメンバーを読み込んで伸長"""
+    with open(os.path.join(staging_dir, *entry["name"].split("/")), "rb") as f:
+        return decompress(f.read(), codec)
+
+
+def data_entries(manifest: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """データ本体のチャンク（書き出し順）"""
+    return [entry for entry in manifest.get("files", []) if entry["name"].startswith("data/")]
+
+
+def find_entry(manifest: Dict[str, Any], name: str) -> Optional[Dict[str, Any]]:
+    """拡張子を除いた名前でメンバーを探す"""
+    return next((entry for entry in manifest.get("files", []) if entry["name"].startswith(f"{name}.")), None)
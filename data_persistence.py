@@ -1,26 +1,69 @@
 # data_persistence.py - データ永続化機能（プロジェクト統合版）
 
+import mmap
 import pickle
 import os
+import sys
 import pandas as pd
-import streamlit as st
 from datetime import datetime
 import json
 import shutil  # 標準ライブラリ
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path  # 標準ライブラリ（pathlib2不要）
 
+import numpy as np
+
+from backup_store import BackupStore, SNAPSHOT_PREFIX
+import data_package
+from data_processing.dataset_version import assign_version, compute_fingerprint, get_registry, get_version_info
+from utils import date_helpers
+
+# 列指向形式（Arrow IPC / Feather v2）での保存・メモリマップ読み込みは pyarrow がある場合のみ
+try:
+    import pyarrow as pa
+    COLUMNAR_AVAILABLE = True
+except ImportError:
+    COLUMNAR_AVAILABLE = False
+
 # ===== 設定 =====
 DATA_DIR = "saved_data"
 MAIN_DATA_FILE = os.path.join(DATA_DIR, "main_data.pkl")
 METADATA_FILE = os.path.join(DATA_DIR, "metadata.json")
 SETTINGS_FILE = os.path.join(DATA_DIR, "settings.json")
 BACKUP_DIR = os.path.join(DATA_DIR, "backup")
+# メモリマップ読み込み用の列指向データ（DataFrame本体）と、それ以外の保存項目
+COLUMNAR_DATA_FILE = os.path.join(DATA_DIR, "main_data.arrow")
+COLUMNAR_EXTRAS_FILE = os.path.join(DATA_DIR, "main_data_extras.pkl")
+# 読み込みモード: "auto"（列指向データがあればメモリマップ）/ "pickle"
+DEFAULT_LOAD_MODE = "auto"
+# 差分バックアップ（パーティション単位で重複排除）の保存先
+BACKUP_STORE_DIR = os.path.join(BACKUP_DIR, "store")
+MAX_BACKUPS = 10
+# データパッケージ（エクスポート）でデータ本体を分割する行数
+PACKAGE_CHUNK_ROWS = 100000
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class _LazyStreamlit:
+    """streamlit を初回参照時に読み込む（CLI等のヘッドレス実行では読み込まない）"""
+    
+    def __getattr__(self, name):
+        import streamlit
+        return getattr(streamlit, name)
+
+st = _LazyStreamlit()
+
+def _in_streamlit_app():
+    """アプリ（Streamlit）から呼ばれているか"""
+    return 'streamlit' in sys.modules
+
+def _has_session_state():
+    return _in_streamlit_app() and hasattr(st, 'session_state')
+
 def ensure_data_directory():
     """データディレクトリの存在確認・作成"""
     try:
@@ -32,14 +75,21 @@ def ensure_data_directory():
             logger.info(f"バックアップディレクトリを作成: {BACKUP_DIR}")
         return True
     except Exception as e:
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.error(f"ディレクトリ作成エラー: {e}")
         logger.error(f"ディレクトリ作成エラー: {e}")
         return False
 
+def get_backup_store():
+    """差分バックアップストアを取得"""
+    return BackupStore(BACKUP_STORE_DIR)
+
 def create_backup(force_create=False):
     """現在のデータのバックアップを作成
     
+    保存済みデータをパーティション単位のスナップショットとして差分バックアップストアに登録する
+    （前回から変更のないパーティションは再保存しない）
+    
     Args:
         force_create (bool): Trueの場合、ファイルが存在しなくてもエラーにしない
     """
@@ -47,14 +97,12 @@ def create_backup(force_create=False):
         if not os.path.exists(MAIN_DATA_FILE):
             if force_create:
                 # 現在のセッションデータからバックアップを作成
-                if hasattr(st, 'session_state') and st.session_state.get('processed_df') is not None:
+                if _has_session_state() and st.session_state.get('processed_df') is not None:
                     df = st.session_state.get('processed_df')
                     target_data = st.session_state.get('target_dict')
                     if df is not None and not df.empty:
-                        # 一時的にファイルに保存してからバックアップ
-                        temp_success = save_data_to_file(df, target_data)
-                        if not temp_success:
-                            return False
+                        # ファイルに保存（保存時にスナップショットも作成される）
+                        return save_data_to_file(df, target_data)
                     else:
                         return False
                 else:
@@ -62,158 +110,476 @@ def create_backup(force_create=False):
             else:
                 return False
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(BACKUP_DIR, f"main_data_backup_{timestamp}.pkl")
-        shutil.copy2(MAIN_DATA_FILE, backup_file)
+        if not ensure_data_directory():
+            return False
+        
+        with open(MAIN_DATA_FILE, 'rb') as f:
+            saved_data = pickle.load(f)
         
-        # メタデータファイルもバックアップ
+        metadata = None
         if os.path.exists(METADATA_FILE):
-            backup_metadata_file = os.path.join(BACKUP_DIR, f"metadata_backup_{timestamp}.json")
-            shutil.copy2(METADATA_FILE, backup_metadata_file)
+            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
         
-        # 古いバックアップファイルを削除（最新10個まで保持）
-        backup_files = [f for f in os.listdir(BACKUP_DIR) if f.startswith("main_data_backup_")]
-        backup_files.sort(reverse=True)
+        snapshot_id = get_backup_store().create_snapshot(saved_data, metadata, max_snapshots=MAX_BACKUPS)
+        if snapshot_id is None:
+            return False
         
-        for old_backup in backup_files[10:]:
-            try:
-                os.remove(os.path.join(BACKUP_DIR, old_backup))
-                # 対応するメタデータファイルも削除
-                metadata_backup = old_backup.replace("main_data_backup_", "metadata_backup_").replace(".pkl", ".json")
-                metadata_path = os.path.join(BACKUP_DIR, metadata_backup)
-                if os.path.exists(metadata_path):
-                    os.remove(metadata_path)
-            except Exception as cleanup_error:
-                logger.warning(f"古いバックアップ削除エラー: {cleanup_error}")
-        
-        logger.info(f"バックアップ作成完了: {backup_file}")
+        logger.info(f"バックアップ作成完了: {snapshot_id}")
         return True
     except Exception as e:
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.warning(f"バックアップ作成エラー: {e}")
         logger.error(f"バックアップ作成エラー: {e}")
         return False
 
-def save_data_to_file(df, target_data=None, metadata=None):
-    """データをファイルに保存（強化版）"""
+def _atomic_write_file(path, write_func):
+    """一時ファイルに書き込み、fsync後に置き換える（書き込み途中で落ちても元のファイルは壊れない）
+    
+    Returns:
+        int: 書き込んだバイト数
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write_func(f)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    # 置き換え（rename）自体もディレクトリのfsyncで確定させる（Windowsでは不可のためスキップ）
+    try:
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except (OSError, AttributeError):
+        pass
+    return size
+
+def _copy_file_into(source_path, dest):
+    with open(source_path, 'rb') as src:
+        shutil.copyfileobj(src, dest)
+
+def _build_saved_data(df, target_data, version_info=None):
+    """保存データを作成（セッション状態の参照はリクエストスレッドで行う）"""
+    has_session = _has_session_state()
+    return {
+        'df': df,
+        'target_data': target_data,
+        'saved_at': datetime.now(),
+        'data_shape': df.shape if df is not None else None,
+        'version': '6.0',  # アプリバージョンに合わせて更新
+        'dataset_version': _dataset_version_fields(version_info),
+        'data_source': st.session_state.get('data_source', 'unknown') if has_session else 'unknown',
+        'session_info': {
+            'filter_config': st.session_state.get('current_unified_filter_config', {}) if has_session else {},
+            'performance_metrics': st.session_state.get('performance_metrics', {}) if has_session else {},
+            'validation_results': st.session_state.get('validation_results', {}) if has_session else {}
+        }
+    }
+
+def _dataset_version_fields(info):
+    if info is None:
+        return None
+    return {'version': info['version'], 'fingerprint': info['fingerprint']}
+
+def _ensure_dataset_version(data_to_save):
+    """未登録のDataFrame（インポート等）はここでフィンガープリントを計算して採番する"""
+    df = data_to_save.get('df')
+    if data_to_save.get('dataset_version') is None and df is not None:
+        data_to_save['dataset_version'] = {
+            'version': get_registry().next_version(),
+            'fingerprint': compute_fingerprint(df)
+        }
+
+def _find_column(df, candidates):
+    return next((col for col in candidates if col in df.columns), None)
+
+def _build_metadata(data_to_save, metadata, file_size):
+    """メタデータを作成（バックグラウンドで実行。ファイルサイズは書き込んだバイト数を使う）"""
+    df = data_to_save['df']
+    metadata = metadata or {}
+    
+    enhanced_metadata = {
+        'last_saved': data_to_save['saved_at'].isoformat(),
+        'data_rows': len(df) if df is not None else 0,
+        'data_columns': list(df.columns) if df is not None else [],
+        'file_size_mb': round(file_size / (1024 * 1024), 2),
+        'data_source': data_to_save['data_source'],
+        'app_version': '6.0',
+        'save_count': metadata.get('save_count', 0) + 1,
+        'date_range': {},
+        'statistics': {}
+    }
+    
+    # データ統計情報を追加（複数の可能性のある列名に対応）
+    if df is not None and not df.empty:
+        date_col = _find_column(df, ['日付', '手術実施日_dt', '手術実施日', 'date'])
+        if date_col:
+            try:
+                min_date, max_date = df[date_col].min(), df[date_col].max()
+                enhanced_metadata['date_range'] = {
+                    'min_date': min_date.isoformat(),
+                    'max_date': max_date.isoformat(),
+                    'total_days': (max_date - min_date).days + 1,
+                    'unique_dates': df[date_col].nunique()
+                }
+            except Exception as date_error:
+                logger.warning(f"日付範囲計算エラー: {date_error}")
+        
+        dept_col = _find_column(df, ['診療科名', '実施診療科', '診療科', 'department'])
+        ward_col = _find_column(df, ['病棟コード', '病棟', 'ward'])
+        enhanced_metadata['statistics'] = {
+            'departments': df[dept_col].nunique() if dept_col else 0,
+            'wards': df[ward_col].nunique() if ward_col else 0,
+            'total_records': len(df),
+            'columns_count': len(df.columns)
+        }
+    
+    # 元のメタデータと結合
+    enhanced_metadata.update(metadata)
+    
+    version_info = data_to_save.get('dataset_version')
+    if version_info is not None:
+        enhanced_metadata['dataset_version'] = version_info['version']
+        enhanced_metadata['dataset_fingerprint'] = version_info['fingerprint']
+    return enhanced_metadata
+
+def _write_saved_data(data_to_save, metadata=None):
+    """保存処理本体（バックグラウンドスレッドで実行。Streamlit APIは呼ばない）"""
     try:
         if not ensure_data_directory():
             return False
         
-        # 既存データのバックアップ
-        create_backup()
+        # 差分バックアップ導入前の保存データは、上書き前に一度だけスナップショット化する
+        store = get_backup_store()
+        if os.path.exists(MAIN_DATA_FILE) and not store.list_snapshots():
+            create_backup()
         
-        # メインデータの保存
-        data_to_save = {
-            'df': df,
-            'target_data': target_data,
-            'saved_at': datetime.now(),
-            'data_shape': df.shape if df is not None else None,
-            'version': '6.0',  # アプリバージョンに合わせて更新
-            'data_source': st.session_state.get('data_source', 'unknown') if hasattr(st, 'session_state') else 'unknown',
-            'session_info': {
-                'filter_config': st.session_state.get('current_unified_filter_config', {}) if hasattr(st, 'session_state') else {},
-                'performance_metrics': st.session_state.get('performance_metrics', {}) if hasattr(st, 'session_state') else {},
-                'validation_results': st.session_state.get('validation_results', {}) if hasattr(st, 'session_state') else {}
-            }
-        }
-        
-        with open(MAIN_DATA_FILE, 'wb') as f:
-            pickle.dump(data_to_save, f, protocol=pickle.HIGHEST_PROTOCOL)
-        
-        # メタデータの保存（強化版）
-        if metadata is None:
-            metadata = {}
-        
-        enhanced_metadata = {
-            'last_saved': datetime.now().isoformat(),
-            'data_rows': len(df) if df is not None else 0,
-            'data_columns': list(df.columns) if df is not None else [],
-            'file_size_mb': round(os.path.getsize(MAIN_DATA_FILE) / (1024 * 1024), 2),
-            'data_source': st.session_state.get('data_source', 'unknown') if hasattr(st, 'session_state') else 'unknown',
-            'app_version': '6.0',
-            'save_count': metadata.get('save_count', 0) + 1,
-            'date_range': {},
-            'statistics': {}
-        }
+        _ensure_dataset_version(data_to_save)
+        file_size = _atomic_write_file(
+            MAIN_DATA_FILE,
+            lambda f: pickle.dump(data_to_save, f, protocol=pickle.HIGHEST_PROTOCOL)
+        )
         
-        # データ統計情報を追加
-        if df is not None and not df.empty:
-            # 日付列の検出（複数の可能性のある列名に対応）
-            date_columns = ['日付', '手術実施日_dt', '手術実施日', 'date']
-            date_col = None
-            for col in date_columns:
-                if col in df.columns:
-                    date_col = col
-                    break
-            
-            if date_col:
-                try:
-                    enhanced_metadata['date_range'] = {
-                        'min_date': df[date_col].min().isoformat(),
-                        'max_date': df[date_col].max().isoformat(),
-                        'total_days': (df[date_col].max() - df[date_col].min()).days + 1,
-                        'unique_dates': df[date_col].nunique()
-                    }
-                except Exception as date_error:
-                    logger.warning(f"日付範囲計算エラー: {date_error}")
-            
-            # 基本統計（複数の可能性のある列名に対応）
-            dept_columns = ['診療科名', '実施診療科', '診療科', 'department']
-            ward_columns = ['病棟コード', '病棟', 'ward']
-            
-            dept_col = None
-            ward_col = None
-            
-            for col in dept_columns:
-                if col in df.columns:
-                    dept_col = col
-                    break
-                    
-            for col in ward_columns:
-                if col in df.columns:
-                    ward_col = col
-                    break
-            
-            enhanced_metadata['statistics'] = {
-                'departments': df[dept_col].nunique() if dept_col else 0,
-                'wards': df[ward_col].nunique() if ward_col else 0,
-                'total_records': len(df),
-                'columns_count': len(df.columns)
-            }
+        # メモリマップ読み込み用の列指向データ（メタデータより先に書き、読み込み時の照合に使う）
+        _write_columnar_data(data_to_save)
         
-        # 元のメタデータと結合
-        enhanced_metadata.update(metadata)
+        enhanced_metadata = _build_metadata(data_to_save, metadata, file_size)
+        metadata_bytes = json.dumps(enhanced_metadata, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        _atomic_write_file(METADATA_FILE, lambda f: f.write(metadata_bytes))
         
-        with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(enhanced_metadata, f, ensure_ascii=False, indent=2, default=str)
+        # 保存内容をスナップショットとして記録（変更されたパーティションだけが追加される）
+        store.create_snapshot(data_to_save, enhanced_metadata, max_snapshots=MAX_BACKUPS)
         
+        df = data_to_save['df']
         logger.info(f"データ保存完了: {len(df) if df is not None else 0}件")
         return True
         
     except Exception as e:
-        if 'st' in globals():
+        logger.error(f"データ保存エラー: {e}")
+        return False
+
+def _arrow_string_dtype():
+    """Arrow配列をそのまま保持する文字列型（NaN・numpyのboolを返す互換モード）"""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)  # pandas 2.3以降
+    except TypeError:
+        try:
+            return pd.StringDtype("pyarrow_numpy")  # pandas 2.1〜2.2
+        except Exception:
+            return None  # 古いpandasでは通常の変換（文字列はPythonオブジェクトにコピー）
+
+def _write_columnar_data(data_to_save):
+    """DataFrameを非圧縮のArrow IPCファイルに保存（メモリマップで読めるように）
+    
+    文字列は large_string で保存し、読み込み時に型変換（コピー）が起きないようにする。
+    保存日時をスキーマとメタデータの両方に記録し、読み込み時に main_data.pkl と同じ保存分か確認する。
+    """
+    df = data_to_save['df']
+    token = data_to_save['saved_at'].isoformat()
+    if not COLUMNAR_AVAILABLE or df is None:
+        return False
+    
+    try:
+        table = pa.Table.from_pandas(df)
+        fields = [
+            field.with_type(pa.large_string()) if pa.types.is_string(field.type) else field
+            for field in table.schema
+        ]
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'saved_at'] = token.encode('utf-8')
+        table = table.cast(pa.schema(fields, metadata=metadata))
+    except Exception as e:
+        # 型が混在した列などArrowに変換できない場合は従来のpickle読み込みのみ
+        logger.warning(f"列指向データに変換できないため保存をスキップします: {e}")
+        _remove_columnar_data()
+        return False
+    
+    def _write_table(f):
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+    
+    _atomic_write_file(COLUMNAR_DATA_FILE, _write_table)
+    extras = {k: v for k, v in data_to_save.items() if k != 'df'}
+    extras['columnar_token'] = token
+    _atomic_write_file(COLUMNAR_EXTRAS_FILE, lambda f: pickle.dump(extras, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return True
+
+def _remove_columnar_data():
+    """列指向データを削除（main_data.pkl を列指向データ以外の経路で書き換えたとき。次回保存時に作り直す）"""
+    for path in (COLUMNAR_EXTRAS_FILE, COLUMNAR_DATA_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _map_arrow_file(path):
+    """Arrow IPCファイルをコピーオンライト（MAP_PRIVATE）でメモリマップして読み込む
+    
+    Returns:
+        (テーブル, マップ, マップ全体のArrowバッファ)
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    base = pa.py_buffer(mapped)
+    return pa.ipc.open_file(pa.BufferReader(base)).read_all(), mapped, base
+
+def _writable_view(column, mapped, base, dtype):
+    """欠損なし・単一チャンクの数値/日時列を、マップ上の書き込み可能なビューとして返す（対象外はNone）
+    
+    pyarrow がゼロコピーで返す配列は読み取り専用のため、同じ領域をマップから直接参照し直す。
+    マップはコピーオンライトなので、書き込んだページだけがプロセス専用のメモリにコピーされる（ファイルは変わらない）。
+    """
+    if column.num_chunks != 1 or column.null_count:
+        return None
+    chunk = column.chunk(0)
+    arrow_type = chunk.type
+    if not (pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+            or (pa.types.is_timestamp(arrow_type) and arrow_type.tz is None)):
+        return None
+    view_dtype = np.dtype(f"datetime64[{arrow_type.unit}]") if pa.types.is_timestamp(arrow_type) \
+        else np.dtype(arrow_type.to_pandas_dtype())
+    if view_dtype != dtype:
+        return None
+    offset = chunk.buffers()[1].address - base.address + chunk.offset * view_dtype.itemsize
+    if offset < 0 or offset + len(chunk) * view_dtype.itemsize > len(mapped):
+        return None
+    return np.frombuffer(mapped, dtype=view_dtype, count=len(chunk), offset=offset)
+
+def _is_writable(array):
+    """列の値を保持するnumpy配列（日時・欠損値対応の整数・カテゴリの内部配列を含む）が書き込み可能か"""
+    if isinstance(array, np.ndarray):
+        return array.flags.writeable
+    if isinstance(array, pd.arrays.ArrowExtensionArray) or hasattr(array, '_pa_array'):
+        # Arrow配列は不変で、値の書き換えは新しい配列への置き換えになる
+        return True
+    attrs = ('_ndarray', '_mask', '_codes')
+    if isinstance(array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+        attrs += ('_data',)
+    for attr in attrs:
+        inner = getattr(array, attr, None)
+        if isinstance(inner, np.ndarray) and not inner.flags.writeable:
+            return False
+    return True
+
+def _read_arrow_frame(path):
+    """Arrow IPCファイルを書き込み可能なDataFrameとして読み込む（数値・日付列はコピーオンライトのマップを参照）"""
+    table, mapped, base = _map_arrow_file(path)
+    string_dtype = _arrow_string_dtype()
+    types_mapper = None
+    if string_dtype is not None:
+        types_mapper = {pa.large_string(): string_dtype, pa.string(): string_dtype}.get
+    frame = table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+    
+    names = table.schema.names
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        view = None
+        if isinstance(name, str) and names.count(name) == 1 and isinstance(series.dtype, np.dtype):
+            view = _writable_view(table.column(name), mapped, base, series.dtype)
+        columns[name] = series if view is None else view
+    if len(columns) != len(frame.columns):
+        return frame.copy()  # 列名が重複している場合は書き込み可能なコピー
+    df = pd.DataFrame(columns, index=frame.index, copy=False)
+    
+    # 書き込めない列（ビューにできなかった読み取り専用の列）が残っていればその列だけコピーする
+    read_only = [name for name in df.columns if not _is_writable(df[name].array)]
+    if read_only:
+        logger.debug(f"読み取り専用の列をコピーします: {read_only}")
+        for name in read_only:
+            df[name] = df[name].copy()
+    return df
+
+def _load_columnar_data(metadata):
+    """列指向データをメモリマップで読み込む（main_data.pkl と同じ保存分でなければNone）
+    
+    数値・日付列はコピーオンライトでマップしたファイルを直接参照し、文字列列はArrow配列のまま保持するため、
+    同じホストの複数ワーカーはOSのページキャッシュを共有し、列を変更するまで実メモリをほぼ使わない。
+    読み込んだDataFrameへの書き込みはプロセス内のコピーにだけ反映される。
+    """
+    if not COLUMNAR_AVAILABLE or not metadata:
+        return None
+    if not (os.path.exists(COLUMNAR_DATA_FILE) and os.path.exists(COLUMNAR_EXTRAS_FILE)):
+        return None
+    
+    try:
+        with open(COLUMNAR_EXTRAS_FILE, 'rb') as f:
+            extras = pickle.load(f)
+        token = extras.get('columnar_token')
+        if token is None or token != metadata.get('last_saved'):
+            logger.info("列指向データが保存データと一致しないため、pickleから読み込みます")
+            return None
+        
+        schema = pa.ipc.open_file(pa.memory_map(COLUMNAR_DATA_FILE, 'r')).schema
+        if (schema.metadata or {}).get(b'saved_at', b'').decode('utf-8') != token:
+            return None
+        
+        df = _read_arrow_frame(COLUMNAR_DATA_FILE)
+        
+        saved_data = dict(extras)
+        saved_data['df'] = df
+        return saved_data
+    except Exception as e:
+        logger.warning(f"列指向データ読み込みエラー（pickleから読み込みます）: {e}")
+        return None
+
+class PersistenceWriter:
+    """データ保存をバックグラウンドスレッドで順番に実行するライター"""
+    
+    def __init__(self):
+        # 保存は1本のスレッドで順番に実行する（同じファイルへの同時書き込みを防ぐ）
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self._lock = threading.Lock()
+        self._status = {'state': 'idle'}
+    
+    def submit(self, df, target_data=None, metadata=None):
+        """保存を登録し、完了時にTrue/Falseを返すFutureを返す"""
+        # 画面側でDataFrameの列が差し替えられても保存内容が変わらないよう浅いコピーを渡す
+        data_to_save = _build_saved_data(
+            df.copy(deep=False) if df is not None else None, target_data, get_version_info(df)
+        )
+        rows = len(df) if df is not None else 0
+        
+        with self._lock:
+            self._status = {'state': 'running', 'rows': rows, 'started_at': datetime.now().isoformat()}
+        
+        future = self._executor.submit(_write_saved_data, data_to_save, metadata)
+        future.add_done_callback(lambda f: self._on_done(f, rows))
+        return future
+    
+    def _on_done(self, future, rows):
+        try:
+            success = future.result()
+            error = None if success else "保存に失敗しました（詳細はログを参照）"
+        except Exception as e:
+            success, error = False, str(e)
+        with self._lock:
+            self._status = {
+                'state': 'done' if success else 'failed',
+                'rows': rows,
+                'finished_at': datetime.now().isoformat(),
+                'error': error
+            }
+    
+    def run(self, func, *args):
+        """保存と同じスレッドで任意の書き込み処理を実行し、Futureを返す（インポート等）"""
+        return self._executor.submit(func, *args)
+    
+    def status(self):
+        """直近の保存状況（state: idle / running / done / failed）"""
+        with self._lock:
+            return dict(self._status)
+    
+    def flush(self, timeout=None):
+        """登録済みの保存がすべて終わるまで待つ"""
+        self._executor.submit(lambda: None).result(timeout=timeout)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_persistence_writer():
+    """プロセス共通の保存ライターを取得"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = PersistenceWriter()
+        return _writer
+
+def save_data_in_background(df, target_data=None, metadata=None):
+    """データをバックグラウンドで保存し、Future（結果はTrue/False）を返す"""
+    return get_persistence_writer().submit(df, target_data, metadata)
+
+def get_save_status():
+    """バックグラウンド保存の状況を取得"""
+    return get_persistence_writer().status()
+
+def save_data_to_file(df, target_data=None, metadata=None):
+    """データをファイルに保存（強化版。保存完了まで待つ）"""
+    try:
+        success = save_data_in_background(df, target_data, metadata).result()
+        if not success and _in_streamlit_app():
+            st.error("データ保存エラー: 詳細はログを確認してください")
+        return success
+        
+    except Exception as e:
+        if _in_streamlit_app():
             st.error(f"データ保存エラー: {e}")
         logger.error(f"データ保存エラー: {e}")
         return False
 
-def load_data_from_file():
-    """ファイルからデータを読み込み（強化版）"""
+def _refresh_weekday_flags(df):
+    """保存データの is_weekday を現在の営業日カレンダーで再計算する
+    
+    以前の保存データは年末年始などの休診日を平日として判定しているため、読み込み時に置き換える。
+    Returns:
+        bool: フラグが変わった場合True
+    """
+    if 'is_weekday' not in df.columns or '手術実施日_dt' not in df.columns:
+        return False
+    try:
+        weekday = date_helpers.weekday_mask(df['手術実施日_dt'])
+        if np.array_equal(df['is_weekday'].to_numpy(dtype=bool), weekday):
+            return False
+        changed = int((df['is_weekday'].to_numpy(dtype=bool) != weekday).sum())
+        df['is_weekday'] = weekday
+        logger.info(f"平日フラグを営業日カレンダーで再計算: {changed}件変更")
+        return True
+    except Exception as e:
+        logger.warning(f"平日フラグ再計算エラー: {e}")
+        return False
+
+def load_data_from_file(mode=None):
+    """ファイルからデータを読み込み（強化版）
+    
+    Args:
+        mode: "auto"（列指向データがあればメモリマップで読み込む）/ "pickle"（main_data.pkl を読み込む）
+    """
     try:
         if not os.path.exists(MAIN_DATA_FILE):
             logger.info("保存ファイルが見つかりません")
             return None, None, None
         
-        # メインデータの読み込み
-        with open(MAIN_DATA_FILE, 'rb') as f:
-            saved_data = pickle.load(f)
-        
         # メタデータの読み込み
         metadata = None
         if os.path.exists(METADATA_FILE):
             with open(METADATA_FILE, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
         
+        # メインデータの読み込み
+        saved_data = None
+        if (mode or DEFAULT_LOAD_MODE) == "auto":
+            saved_data = _load_columnar_data(metadata)
+        if saved_data is None:
+            with open(MAIN_DATA_FILE, 'rb') as f:
+                saved_data = pickle.load(f)
+        
         # データの妥当性チェック
         df = saved_data.get('df')
         if df is not None and isinstance(df, pd.DataFrame):
@@ -225,9 +591,20 @@ def load_data_from_file():
                         df[col] = pd.to_datetime(df[col])
                     except Exception as date_convert_error:
                         logger.warning(f"日付列変換警告 {col}: {date_convert_error}")
+            
+            calendar_changed = _refresh_weekday_flags(df)
+            
+            # 保存時のデータセットバージョンで登録（以前の保存データはここで一度だけフィンガープリントを計算）
+            get_registry().observe((metadata or {}).get('dataset_version'))
+            version_info = saved_data.get('dataset_version') or {}
+            if calendar_changed:
+                # 平日フラグが変わったデータは保存時と別物として新しいバージョンを割り当てる
+                version_info = {}
+            assign_version(df, fingerprint=version_info.get('fingerprint'),
+                           version=version_info.get('version'), source='saved_file')
         
-        # セッション情報の復元（可能な場合）
-        if hasattr(st, 'session_state'):
+        # セッション情報の復元（アプリから呼ばれた場合のみ）
+        if _has_session_state():
             session_info = saved_data.get('session_info', {})
             if session_info:
                 # フィルター設定の復元
@@ -242,7 +619,7 @@ def load_data_from_file():
         return df, saved_data.get('target_data'), metadata
         
     except Exception as e:
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.error(f"データ読み込みエラー: {e}")
         logger.error(f"データ読み込みエラー: {e}")
         return None, None, None
@@ -266,7 +643,7 @@ def save_settings_to_file(settings):
         return True
         
     except Exception as e:
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.error(f"設定保存エラー: {e}")
         logger.error(f"設定保存エラー: {e}")
         return False
@@ -283,7 +660,7 @@ def load_settings_from_file():
         return saved_settings.get('settings')
         
     except Exception as e:
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.error(f"設定読み込みエラー: {e}")
         logger.error(f"設定読み込みエラー: {e}")
         return None
@@ -306,7 +683,8 @@ def get_data_info():
 def delete_saved_data():
     """保存されたデータを削除"""
     try:
-        files_to_delete = [MAIN_DATA_FILE, METADATA_FILE, SETTINGS_FILE]
+        get_persistence_writer().flush()
+        files_to_delete = [MAIN_DATA_FILE, METADATA_FILE, SETTINGS_FILE, COLUMNAR_DATA_FILE, COLUMNAR_EXTRAS_FILE]
         deleted_files = []
         
         for file_path in files_to_delete:
@@ -330,7 +708,7 @@ def auto_load_data():
     """アプリ起動時の自動データ読み込み（シンプル確実版）"""
     
     # セッション状態がない場合はスキップ
-    if not hasattr(st, 'session_state'):
+    if not _has_session_state():
         return False
     
     # 既にデータが処理済みの場合はスキップ
@@ -371,7 +749,7 @@ def auto_load_data():
     except Exception as e:
         # エラーが発生した場合は自動読み込みを無効化
         logger.error(f"自動データ読み込みエラー: {e}")
-        if 'st' in globals():
+        if _in_streamlit_app():
             st.error(f"自動データ読み込みエラー: {str(e)}")
         return False
 
@@ -381,6 +759,7 @@ def get_file_sizes():
         sizes = {}
         files = [
             ('main_data', MAIN_DATA_FILE, 'メインデータ'),
+            ('columnar_data', COLUMNAR_DATA_FILE, '列指向データ'),
             ('metadata', METADATA_FILE, 'メタデータ'), 
             ('settings', SETTINGS_FILE, '設定ファイル')
         ]
@@ -401,12 +780,12 @@ def get_file_sizes():
             else:
                 sizes[display_name] = "未保存"
         
-        # バックアップフォルダのサイズも追加
+        # バックアップフォルダのサイズも追加（差分バックアップストアを含む）
         if os.path.exists(BACKUP_DIR):
             backup_size = sum(
-                os.path.getsize(os.path.join(BACKUP_DIR, f)) 
-                for f in os.listdir(BACKUP_DIR) 
-                if os.path.isfile(os.path.join(BACKUP_DIR, f))
+                os.path.getsize(os.path.join(dirpath, f))
+                for dirpath, _, filenames in os.walk(BACKUP_DIR)
+                for f in filenames
             )
             total_size += backup_size
             
@@ -429,15 +808,40 @@ def get_file_sizes():
         logger.error(f"ファイルサイズ取得エラー: {e}")
         return {}
 
+def _format_size(size_bytes):
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
 def get_backup_info():
-    """バックアップファイルの情報を取得（強化版）"""
+    """バックアップの情報を取得（差分バックアップのスナップショット + 従来形式のバックアップファイル）"""
     try:
         if not os.path.exists(BACKUP_DIR):
             return []
         
-        backup_files = [f for f in os.listdir(BACKUP_DIR) if f.startswith("main_data_backup_")]
         backup_info = []
         
+        store = get_backup_store()
+        for manifest in store.list_snapshots():
+            try:
+                timestamp = datetime.fromisoformat(manifest['created_at'])
+                backup_info.append({
+                    'filename': manifest['snapshot_id'],
+                    'kind': 'snapshot',
+                    'timestamp': timestamp.strftime("%Y/%m/%d %H:%M:%S"),
+                    'created_at': timestamp.strftime("%Y/%m/%d %H:%M:%S"),
+                    # 他のスナップショットと共有しているパーティションを含む論理サイズ
+                    'size': f"{_format_size(store.snapshot_size(manifest))}（追加 {_format_size(manifest.get('added_bytes', 0))}）",
+                    'path': None,
+                    'rows': manifest.get('rows', 0),
+                    'has_metadata': manifest.get('metadata') is not None,
+                    'age_days': (datetime.now() - timestamp).days
+                })
+            except Exception as parse_error:
+                logger.warning(f"スナップショット解析エラー {manifest.get('snapshot_id')}: {parse_error}")
+        
+        backup_files = [f for f in os.listdir(BACKUP_DIR) if f.startswith("main_data_backup_")]
+        
         for backup_file in sorted(backup_files, reverse=True):
             file_path = os.path.join(BACKUP_DIR, backup_file)
             timestamp_str = backup_file.replace("main_data_backup_", "").replace(".pkl", "")
@@ -458,7 +862,9 @@ def get_backup_info():
                 
                 backup_info.append({
                     'filename': backup_file,
+                    'kind': 'legacy',
                     'timestamp': formatted_time,
+                    'created_at': formatted_time,
                     'size': size_str,
                     'path': file_path,
                     'has_metadata': has_metadata,
@@ -468,34 +874,75 @@ def get_backup_info():
                 logger.warning(f"バックアップファイル解析エラー {backup_file}: {parse_error}")
                 continue
         
-        return backup_info[:10]  # 最新10個まで
+        backup_info.sort(key=lambda info: info['timestamp'], reverse=True)
+        return backup_info[:MAX_BACKUPS]  # 最新10個まで
         
     except Exception as e:
         logger.error(f"バックアップ情報取得エラー: {e}")
         return []
 
+def _current_dataset_version():
+    try:
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('dataset_version')
+    except Exception:
+        return None
+
+# 取り込み時の採番を保存済みのバージョンより大きくする
+get_registry().set_seed_provider(_current_dataset_version)
+
+def _stamp_restored_version(saved_data, metadata):
+    """復元したデータに新しいデータセットバージョンを割り当てる（内容が同じならフィンガープリントは維持）"""
+    version = get_registry().next_version(_current_dataset_version())
+    fingerprint = (saved_data.get('dataset_version') or {}).get('fingerprint')
+    saved_data['dataset_version'] = {'version': version, 'fingerprint': fingerprint} if fingerprint else None
+    if metadata is not None:
+        metadata['dataset_version'] = version
+        if fingerprint:
+            metadata['dataset_fingerprint'] = fingerprint
+
 def restore_from_backup(backup_filename):
     """バックアップからデータを復元（強化版）"""
     try:
-        backup_path = os.path.join(BACKUP_DIR, backup_filename)
-        if not os.path.exists(backup_path):
-            return False, "バックアップファイルが見つかりません"
+        is_snapshot = backup_filename.startswith(SNAPSHOT_PREFIX)
+        if is_snapshot:
+            store = get_backup_store()
+            if store.read_manifest(backup_filename) is None:
+                return False, "バックアップが見つかりません"
+        else:
+            backup_path = os.path.join(BACKUP_DIR, backup_filename)
+            if not os.path.exists(backup_path):
+                return False, "バックアップファイルが見つかりません"
+        
+        # 実行中のバックグラウンド保存が復元結果を上書きしないよう完了を待つ
+        get_persistence_writer().flush()
         
         # 現在のファイルをバックアップ
         create_backup()
+        # 列指向データは復元前の保存分なので削除（メタデータが復元されない場合も古いデータを読まないように）
+        _remove_columnar_data()
         
-        # バックアップファイルを復元
-        shutil.copy2(backup_path, MAIN_DATA_FILE)
-        
-        # 対応するメタデータファイルも復元
-        timestamp_str = backup_filename.replace("main_data_backup_", "").replace(".pkl", "")
-        metadata_backup_path = os.path.join(BACKUP_DIR, f"metadata_backup_{timestamp_str}.json")
-        
-        if os.path.exists(metadata_backup_path):
-            shutil.copy2(metadata_backup_path, METADATA_FILE)
+        if is_snapshot:
+            # マニフェストからパーティションを組み立てて復元
+            saved_data, metadata = store.load_snapshot(backup_filename)
+            _stamp_restored_version(saved_data, metadata)
+            _atomic_write_file(MAIN_DATA_FILE, lambda f: pickle.dump(saved_data, f, protocol=pickle.HIGHEST_PROTOCOL))
+            if metadata is not None:
+                metadata_bytes = json.dumps(metadata, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+                _atomic_write_file(METADATA_FILE, lambda f: f.write(metadata_bytes))
+        else:
+            # バックアップファイルを復元
+            _atomic_write_file(MAIN_DATA_FILE, lambda f: _copy_file_into(backup_path, f))
+            
+            # 対応するメタデータファイルも復元
+            timestamp_str = backup_filename.replace("main_data_backup_", "").replace(".pkl", "")
+            metadata_backup_path = os.path.join(BACKUP_DIR, f"metadata_backup_{timestamp_str}.json")
+            
+            if os.path.exists(metadata_backup_path):
+                _atomic_write_file(METADATA_FILE, lambda f: _copy_file_into(metadata_backup_path, f))
         
         # セッション状態をクリア（Streamlit環境の場合のみ）
-        if hasattr(st, 'session_state'):
+        if _has_session_state():
             keys_to_clear = ['processed_df', 'target_dict', 'latest_date', 'data_source', 'data_metadata',
                             'current_unified_filter_config', 'performance_metrics',
                             'validation_results', 'all_results']
@@ -510,55 +957,228 @@ def restore_from_backup(backup_filename):
         logger.error(f"バックアップ復元エラー: {e}")
         return False, f"復元エラー: {e}"
 
+def read_backup_bytes(backup):
+    """バックアップを main_data.pkl 形式のバイト列として取得（ダウンロード用）"""
+    if backup.get('kind') == 'snapshot':
+        saved_data, _ = get_backup_store().load_snapshot(backup['filename'])
+        return pickle.dumps(saved_data, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(backup['path'], 'rb') as f:
+        return f.read()
+
+def _read_saved_data_for_export():
+    """エクスポート用に保存データを取得
+    
+    Returns:
+        (保存データ辞書, 列指向データのArrowテーブル or None)
+        列指向データが有効な場合はメモリマップしたテーブルを返し、DataFrameは組み立てない。
+    """
+    metadata = None
+    if os.path.exists(METADATA_FILE):
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    
+    if COLUMNAR_AVAILABLE and metadata and os.path.exists(COLUMNAR_DATA_FILE) and os.path.exists(COLUMNAR_EXTRAS_FILE):
+        try:
+            with open(COLUMNAR_EXTRAS_FILE, 'rb') as f:
+                extras = pickle.load(f)
+            if extras.get('columnar_token') == metadata.get('last_saved'):
+                table = pa.ipc.open_file(pa.memory_map(COLUMNAR_DATA_FILE, 'r')).read_all()
+                extras.pop('columnar_token', None)
+                return extras, table
+        except Exception as e:
+            logger.warning(f"列指向データを使用できないため、pickleからエクスポートします: {e}")
+    
+    with open(MAIN_DATA_FILE, 'rb') as f:
+        saved_data = pickle.load(f)
+    return saved_data, None
+
+def _arrow_chunk_bytes(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
 def export_data_package(export_path=None):
-    """データパッケージのエクスポート（他端末への移行用）"""
+    """データパッケージのエクスポート（他端末への移行用）
+    
+    データ本体は PACKAGE_CHUNK_ROWS 行ごとに圧縮して順に書き出すため、
+    データ全体の圧縮済みコピーをメモリ上に作らない。各ファイルのチェックサムはマニフェストに記録する。
+    """
     try:
         if export_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            export_path = f"data_export_{timestamp}.zip"
+            export_path = f"data_export_{timestamp}{data_package.PACKAGE_EXTENSION}"
         
-        import zipfile
+        if not os.path.exists(MAIN_DATA_FILE):
+            return False, "エクスポートする保存データがありません"
+        
+        get_persistence_writer().flush()
+        saved_data, table = _read_saved_data_for_export()
+        df = saved_data.pop('df', None)
         
-        with zipfile.ZipFile(export_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            files_to_export = [
-                (MAIN_DATA_FILE, "main_data.pkl"),
-                (METADATA_FILE, "metadata.json"),
-                (SETTINGS_FILE, "settings.json")
-            ]
+        rows, columns, data_format = 0, [], None
+        with open(export_path, 'wb') as f:
+            writer = data_package.PackageWriter(f)
+            
+            if table is not None:
+                # 列指向データはメモリマップのままスライスして書き出す
+                data_format, rows, columns = 'arrow', table.num_rows, table.column_names
+                for part, offset in enumerate(range(0, max(rows, 1), PACKAGE_CHUNK_ROWS)):
+                    chunk = table.slice(offset, PACKAGE_CHUNK_ROWS)
+                    writer.add(f"data/part-{part:05d}.arrow", _arrow_chunk_bytes(chunk), rows=chunk.num_rows)
+            elif isinstance(df, pd.DataFrame):
+                data_format, rows, columns = 'pickle', len(df), [str(col) for col in df.columns]
+                for part, offset in enumerate(range(0, max(rows, 1), PACKAGE_CHUNK_ROWS)):
+                    chunk = df.iloc[offset:offset + PACKAGE_CHUNK_ROWS]
+                    writer.add(f"data/part-{part:05d}.pkl", pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL),
+                               rows=len(chunk))
             
-            for source_path, archive_name in files_to_export:
+            writer.add("extras.pkl", pickle.dumps(saved_data, protocol=pickle.HIGHEST_PROTOCOL))
+            for source_path, name in ((METADATA_FILE, "metadata.json"), (SETTINGS_FILE, "settings.json")):
                 if os.path.exists(source_path):
-                    zipf.write(source_path, archive_name)
+                    with open(source_path, 'rb') as src:
+                        writer.add(name, src.read())
             
-            # 最新のバックアップも含める
-            backup_info = get_backup_info()
-            if backup_info:
-                latest_backup = backup_info[0]
-                zipf.write(latest_backup['path'], f"backup_{latest_backup['filename']}")
+            manifest = writer.close(data_format=data_format, rows=rows, columns=columns)
         
-        logger.info(f"データエクスポート完了: {export_path}")
+        logger.info(f"データエクスポート完了: {export_path}（{len(manifest['files'])}ファイル / {manifest['codec']}）")
         return True, export_path
         
     except Exception as e:
         logger.error(f"データエクスポートエラー: {e}")
+        if export_path and os.path.exists(export_path):
+            os.remove(export_path)
         return False, str(e)
 
+def _read_package_data(staging_dir, manifest):
+    """検証済みのデータチャンクからDataFrameを組み立てる"""
+    codec = manifest['codec']
+    entries = data_package.data_entries(manifest)
+    if not entries:
+        return None
+    
+    if manifest.get('data_format') == 'arrow':
+        if not COLUMNAR_AVAILABLE:
+            raise ImportError("このパッケージの読み込みには 'pip install pyarrow' が必要です")
+        chunks = (pa.ipc.open_stream(data_package.read_member(staging_dir, entry, codec)).read_all()
+                  for entry in entries)
+        return _stream_chunks_to_frame(staging_dir, chunks)
+    
+    def _pickle_chunks():
+        for entry in entries:
+            yield pickle.loads(data_package.read_member(staging_dir, entry, codec))
+    
+    if len(entries) == 1:
+        return next(_pickle_chunks())
+    if COLUMNAR_AVAILABLE:
+        # pickle形式のチャンクも1つずつArrowに変換して同じファイルに追記する（全チャンクをメモリに並べない）
+        try:
+            schema = None
+            def _as_tables():
+                nonlocal schema
+                for chunk in _pickle_chunks():
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=True)
+                    schema = schema or table.schema
+                    yield table
+            return _stream_chunks_to_frame(staging_dir, _as_tables())
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.warning(f"pickle形式のチャンクをArrowに変換できないため、連結して読み込みます: {e}")
+    
+    return pd.concat(list(_pickle_chunks()))
+
+def _stream_chunks_to_frame(staging_dir, tables):
+    """Arrowテーブルのチャンクを1つずつ非圧縮のArrowファイルに追記し、最後にメモリマップで読み込む"""
+    arrow_path = os.path.join(staging_dir, "data.arrow")
+    writer = None
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pa.ipc.new_file(arrow_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        return None
+    return _read_arrow_frame(arrow_path)
+
+def _read_package_json(staging_dir, manifest, name):
+    entry = data_package.find_entry(manifest, name)
+    if entry is None:
+        return None
+    return json.loads(data_package.read_member(staging_dir, entry, manifest['codec']).decode('utf-8'))
+
+def _import_package(import_path, staging_dir):
+    """tar形式のデータパッケージを検証して取り込む"""
+    manifest = data_package.extract_verified(import_path, staging_dir)
+    
+    saved_data = pickle.loads(
+        data_package.read_member(staging_dir, data_package.find_entry(manifest, "extras.pkl"), manifest['codec'])
+    )
+    saved_data['df'] = _read_package_data(staging_dir, manifest)
+    # 保存日時は取り込み時点に更新（列指向データとメタデータの照合に使うため）
+    saved_data['saved_at'] = datetime.now()
+    saved_data.setdefault('data_source', 'imported')
+    # 取り込んだデータには新しいデータセットバージョンを割り当てる
+    saved_data['dataset_version'] = None
+    
+    metadata = _read_package_json(staging_dir, manifest, "metadata.json") or {}
+    for key in ('last_saved', 'file_size_mb', 'dataset_version', 'dataset_fingerprint'):
+        metadata.pop(key, None)
+    settings = _read_package_json(staging_dir, manifest, "settings.json")
+    
+    if not get_persistence_writer().run(_write_saved_data, saved_data, metadata).result():
+        raise RuntimeError("取り込んだデータの保存に失敗しました")
+    if settings is not None:
+        settings_bytes = json.dumps(settings, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        _atomic_write_file(SETTINGS_FILE, lambda f: f.write(settings_bytes))
+    
+    df = saved_data['df']
+    return len(df) if df is not None else 0
+
+def _import_legacy_zip(import_path):
+    """従来のzip形式パッケージを取り込む（想定外のファイル名は展開しない）"""
+    import zipfile
+    
+    allowed = {"main_data.pkl", "metadata.json", "settings.json"}
+    # 列指向データは取り込み前の保存分なので削除（次回保存時に作り直す）
+    _remove_columnar_data()
+    with zipfile.ZipFile(import_path, 'r') as zipf:
+        for name in zipf.namelist():
+            if name not in allowed:
+                logger.warning(f"インポート対象外のファイルをスキップ: {name}")
+                continue
+            _atomic_write_file(os.path.join(DATA_DIR, name), lambda f, n=name: f.write(zipf.read(n)))
+
 def import_data_package(import_file):
-    """データパッケージのインポート"""
+    """データパッケージのインポート
+    
+    Args:
+        import_file: パッケージのパス（tar形式、または従来のzip形式）
+    """
+    import tempfile
+    import zipfile
+    
+    staging_dir = None
     try:
-        import zipfile
-        
         if not ensure_data_directory():
             return False, "ディレクトリ作成失敗"
         
+        get_persistence_writer().flush()
+        
         # 現在のデータをバックアップ
         create_backup(force_create=True)
         
-        with zipfile.ZipFile(import_file, 'r') as zipf:
-            zipf.extractall(DATA_DIR)
+        if zipfile.is_zipfile(import_file):
+            _import_legacy_zip(import_file)
+            message = "インポート完了"
+        else:
+            staging_dir = tempfile.mkdtemp(prefix="import_", dir=DATA_DIR)
+            rows = _import_package(import_file, staging_dir)
+            message = f"インポート完了（{rows:,}件・チェックサム検証済み）"
         
         # セッション状態をクリア（Streamlit環境の場合のみ）
-        if hasattr(st, 'session_state'):
+        if _has_session_state():
             keys_to_clear = ['processed_df', 'target_dict', 'latest_date', 'data_source', 'data_metadata',
                             'current_unified_filter_config', 'performance_metrics',
                             'validation_results', 'all_results']
@@ -566,16 +1186,19 @@ def import_data_package(import_file):
                 if key in st.session_state:
                     del st.session_state[key]
         
-        logger.info("データインポート完了")
-        return True, "インポート完了"
+        logger.info(f"データインポート完了: {message}")
+        return True, message
         
     except Exception as e:
         logger.error(f"データインポートエラー: {e}")
         return False, f"インポートエラー: {e}"
+    finally:
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
 def toggle_auto_load(enabled=True):
     """自動読み込み機能の有効/無効切り替え"""
-    if hasattr(st, 'session_state'):
+    if _has_session_state():
         st.session_state['disable_auto_load'] = not enabled
         return not st.session_state.get('disable_auto_load', False)
     return enabled
\ No newline at end of file
@@ -0,0 +1,171 @@
+# data_processing/dataset_version.py
+"""
+データセットのバージョン管理
+- 取り込み・読み込み・復元のたびに、データセットへ単調増加のバージョンと内容フィンガープリントを割り当てる
+- 期間・診療科で絞り込んだDataFrameは「元データのバージョン + 絞り込み条件」で識別する
+- 分析キャッシュ（st.cache_data・期間キャッシュ）はDataFrame全体をハッシュせず、このトークンをキーにする
+  → データが差し替わればトークンが変わり、キャッシュは自動的に無効になる
+"""
+import hashlib
+import logging
+import pickle
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def compute_fingerprint(df: pd.DataFrame) -> str:
+    """DataFrameの内容フィンガープリント（取り込み時に一度だけ計算する）"""
+    digest = hashlib.sha256()
+    digest.update(repr(df.shape).encode('utf-8'))
+    digest.update(_schema(df).encode('utf-8'))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # ハッシュ化できない値（リスト等）を含む列はシリアライズ結果で代用
+        digest.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()[:16]
+
+
+def _schema(df: pd.DataFrame) -> str:
+    """列名と型（列の追加・型変換を検出するための軽量な要約）"""
+    return repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()])
+
+
+class DatasetVersionRegistry:
+    """DataFrameとデータセットバージョンの対応表（プロセス内で共有）
+
+    DataFrameはハッシュ不可のため id() をキーにし、弱参照が消えた時点で登録を削除する。
+    トークンには行数・列構成の要約を含め、登録後に列が追加・変更された場合は別物として扱う。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._entries: Dict[int, Any] = {}
+        self._seed_provider: Optional[Callable[[], Optional[int]]] = None
+
+    def set_seed_provider(self, provider: Callable[[], Optional[int]]) -> None:
+        """保存済みの最新バージョンを返す関数を設定（初回の採番前に一度だけ呼ぶ）"""
+        self._seed_provider = provider
+
+    def observe(self, version: Optional[int]) -> None:
+        """保存済みメタデータのバージョンを通知（以降の採番をそれより大きくする）"""
+        if version is None:
+            return
+        with self._lock:
+            self._counter = max(self._counter, int(version))
+
+    def next_version(self, base_version: Optional[int] = None) -> int:
+        provider, self._seed_provider = self._seed_provider, None
+        if provider is not None:
+            try:
+                self.observe(provider())
+            except Exception as e:
+                logger.warning(f"保存済みデータセットバージョンの取得エラー: {e}")
+        with self._lock:
+            self._counter = max(self._counter, int(base_version or 0)) + 1
+            return self._counter
+
+    def assign(self, df: pd.DataFrame, fingerprint: Optional[str] = None,
+               version: Optional[int] = None, source: str = "unknown") -> Dict[str, Any]:
+        """
+        データセットとして登録し、バージョン情報を返す
+
+        Args:
+            fingerprint: 計算済みのフィンガープリント（保存時のメタデータ等。省略時は計算する）
+            version: 既存のバージョン（保存データの読み込み時。省略時は新しく採番する）
+        """
+        if version is None:
+            version = self.next_version()
+        else:
+            self.observe(version)
+        info = {
+            'version': int(version),
+            'fingerprint': fingerprint or compute_fingerprint(df),
+            'source': source,
+            'assigned_at': datetime.now().isoformat(),
+        }
+        self._register(df, info)
+        logger.info(f"データセットバージョン割り当て: v{info['version']} ({info['fingerprint']}, {source})")
+        return info
+
+    def derive(self, df: pd.DataFrame, parent: pd.DataFrame, *params: Any) -> Optional[str]:
+        """絞り込み結果を「元データ + 条件」で登録（元データが未登録なら何もしない）"""
+        parent_token = self.token(parent)
+        if parent_token is None or df is parent:
+            return parent_token
+        info = dict(self.info(parent))
+        info['derivation'] = f"{parent_token}|{params!r}"
+        self._register(df, info)
+        return self.token(df)
+
+    def _register(self, df: pd.DataFrame, info: Dict[str, Any]) -> None:
+        key = id(df)
+        info = dict(info, shape=df.shape, schema=_schema(df))
+        with self._lock:
+            self._entries[key] = (weakref.ref(df, lambda _ref, key=key: self._discard(key, _ref)), info)
+
+    def _discard(self, key: int, ref) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def info(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """登録済みのバージョン情報（未登録・登録後に変更された場合はNone）"""
+        with self._lock:
+            entry = self._entries.get(id(df))
+        if entry is None or entry[0]() is not df:
+            return None
+        info = entry[1]
+        if info['shape'] != df.shape or info['schema'] != _schema(df):
+            return None
+        return info
+
+    def token(self, df: pd.DataFrame) -> Optional[str]:
+        """キャッシュキー用のトークン"""
+        info = self.info(df)
+        if info is None:
+            return None
+        digest = hashlib.sha256(f"{info['schema']}{info.get('derivation', '')}".encode('utf-8')).hexdigest()[:16]
+        return f"v{info['version']}:{info['fingerprint']}:{df.shape[0]}:{digest}"
+
+
+_registry = DatasetVersionRegistry()
+
+
+def get_registry() -> DatasetVersionRegistry:
+    return _registry
+
+
+def assign_version(df: pd.DataFrame, fingerprint: Optional[str] = None,
+                   version: Optional[int] = None, source: str = "unknown") -> Dict[str, Any]:
+    return _registry.assign(df, fingerprint, version, source)
+
+
+def derive_version(df: pd.DataFrame, parent: pd.DataFrame, *params: Any) -> Optional[str]:
+    return _registry.derive(df, parent, *params)
+
+
+def get_version_info(df: Optional[pd.DataFrame]) -> Optional[Dict[str, Any]]:
+    if df is None:
+        return None
+    return _registry.info(df)
+
+
+def dataset_token(df: pd.DataFrame) -> str:
+    """st.cache_data の hash_funcs 用（未登録のDataFrameは内容フィンガープリントで代用）"""
+    token = _registry.token(df)
+    if token is None:
+        token = f"fp:{compute_fingerprint(df)}"
+    return token
+
+
+# @st.cache_data(hash_funcs=DATAFRAME_HASH_FUNCS) で DataFrame引数をトークンで識別する
+DATAFRAME_HASH_FUNCS = {pd.DataFrame: dataset_token}
@@ -2,12 +2,13 @@
 import pandas as pd
 import streamlit as st
 from utils import date_helpers
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS, assign_version, compute_fingerprint
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=3600, hash_funcs=DATAFRAME_HASH_FUNCS)
 def preprocess_dataframe(df):
     """
     データフレームに対して、アプリケーションで必要な前処理を一度にすべて実行する。
-    この関数はキャッシュされ、同じデータフレームに対しては再実行されない。
+    この関数はデータセットバージョンをキーにキャッシュされ、同じデータに対しては再実行されない。
     """
     if df.empty:
         return df
@@ -36,7 +37,7 @@ def preprocess_dataframe(df):
     else:
         df['is_gas_20min'] = False
 
-    df['is_weekday'] = df['手術実施日_dt'].apply(date_helpers.is_weekday)
+    df['is_weekday'] = date_helpers.weekday_mask(df['手術実施日_dt'])
     df['fiscal_year'] = df['手術実施日_dt'].apply(date_helpers.get_fiscal_year)
     df['month_start'] = df['手術実施日_dt'].dt.to_period('M').apply(lambda r: r.start_time)
     df['week_start'] = (df['手術実施日_dt'] - pd.to_timedelta(df['手術実施日_dt'].dt.dayofweek, unit='d')).dt.normalize()
@@ -79,7 +80,12 @@ def load_and_merge_files(base_file, update_files):
 
     # 全データを結合してから一度だけ前処理を実行
     combined_df = pd.concat([df_base] + update_dfs, ignore_index=True)
+    # 取り込み時に一度だけ内容フィンガープリントを計算し、以降のキャッシュはバージョンで識別する
+    fingerprint = compute_fingerprint(combined_df)
+    info = assign_version(combined_df, fingerprint=fingerprint, source='file_upload')
     processed_df = preprocess_dataframe(combined_df)
     processed_df.sort_values(by="手術実施日_dt", inplace=True)
 
-    return processed_df.reset_index(drop=True)
\ No newline at end of file
+    processed_df = processed_df.reset_index(drop=True)
+    assign_version(processed_df, fingerprint=fingerprint, version=info['version'], source='file_upload')
+    return processed_df
\ No newline at end of file
@@ -0,0 +1,161 @@
+# plotting/downsample.py
+"""
+時系列グラフの間引き（ダウンサンプリング）
+- LTTB（Largest-Triangle-Three-Buckets）または区間ごとの最小・最大値で、見た目の山谷を保ったまま点数を減らす
+- 系列ごとに「点数が 予算, 2×予算, 4×予算, … の間引き結果」のピラミッドを一度だけ作成してキャッシュし、
+  表示範囲を狭めたときは範囲内の点数が予算を満たす細かい段を切り出して返す
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import style_config as sc
+from plotting.figure_cache import data_key
+
+logger = logging.getLogger(__name__)
+
+PYRAMID_CACHE_SIZE = 32
+METHODS = ("lttb", "minmax")
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    """日時は経過ナノ秒に変換して数値として扱う"""
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """LTTBで残す点の位置（先頭・末尾は必ず残す。x は昇順）"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    # 先頭・末尾を除いた区間を n_out - 2 個のバケットに分ける
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # 直前に選んだ点・次のバケットの平均点と作る三角形の面積が最大の点を選ぶ
+        area = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """区間ごとの最小値・最大値の点の位置（先頭・末尾は必ず残す）"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    buckets = max(1, (n_out - 2) // 2)
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    picked = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        segment = np.nan_to_num(y[start:end], nan=np.nanmean(y) if np.isfinite(y).any() else 0.0)
+        picked.append(start + int(np.argmin(segment)))
+        picked.append(start + int(np.argmax(segment)))
+    return np.unique(picked)
+
+
+_SELECTORS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+
+class SeriesPyramid:
+    """1系列の多段間引き結果（粗い段から順に 予算, 2×予算, … 点。最も細かい段は元データ）"""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, budget: int, method: str = "lttb"):
+        order = np.argsort(x, kind='stable')
+        self.x = np.asarray(x)[order]
+        self.y = np.asarray(y)[order]
+        self.budget = max(3, int(budget))
+        select = _SELECTORS[method]
+
+        self.levels = []
+        size = self.budget
+        while size < len(self.y):
+            self.levels.append(select(self.x, self.y, size))
+            size *= 2
+        self.levels.append(np.arange(len(self.y)))
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def view(self, start: Any = None, end: Any = None) -> np.ndarray:
+        """表示範囲 [start, end] の点の位置（範囲内の点数が予算を満たす最も粗い段。範囲外の隣接点を1つずつ含む）"""
+        for level in self.levels:
+            level_x = self.x[level]
+            lo = 0 if start is None else int(np.searchsorted(level_x, np.asarray(start, dtype=level_x.dtype), side='left'))
+            hi = len(level_x) if end is None else int(np.searchsorted(level_x, np.asarray(end, dtype=level_x.dtype), side='right'))
+            if hi - lo >= self.budget or level is self.levels[-1]:
+                return level[max(0, lo - 1):min(len(level), hi + 1)]
+        return self.levels[-1]
+
+
+_pyramids: "OrderedDict[tuple, SeriesPyramid]" = OrderedDict()
+_pyramids_lock = threading.Lock()
+
+
+def get_pyramid(x: pd.Series, y: pd.Series, budget: int, method: str = "lttb") -> SeriesPyramid:
+    """系列のピラミッド（系列の内容ハッシュ・予算・方式ごとにキャッシュ）"""
+    key = (data_key(x, y), budget, method)
+    with _pyramids_lock:
+        pyramid = _pyramids.get(key)
+        if pyramid is not None:
+            _pyramids.move_to_end(key)
+            return pyramid
+
+    pyramid = SeriesPyramid(x.to_numpy(), y.to_numpy(), budget, method)
+    with _pyramids_lock:
+        _pyramids[key] = pyramid
+        while len(_pyramids) > PYRAMID_CACHE_SIZE:
+            _pyramids.popitem(last=False)
+    logger.debug(f"間引きピラミッド作成: {len(pyramid):,}点 / {len(pyramid.levels)}段")
+    return pyramid
+
+
+def downsample_frame(df: pd.DataFrame, x_col: str, y_col: str,
+                     budget: Optional[int] = None, start: Any = None, end: Any = None,
+                     group_col: Optional[str] = None, method: str = "lttb") -> pd.DataFrame:
+    """
+    系列（group_col 指定時はグループごと）を表示範囲・点数予算に合わせて間引いたDataFrame
+
+    Args:
+        budget: 1系列あたりの最大点数の目安（省略時は style_config.DOWNSAMPLE_POINT_BUDGET）
+        start, end: 表示範囲（省略時は全体）
+    """
+    budget = budget or sc.DOWNSAMPLE_POINT_BUDGET
+    groups = df.groupby(group_col, sort=False) if group_col else [(None, df)]
+
+    frames = []
+    for name, group in groups:
+        pyramid = get_pyramid(group[x_col], group[y_col], budget, method)
+        positions = pyramid.view(start, end)
+        frame = pd.DataFrame({x_col: pyramid.x[positions], y_col: pyramid.y[positions]})
+        if group_col:
+            frame[group_col] = name
+        frames.append(frame)
+    if not frames:
+        return df.iloc[0:0][[x_col, y_col] + ([group_col] if group_col else [])]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,120 @@
+# plotting/figure_cache.py
+"""
+グラフ（Plotly Figure）のキャッシュ
+- 「グラフ種別 × 集計データのハッシュ × 描画パラメータ」をキーに、作成済みのFigureを再利用する
+  （集計データが変わらない限り、再実行のたびにトレースを組み立て直さない）
+- 集計データのハッシュはグラフが実際に使う列だけで計算するため、列を追加しただけのコピーでも同じキーになる
+- 返されるFigureは複数の画面で共有されるため、呼び出し側で変更しないこと
+- 点数の多い系列は WebGL（Scattergl）で描画する（閾値は style_config.WEBGL_POINT_THRESHOLD）
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from config import style_config as sc
+
+logger = logging.getLogger(__name__)
+
+FIGURE_CACHE_SIZE = 64
+
+
+def data_key(*objects: Any, columns: Optional[Iterable[str]] = None) -> str:
+    """
+    集計データ（DataFrame/Series、またはその辞書）の内容ハッシュ
+
+    Args:
+        columns: DataFrameのうちハッシュに含める列（グラフが使う列。存在しない列は無視）
+    """
+    digest = hashlib.sha256()
+    columns = list(columns) if columns is not None else None
+    for obj in objects:
+        if isinstance(obj, dict):
+            for name, value in obj.items():
+                digest.update(repr(name).encode('utf-8'))
+                _update_digest(digest, value, columns)
+        else:
+            _update_digest(digest, obj, columns)
+    return digest.hexdigest()[:16]
+
+
+def _update_digest(digest, obj: Any, columns: Optional[list]) -> None:
+    if isinstance(obj, pd.DataFrame) and columns is not None:
+        obj = obj[[col for col in columns if col in obj.columns]]
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        digest.update(repr(obj.shape).encode('utf-8'))
+        digest.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode('utf-8'))
+        try:
+            digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:
+            digest.update(obj.to_json(date_format='iso', default_handler=str).encode('utf-8'))
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+
+
+class FigureCache:
+    """作成済みFigureのLRUキャッシュ（プロセス内で共有）"""
+
+    def __init__(self, max_entries: int = FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._figures: "OrderedDict[Hashable, go.Figure]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                return fig
+
+        fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self) -> None:
+        with self._lock:
+            self._figures.clear()
+
+
+_cache = FigureCache()
+
+
+def cached_figure(kind: str, key_data: str, params: tuple, build: Callable[[], go.Figure]) -> go.Figure:
+    """
+    作成済みのFigureを返す（未作成なら build() で作成して保存）
+
+    Args:
+        kind: グラフ種別（関数名など）
+        key_data: data_key() で計算した集計データのハッシュ
+        params: タイトル・目標値など、描画結果に影響するパラメータ
+    """
+    try:
+        key = (kind, key_data, params)
+        hash(key)
+    except TypeError:
+        key = (kind, key_data, repr(params))
+    return _cache.get_or_build(key, build)
+
+
+def clear_figure_cache() -> None:
+    _cache.clear()
+
+
+def scatter_class(n_points: int):
+    """点数に応じた散布図トレースのクラス（閾値を超えたら Scattergl）"""
+    return go.Scattergl if n_points > sc.WEBGL_POINT_THRESHOLD else go.Scatter
+
+
+def as_array(values: Any) -> np.ndarray:
+    """トレース用の配列（タイムゾーン付き日時はPlotlyと同じくローカル時刻として扱う）"""
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_localize(None)
+    return np.asarray(values)
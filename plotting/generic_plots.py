@@ -5,6 +5,8 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 
+from plotting.figure_cache import cached_figure, data_key, scatter_class
+
 def display_kpi_metrics(kpi_summary):
     """
     KPIサマリーをStreamlitで表示する
@@ -30,6 +32,10 @@ def plot_achievement_ranking(ranking_data):
     if ranking_data.empty:
         return go.Figure()
     
+    key = data_key(ranking_data, columns=['達成率(%)', '診療科'])
+    return cached_figure('achievement_ranking', key, (), lambda: _build_achievement_ranking(ranking_data))
+
+def _build_achievement_ranking(ranking_data):
     # 達成率でソート
     sorted_data = ranking_data.sort_values('達成率(%)', ascending=True)
     
@@ -67,6 +73,11 @@ def plot_surgeon_ranking(surgeon_summary, top_n, department_name):
     if surgeon_summary.empty:
         return go.Figure()
     
+    key = data_key(surgeon_summary.head(top_n))
+    return cached_figure('surgeon_ranking', key, (top_n, department_name),
+                         lambda: _build_surgeon_ranking(surgeon_summary, top_n, department_name))
+
+def _build_surgeon_ranking(surgeon_summary, top_n, department_name):
     # 上位N人を選択
     top_surgeons = surgeon_summary.head(top_n)
     
@@ -129,6 +140,9 @@ def create_forecast_chart(result_df, title):
     if result_df.empty:
         return go.Figure()
     
+    return cached_figure('forecast', data_key(result_df), (title,), lambda: _build_forecast_chart(result_df, title))
+
+def _build_forecast_chart(result_df, title):
     fig = go.Figure()
     
     # データ構造を確認して実績・予測を分離
@@ -180,7 +194,7 @@ def create_forecast_chart(result_df, title):
     
     # 実績データのプロット
     if not actual_df.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_class(len(actual_df))(
             x=actual_df[actual_date_col], 
             y=actual_df[value_col], 
             name='実績',
@@ -191,7 +205,7 @@ def create_forecast_chart(result_df, title):
     
     # 予測データのプロット
     if not forecast_df.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_class(len(forecast_df))(
             x=forecast_df[forecast_date_col], 
             y=forecast_df[value_col], 
             name='予測',
@@ -390,11 +404,15 @@ def create_validation_chart(train_data, test_data, predictions):
     """
     モデル検証結果のグラフを作成
     """
+    key = data_key(train_data, test_data, predictions)
+    return cached_figure('validation', key, (), lambda: _build_validation_chart(train_data, test_data, predictions))
+
+def _build_validation_chart(train_data, test_data, predictions):
     fig = go.Figure()
     
     # 訓練データ
     if not train_data.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_class(len(train_data))(
             x=train_data.index,
             y=train_data.values,
             name='訓練データ',
@@ -404,7 +422,7 @@ def create_validation_chart(train_data, test_data, predictions):
     
     # テストデータ（実績）
     if not test_data.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_class(len(test_data))(
             x=test_data.index,
             y=test_data.values,
             name='テストデータ（実績）',
@@ -415,7 +433,7 @@ def create_validation_chart(train_data, test_data, predictions):
     # 予測データ
     for model_name, pred_data in predictions.items():
         if not pred_data.empty:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(scatter_class(len(pred_data))(
                 x=pred_data.index,
                 y=pred_data.values,
                 name=f'予測（{model_name}）',
@@ -440,10 +458,15 @@ def plot_cumulative_cases_chart(cumulative_data, title):
     if cumulative_data.empty:
         return go.Figure()
     
+    key = data_key(cumulative_data, columns=['週', '累積実績', '累積目標'])
+    return cached_figure('cumulative_cases', key, (title,), lambda: _build_cumulative_cases_chart(cumulative_data, title))
+
+def _build_cumulative_cases_chart(cumulative_data, title):
+    line_class = scatter_class(len(cumulative_data))
     fig = go.Figure()
     
     # 累積実績
-    fig.add_trace(go.Scatter(
+    fig.add_trace(line_class(
         x=cumulative_data['週'],
         y=cumulative_data['累積実績'],
         name='累積実績',
@@ -453,7 +476,7 @@ def plot_cumulative_cases_chart(cumulative_data, title):
     ))
     
     # 累積目標
-    fig.add_trace(go.Scatter(
+    fig.add_trace(line_class(
         x=cumulative_data['週'],
         y=cumulative_data['累積目標'],
         name='累積目標',
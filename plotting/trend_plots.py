@@ -3,83 +3,71 @@ import plotly.graph_objects as go
 import numpy as np
 from config import style_config as sc
 from config.hospital_targets import HospitalTargets
+from plotting.figure_cache import as_array, cached_figure, data_key, scatter_class
 
-def _add_common_traces(fig, summary_df, y_col, target_value, target_label):
-    """グラフに共通の要素（目標線、平均線など）を追加するヘルパー関数"""
+def _add_common_traces(fig, x, y, target_value, target_label):
+    """グラフに共通の要素（目標線、平均線など）を追加するヘルパー関数（x は各トレースで共有）"""
+    line_class = scatter_class(len(x))
     if target_value is not None:
         warning_threshold = target_value * 0.95
+        target_line = np.full(len(x), target_value, dtype=float)
         # 注意ゾーン
-        fig.add_trace(go.Scatter(x=summary_df.iloc[:, 0], y=[target_value] * len(summary_df), mode='lines', line=dict(width=0), showlegend=False))
-        fig.add_trace(go.Scatter(x=summary_df.iloc[:, 0], y=[warning_threshold] * len(summary_df), mode='lines', line=dict(width=0), fill='tonexty', fillcolor=sc.WARNING_ZONE_FILL, showlegend=False))
+        fig.add_trace(line_class(x=x, y=target_line, mode='lines', line=dict(width=0), showlegend=False))
+        fig.add_trace(line_class(x=x, y=np.full(len(x), warning_threshold, dtype=float), mode='lines', line=dict(width=0), fill='tonexty', fillcolor=sc.WARNING_ZONE_FILL, showlegend=False))
         # 目標ライン
-        fig.add_trace(go.Scatter(x=summary_df.iloc[:, 0], y=[target_value] * len(summary_df), mode='lines', name=f"目標 ({target_value:.1f} {target_label})", line=sc.TARGET_LINE_STYLE))
+        fig.add_trace(line_class(x=x, y=target_line, mode='lines', name=f"目標 ({target_value:.1f} {target_label})", line=sc.TARGET_LINE_STYLE))
 
     # 期間平均
-    period_avg = summary_df[y_col].mean()
-    fig.add_trace(go.Scatter(x=summary_df.iloc[:, 0], y=[period_avg] * len(summary_df), mode='lines', name=f'期間平均 ({period_avg:.1f})', line=sc.AVERAGE_LINE_STYLE))
+    period_avg = np.nanmean(y) if len(y) else np.nan
+    fig.add_trace(line_class(x=x, y=np.full(len(x), period_avg, dtype=float), mode='lines', name=f'期間平均 ({period_avg:.1f})', line=sc.AVERAGE_LINE_STYLE))
 
-def create_weekly_summary_chart(summary_df, title, target_dict):
-    """病院全体の週次サマリーグラフを作成"""
-    fig = go.Figure()
+def _summary_chart(kind, summary_df, x_col, y_col, trace_type, trace_name, target_value, target_label,
+                   title, xaxis_title, yaxis_title):
+    """集計データの推移グラフ（グラフが使う列のハッシュ・パラメータでキャッシュ）"""
     if summary_df.empty:
-        return fig.update_layout(title="グラフデータがありません")
+        return go.Figure().update_layout(title="グラフデータがありません")
+
+    def build():
+        fig = go.Figure()
+        x = as_array(summary_df[x_col])
+        y = summary_df[y_col].to_numpy(dtype=float)
+        if trace_type == 'bar':
+            fig.add_trace(go.Bar(x=x, y=y, name=trace_name, marker_color=sc.PRIMARY_COLOR, opacity=0.8))
+        else:
+            fig.add_trace(scatter_class(len(x))(x=x, y=y, mode='lines+markers', name=trace_name, line=dict(color=sc.PRIMARY_COLOR), marker=sc.PRIMARY_MARKER))
+        _add_common_traces(fig, x, y, target_value, target_label)
+        fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title, **sc.LAYOUT_DEFAULTS)
+        return fig
 
-    y_col = '平日1日平均件数'
-    fig.add_trace(go.Scatter(x=summary_df['週'], y=summary_df[y_col], mode='lines+markers', name='平日1日平均', line=dict(color=sc.PRIMARY_COLOR), marker=sc.PRIMARY_MARKER))
-    
+    key = data_key(summary_df, columns=[x_col, y_col])
+    return cached_figure(kind, key, (title, target_value), build)
+
+def create_weekly_summary_chart(summary_df, title, target_dict):
+    """病院全体の週次サマリーグラフを作成"""
     # 🔧 修正：病院全体目標を設定ファイルから取得
     hospital_daily_target = HospitalTargets.get_daily_target('weekday_gas_surgeries')
-    _add_common_traces(fig, summary_df, y_col, hospital_daily_target, "件/日")
-
-    fig.update_layout(title=title, xaxis_title="週 (月曜始まり)", yaxis_title="平日1日平均件数", **sc.LAYOUT_DEFAULTS)
-    return fig
+    return _summary_chart('weekly_summary', summary_df, '週', '平日1日平均件数', 'line', '平日1日平均',
+                          hospital_daily_target, "件/日", title, "週 (月曜始まり)", "平日1日平均件数")
 
 def create_weekly_dept_chart(summary_df, dept_name, target_dict):
     """診療科別の週次グラフを作成"""
-    fig = go.Figure()
-    if summary_df.empty:
-        return fig.update_layout(title="グラフデータがありません")
-    
-    y_col = '週合計件数'
-    fig.add_trace(go.Scatter(x=summary_df['週'], y=summary_df[y_col], mode='lines+markers', name='週合計', line=dict(color=sc.PRIMARY_COLOR), marker=sc.PRIMARY_MARKER))
-    
     # 診療科別は元のまま（target_dictから取得）
     target_value = target_dict.get(dept_name)
-    _add_common_traces(fig, summary_df, y_col, target_value, "件/週")
-    
-    fig.update_layout(title=f"{dept_name} 週次推移", xaxis_title="週 (月曜始まり)", yaxis_title="週合計件数", **sc.LAYOUT_DEFAULTS)
-    return fig
+    return _summary_chart('weekly_dept', summary_df, '週', '週合計件数', 'line', '週合計',
+                          target_value, "件/週", f"{dept_name} 週次推移", "週 (月曜始まり)", "週合計件数")
 
 def create_monthly_summary_chart(summary_df, title, target_dict):
     """病院全体の月次グラフを作成"""
-    fig = go.Figure()
-    if summary_df.empty:
-        return fig.update_layout(title="グラフデータがありません")
-
-    y_col = '平日1日平均件数'
-    fig.add_trace(go.Scatter(x=summary_df['月'], y=summary_df[y_col], mode='lines+markers', name='平日1日平均', line=dict(color=sc.PRIMARY_COLOR), marker=sc.PRIMARY_MARKER))
-
     # 🔧 修正：病院全体目標を設定ファイルから取得
     hospital_daily_target = HospitalTargets.get_daily_target('weekday_gas_surgeries')
-    _add_common_traces(fig, summary_df, y_col, hospital_daily_target, "件/日")
-    
-    fig.update_layout(title=title, xaxis_title="月", yaxis_title="平日1日平均件数", **sc.LAYOUT_DEFAULTS)
-    return fig
+    return _summary_chart('monthly_summary', summary_df, '月', '平日1日平均件数', 'line', '平日1日平均',
+                          hospital_daily_target, "件/日", title, "月", "平日1日平均件数")
 
 def create_quarterly_summary_chart(summary_df, title, target_dict):
     """病院全体の四半期グラフ（棒グラフ）を作成"""
-    fig = go.Figure()
-    if summary_df.empty:
-        return fig.update_layout(title="グラフデータがありません")
-        
-    y_col = '平日1日平均件数'
-    fig.add_trace(go.Bar(x=summary_df['四半期ラベル'], y=summary_df[y_col], name='平日1日平均', marker_color=sc.PRIMARY_COLOR, opacity=0.8))
-    
     # 🔧 修正：病院全体目標を設定ファイルから取得
     hospital_daily_target = HospitalTargets.get_daily_target('weekday_gas_surgeries')
-    _add_common_traces(fig, summary_df, y_col, hospital_daily_target, "件/日")
-    
-    fig.update_layout(title=title, xaxis_title="四半期", yaxis_title="平日1日平均件数", **sc.LAYOUT_DEFAULTS)
-    return fig
+    return _summary_chart('quarterly_summary', summary_df, '四半期ラベル', '平日1日平均件数', 'bar', '平日1日平均',
+                          hospital_daily_target, "件/日", title, "四半期", "平日1日平均件数")
 
-# 診療科別の月次・四半期グラフも同様にここに追加可能
\ No newline at end of file
+# 診療科別の月次・四半期グラフも同様にここに追加可能
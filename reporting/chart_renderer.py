@@ -0,0 +1,165 @@
+# reporting/chart_renderer.py
+"""
+Plotlyグラフの画像化サービス（PDF出力用）
+- 画像変換エンジン（Kaleido）をプロセス内で常駐させて使い回す
+- 複数グラフはスレッドプールでまとめて変換する
+- 変換結果は「グラフJSONのハッシュ + サイズ」をキーにディスクへキャッシュし、
+  内容が変わらないグラフは再描画しない
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_DIR = os.path.join("saved_data", "chart_cache")
+DEFAULT_RENDER_WORKERS = 4
+MAX_CACHE_FILES = 500
+
+RenderFunc = Callable[..., bytes]
+
+
+def _start_persistent_renderer() -> None:
+    """Kaleidoを常駐させる（v1系はChromeを起動したままにする。0.2系はscopeが自動で常駐する）"""
+    try:
+        import kaleido
+        start_sync_server = getattr(kaleido, "start_sync_server", None)
+        if start_sync_server is not None:
+            start_sync_server(silence_warnings=True)
+    except ImportError:
+        logger.warning("kaleidoが利用できません。グラフの画像化には 'pip install kaleido' が必要です")
+    except Exception as e:
+        logger.debug(f"Kaleido常駐プロセスの起動をスキップしました: {e}")
+
+
+def _render_with_plotly(fig, fmt: str, width: int, height: int, scale: float) -> bytes:
+    return pio.to_image(fig, format=fmt, width=width, height=height, scale=scale)
+
+
+class ChartRasterizer:
+    """グラフ画像化サービス（常駐レンダラー + スレッドプール + ディスクキャッシュ）"""
+
+    def __init__(self, cache_dir: str = CHART_CACHE_DIR, max_workers: int = DEFAULT_RENDER_WORKERS,
+                 render_func: Optional[RenderFunc] = None):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self._render_func = render_func or _render_with_plotly
+        self._renderer_started = render_func is not None
+        self._lock = threading.Lock()
+
+    def _ensure_renderer(self) -> None:
+        with self._lock:
+            if not self._renderer_started:
+                _start_persistent_renderer()
+                self._renderer_started = True
+
+    @staticmethod
+    def cache_key(fig, fmt: str, width: int, height: int, scale: float) -> str:
+        """グラフJSONと出力サイズからキャッシュキーを作成"""
+        digest = hashlib.sha256(fig.to_json().encode("utf-8"))
+        digest.update(f"|{fmt}|{width}x{height}@{scale}".encode("ascii"))
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def _read_cache(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 最近使ったものを残すため更新日時を更新
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"グラフキャッシュ読み込みエラー: {e}")
+            return None
+
+    def _write_cache(self, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"グラフキャッシュ保存エラー: {e}")
+
+    def to_image(self, fig, width: int = 700, height: int = 350, scale: float = 1.0,
+                 fmt: str = "png") -> Optional[bytes]:
+        """グラフを画像のバイト列に変換（キャッシュがあれば再描画しない）"""
+        if fig is None:
+            return None
+
+        path = self._cache_path(self.cache_key(fig, fmt, width, height, scale), fmt)
+        cached = self._read_cache(path)
+        if cached is not None:
+            return cached
+
+        self._ensure_renderer()
+        data = self._render_func(fig, fmt=fmt, width=width, height=height, scale=scale)
+        self._write_cache(path, data)
+        return data
+
+    def to_images(self, figures: Dict[str, object], width: int = 700, height: int = 350,
+                  scale: float = 1.0, fmt: str = "png") -> Dict[str, Optional[bytes]]:
+        """
+        複数グラフをスレッドプールでまとめて画像化
+
+        Returns:
+            {グラフ名: 画像バイト列}（変換に失敗したグラフはNone）
+        """
+        if not figures:
+            return {}
+
+        def _convert(name, fig):
+            try:
+                return self.to_image(fig, width=width, height=height, scale=scale, fmt=fmt)
+            except Exception as e:
+                logger.error(f"グラフ変換エラー ({name}): {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(figures)))) as executor:
+            futures = {name: executor.submit(_convert, name, fig) for name, fig in figures.items()}
+            images = {name: future.result() for name, future in futures.items()}
+
+        self.prune_cache()
+        return images
+
+    def prune_cache(self, max_files: int = MAX_CACHE_FILES) -> int:
+        """キャッシュファイル数が上限を超えたら古いものから削除"""
+        try:
+            if not os.path.isdir(self.cache_dir):
+                return 0
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+            if len(entries) <= max_files:
+                return 0
+
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            removed = 0
+            for entry in entries[:len(entries) - max_files]:
+                os.remove(entry.path)
+                removed += 1
+            logger.info(f"グラフキャッシュを整理しました: {removed}件削除")
+            return removed
+        except Exception as e:
+            logger.warning(f"グラフキャッシュ整理エラー: {e}")
+            return 0
+
+
+_rasterizer: Optional[ChartRasterizer] = None
+_rasterizer_lock = threading.Lock()
+
+
+def get_chart_rasterizer() -> ChartRasterizer:
+    """プロセス共通の画像化サービスを取得"""
+    global _rasterizer
+    with _rasterizer_lock:
+        if _rasterizer is None:
+            _rasterizer = ChartRasterizer()
+        return _rasterizer
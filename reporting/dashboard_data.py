@@ -0,0 +1,187 @@
+# reporting/dashboard_data.py
+"""
+ダッシュボードのデータAPI（JSONデータファイル）
+- KPI・トレンド・ランキング・診療科別パフォーマンスを data/v{バージョン}/*.json として出力する
+- HTMLシェルはデータを埋め込まず、タブ表示時に必要なデータファイルだけを取得して
+  サマリーカード・ランキング・診療科別パフォーマンス・詳細分析・チャートを描画する
+- 出力内容は分析結果だけで決まる（生成日時を含めない）ため、データが同じ週はファイルも変わらない
+"""
+import json
+import logging
+import math
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATA_API_VERSION = 1
+DATA_DIR = f"data/v{DATA_API_VERSION}"
+DATASETS = ("kpi", "trends", "ranking", "performance")
+
+
+def dataset_path(name: str) -> str:
+    """データファイルのサイト内パス"""
+    return f"{DATA_DIR}/{name}.json"
+
+
+def _to_builtin(value: Any) -> Any:
+    """JSONに変換できる組み込み型へ変換（NaNはnull）"""
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _axis_range(values: List[int], fallback_max: int, min_padding: int) -> Dict[str, int]:
+    """Y軸の表示範囲（データに合わせて上下に余白を取る）"""
+    if not values:
+        return {'suggested_min': 0, 'suggested_max': fallback_max}
+    data_min, data_max = min(values), max(values)
+    padding = (data_max - data_min) * 0.15 if (data_max - data_min) > 0 else min_padding
+    return {
+        'suggested_min': int(max(0, data_min - padding)),
+        'suggested_max': int(data_max + padding),
+    }
+
+
+def build_monthly_chart_data(yearly_data: Dict[str, Any], monthly_data: list) -> Optional[Dict[str, Any]]:
+    """月別推移チャートのデータ（当月実績・前年同月・目標ライン）"""
+    if not yearly_data or not monthly_data:
+        return None
+
+    values = [int(item['count']) for item in monthly_data]
+    target_value = int(yearly_data.get('monthly_target', 420))
+    last_year_values = [
+        int(item['last_year_count']) if item.get('last_year_count') is not None else 0
+        for item in monthly_data
+    ]
+
+    plot_values = values + [v for v in last_year_values if v > 0]
+    if target_value:
+        plot_values.append(target_value)
+
+    return {
+        'labels': [item['month_name'] for item in monthly_data],
+        'values': values,
+        # 前年データがない月はnullにしてプロットしない
+        'last_year_values': [v if v > 0 else None for v in last_year_values],
+        'target': target_value,
+        **_axis_range(plot_values, fallback_max=500, min_padding=20),
+    }
+
+
+def build_weekly_chart_data(weekly_data: list) -> Optional[Dict[str, Any]]:
+    """週別推移チャートのデータ（当週実績・目標ライン）"""
+    if not weekly_data:
+        return None
+
+    from analysis.weekly import get_weekly_target_value
+
+    values = [int(item['count']) for item in weekly_data]
+    target_value = get_weekly_target_value()
+
+    return {
+        'labels': [item['week_name'] for item in weekly_data],
+        'values': values,
+        'target': target_value,
+        **_axis_range(values + [target_value], fallback_max=120, min_padding=10),
+    }
+
+
+def build_trend_dataset(yearly_data: Dict[str, Any], monthly_data: list, weekly_data: list) -> Dict[str, Any]:
+    """トレンドデータセット（月別・週別チャート）"""
+    return {
+        'monthly': build_monthly_chart_data(yearly_data, monthly_data),
+        'weekly': build_weekly_chart_data(weekly_data),
+    }
+
+
+def report_date_label(context) -> str:
+    """データ基準日の表示（分析基準日 → データの最新日 の順。
+    生成時刻を使うと内容が同じでも毎日ページが変わり、差分公開でスキップできなくなる）"""
+    report_date = context.analysis_base_date if context.analysis_base_date is not None else context.latest_date
+    if report_date is None:
+        return '-'
+    return pd.Timestamp(report_date).strftime('%Y年%m月%d日')
+
+
+def build_dashboard_datasets(context) -> Dict[str, Any]:
+    """分析コンテキストから全データセットを作成"""
+    try:
+        ranking = [
+            {
+                'department': item['entity_name'],
+                'display_name': item.get('display_name', item['entity_name']),
+                'total_score': item['total_score'],
+                'grade': item.get('grade'),
+                'achievement_rate': item.get('achievement_rate'),
+                'improvement_rate': item.get('improvement_rate'),
+                'hospital_rank': item.get('hospital_rank'),
+                'target_score': item.get('target_performance', {}).get('total'),
+                'improvement_score': item.get('improvement_score', {}).get('total'),
+                'stability_score': item.get('improvement_score', {}).get('stability'),
+                'competitive_score': item.get('competitive_score'),
+            }
+            for item in context.high_scores
+        ]
+        performance = context.department_performance
+        start_date, end_date = context.high_score_period
+
+        return {
+            'kpi': {
+                'basic': context.kpi_summary,
+                'recent_week': context.recent_week_kpi,
+                'yearly': context.yearly_comparison,
+                'report_date': report_date_label(context),
+            },
+            'trends': build_trend_dataset(context.yearly_comparison, context.monthly_trend, context.weekly_trend),
+            'ranking': {
+                'period': context.period,
+                'start_date': start_date,
+                'end_date': end_date,
+                'departments': ranking,
+            },
+            'performance': performance.to_dict('records') if not performance.empty else [],
+        }
+    except Exception as e:
+        logger.error(f"データセット作成エラー: {e}")
+        return {}
+
+
+def dataset_payload(name: str, data: Any, data_as_of: Optional[pd.Timestamp] = None) -> Dict[str, Any]:
+    """バージョン情報付きのデータファイル内容"""
+    return {
+        'version': DATA_API_VERSION,
+        'dataset': name,
+        'data_as_of': data_as_of,
+        'data': data,
+    }
+
+
+def dumps_dataset(payload: Dict[str, Any]) -> str:
+    """コンパクトなJSON文字列に変換"""
+    return json.dumps(_to_builtin(payload), ensure_ascii=False, separators=(",", ":"))
+
+
+def export_dataset_files(datasets: Dict[str, Any], data_as_of: Optional[pd.Timestamp] = None) -> Dict[str, str]:
+    """データセットを {サイト内パス: JSON文字列} に変換"""
+    return {
+        dataset_path(name): dumps_dataset(dataset_payload(name, data, data_as_of))
+        for name, data in datasets.items()
+    }
+
+
+def embedded_dataset_html(name: str, data: Any, data_as_of: Optional[pd.Timestamp] = None) -> str:
+    """単一ページ版で使う埋め込みデータブロック（取得処理と同じ形式）"""
+    content = dumps_dataset(dataset_payload(name, data, data_as_of)).replace("</", "<\\/")
+    return f'<script type="application/json" id="dashboard-data-{name}">{content}</script>'
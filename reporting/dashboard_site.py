@@ -0,0 +1,261 @@
+# reporting/dashboard_site.py
+"""
+複数ページ構成の静的ダッシュボードサイト
+- 軽量なindex.html + 診療科ごとのページ（departments/*.html）
+- CSS・JSは assets/ 配下の共有ファイルとして配信し、ブラウザキャッシュを効かせる
+- 診療科ページは共有の分析結果（SurgeryAnalysisContext）から抽出した辞書だけで描画する
+- 静的ホスティング向けに .gz / .br の事前圧縮ファイルを出力できる（brotliは任意）
+"""
+import gzip
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from reporting.html_templates import get_template
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIR = "assets"
+DEPARTMENT_DIR = "departments"
+SHARED_ASSETS = ("surgery_dashboard.css", "surgery_dashboard.js")
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json")
+
+SiteFiles = Dict[str, Union[str, bytes]]
+
+
+def department_page_path(dept_name: str) -> str:
+    """診療科ページのサイト内パス（診療科名のハッシュで固定し、再公開時も同じURLにする）"""
+    slug = hashlib.sha1(dept_name.encode("utf-8")).hexdigest()[:10]
+    return f"{DEPARTMENT_DIR}/dept-{slug}.html"
+
+
+def asset_path(name: str) -> str:
+    return f"{ASSET_DIR}/{name}"
+
+
+def stylesheet_tag(prefix: str = "") -> str:
+    return f'<link rel="stylesheet" href="{prefix}{asset_path("surgery_dashboard.css")}">'
+
+
+def script_tag(prefix: str = "") -> str:
+    return f'<script src="{prefix}{asset_path("surgery_dashboard.js")}"></script>'
+
+
+def build_department_page_data(context) -> List[Dict[str, Any]]:
+    """分析コンテキストから診療科ページ用のデータ（プレーンな辞書）を抽出"""
+    try:
+        performance = context.department_performance
+        if performance.empty:
+            return []
+
+        high_scores = {item['entity_name']: item for item in context.high_scores}
+        weekly_matrix = context.weekly_matrix
+
+        week_starts = []
+        if context.analysis_end_date is not None:
+            from analysis.analysis_context import WEEKLY_TREND_WEEKS
+            week_starts = [
+                (context.analysis_end_date - pd.Timedelta(weeks=WEEKLY_TREND_WEEKS - 1 - i, days=6)).normalize()
+                for i in range(WEEKLY_TREND_WEEKS)
+            ]
+
+        pages = []
+        for row in performance.to_dict('records'):
+            dept = row['診療科']
+            if dept in weekly_matrix.columns:
+                counts = weekly_matrix[dept].reindex(week_starts, fill_value=0)
+            else:
+                counts = pd.Series(0, index=week_starts)
+
+            pages.append({
+                'department': dept,
+                'path': department_page_path(dept),
+                'performance': row,
+                'high_score': high_scores.get(dept),
+                'weekly': [
+                    {
+                        'week_name': f"{start.month}/{start.day}-{(start + pd.Timedelta(days=6)).month}/{(start + pd.Timedelta(days=6)).day}",
+                        'count': int(count),
+                    }
+                    for start, count in counts.items()
+                ],
+            })
+        return pages
+    except Exception as e:
+        logger.error(f"診療科ページデータ抽出エラー: {e}")
+        return []
+
+
+def render_department_page(page: Dict[str, Any], period: str, footer_html: str,
+                           google_analytics_id: Optional[str] = None) -> str:
+    """診療科ページのHTMLを描画（共有CSSは assets/ を参照）"""
+    dept = page['department']
+    row = page['performance']
+    target = row['週次目標']
+
+    ga_script = None
+    if google_analytics_id:
+        ga_script = get_template('ga_script.html').render(google_analytics_id=google_analytics_id)
+
+    return get_template('department_page.html').render(
+        title=dept,
+        period=period,
+        ga_script=ga_script,
+        styles=stylesheet_tag("../"),
+        summary=_department_summary_html(row),
+        high_score=_department_high_score_html(page['high_score'], period),
+        weekly_table=_department_weekly_table_html(page['weekly'], target),
+        footer=footer_html,
+    )
+
+
+def _achievement_class(achievement_rate: float) -> str:
+    if achievement_rate >= 100:
+        return "success"
+    elif achievement_rate >= 90:
+        return "info"
+    elif achievement_rate >= 80:
+        return "warning"
+    return "danger"
+
+
+def _department_summary_html(row: Dict[str, Any]) -> str:
+    achievement_rate = row['達成率(%)']
+    return f"""
+            <div class="summary">
+                <h2>📊 直近4週のパフォーマンス</h2>
+                <div class="summary-stats">
+                    <div class="stat-item">
+                        <div class="stat-value">{row['4週平均']:.1f}件</div>
+                        <div class="stat-label">4週平均</div>
+                    </div>
+                    <div class="stat-item">
+                        <div class="stat-value">{row['直近週実績']}件</div>
+                        <div class="stat-label">直近週実績</div>
+                    </div>
+                    <div class="stat-item">
+                        <div class="stat-value">{row['週次目標']:.1f}件</div>
+                        <div class="stat-label">週次目標</div>
+                    </div>
+                </div>
+            </div>
+            <div class="grid-container">
+                <div class="metric-card {_achievement_class(achievement_rate)}">
+                    <div class="metric-title">🎯 直近週の目標達成率</div>
+                    <div class="achievement-row">
+                        <span>達成率</span>
+                        <span>{achievement_rate:.1f}%</span>
+                    </div>
+                    <div class="progress-bar">
+                        <div class="progress-fill" style="width: {min(achievement_rate, 100)}%;"></div>
+                    </div>
+                </div>
+            </div>
+            """
+
+
+def _department_high_score_html(high_score: Optional[Dict[str, Any]], period: str) -> str:
+    if not high_score:
+        return '<div class="stats-highlight"><p>ハイスコアデータがありません</p></div>'
+
+    improvement_score = high_score.get('improvement_score', {})
+    return f"""
+            <div class="stats-highlight">
+                <h2>🏆 ハイスコア評価</h2>
+                <p>評価期間: {period}</p>
+            </div>
+            <div class="grid-container">
+                <div class="metric-card info">
+                    <div class="metric-title">総合スコア</div>
+                    <div class="metric-row">
+                        <span>スコア（{high_score.get('grade', '-')}）</span>
+                        <span class="metric-value-row">{high_score['total_score']:.0f}点</span>
+                    </div>
+                    <div class="achievement-row">
+                        <span>病院内順位</span>
+                        <span>{high_score.get('hospital_rank', 0)}位</span>
+                    </div>
+                </div>
+                <div class="metric-card success">
+                    <div class="metric-title">📈 改善・継続性</div>
+                    <div class="metric-row">
+                        <span>スコア</span>
+                        <span class="metric-value-row">{improvement_score.get('total', 0):.0f}点</span>
+                    </div>
+                    <div class="achievement-row">
+                        <span>改善度</span>
+                        <span>{high_score.get('improvement_rate', 0):+.1f}%</span>
+                    </div>
+                </div>
+            </div>
+            """
+
+
+def _department_weekly_table_html(weekly: List[Dict[str, Any]], target: float) -> str:
+    rows = []
+    for item in weekly:
+        rate = (item['count'] / target * 100) if target > 0 else 0
+        rows.append(
+            f"<tr><td>{item['week_name']}</td><td>{item['count']}件</td>"
+            f"<td>{target:.1f}件</td><td>{rate:.1f}%</td></tr>"
+        )
+
+    return f"""
+            <div class="trend-chart">
+                <h3>📅 週別推移（全身麻酔手術件数）</h3>
+                <table class="weekly-table">
+                    <thead><tr><th>週</th><th>実績</th><th>目標</th><th>達成率</th></tr></thead>
+                    <tbody>{''.join(rows)}</tbody>
+                </table>
+            </div>
+            """
+
+
+def compress_content(content: Union[str, bytes], formats: Iterable[str] = ("gz", "br")) -> Dict[str, bytes]:
+    """
+    事前圧縮版を作成（拡張子: 圧縮データ）
+
+    gzipはmtime=0で出力し、内容が同じなら同じバイト列になるようにする
+    （差分公開でblobハッシュが変わらないように）
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    compressed = {}
+    for fmt in formats:
+        if fmt == "gz":
+            compressed["gz"] = gzip.compress(data, compresslevel=9, mtime=0)
+        elif fmt == "br":
+            if BROTLI_AVAILABLE:
+                compressed["br"] = brotli.compress(data)
+            else:
+                logger.debug("brotliが利用できないため .br の出力をスキップします")
+    return compressed
+
+
+def add_precompressed_files(files: SiteFiles, formats: Iterable[str] = ("gz", "br")) -> SiteFiles:
+    """HTML・CSS・JSに .gz / .br の事前圧縮ファイルを追加した辞書を返す"""
+    formats = tuple(formats)
+    result = dict(files)
+    for path, content in files.items():
+        if path.endswith(COMPRESSIBLE_EXTENSIONS):
+            for ext, data in compress_content(content, formats).items():
+                result[f"{path}.{ext}"] = data
+    return result
+
+
+def render_department_files(page: Dict[str, Any], period: str, footer_html: str,
+                            google_analytics_id: Optional[str] = None,
+                            compress_formats: Iterable[str] = ()) -> SiteFiles:
+    """診療科ページ1件分のファイル（HTMLと事前圧縮版）を作成（ワーカースレッドで実行）"""
+    html = render_department_page(page, period, footer_html, google_analytics_id)
+    files: SiteFiles = {page['path']: html}
+    for ext, data in compress_content(html, compress_formats).items():
+        files[f"{page['path']}.{ext}"] = data
+    return files
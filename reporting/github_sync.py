@@ -0,0 +1,177 @@
+# reporting/github_sync.py
+"""
+GitHubへの差分公開（コンテンツアドレス方式）
+- 各ファイルのgit blobハッシュを計算し、前回公開時のマニフェストと一致するファイルは送信しない
+- 変更ファイルはGit Trees APIでまとめて1コミットにする
+- HTTP接続はコネクションプール付きのセッションを再利用する
+api_base_url を差し替えることで、ローカルのHTTPスタブサーバーに対しても動作確認できる
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+MANIFEST_FILE = os.path.join("saved_data", "github_publish_manifest.json")
+
+FileContent = Union[str, bytes]
+
+
+def git_blob_sha(content: FileContent) -> str:
+    """gitと同じ方式でblobハッシュ（SHA-1）を計算"""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    header = f"blob {len(data)}\0".encode("ascii")
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def create_github_session(github_token: str, pool_size: int = 10) -> requests.Session:
+    """認証ヘッダー・コネクションプール設定済みのセッションを作成"""
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {github_token}",
+        "Accept": "application/vnd.github.v3+json",
+    })
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class PublishManifest:
+    """公開済みファイルのblobハッシュを保持するマニフェスト（リポジトリ・ブランチ単位）"""
+
+    def __init__(self, path: str = MANIFEST_FILE):
+        self.path = path
+        self._data: Dict[str, Dict[str, str]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"公開マニフェスト読み込みエラー（再作成します）: {e}")
+        return {}
+
+    def get(self, target: str) -> Dict[str, str]:
+        return self._data.get(target, {})
+
+    def update(self, target: str, blob_shas: Dict[str, str]) -> None:
+        self._data.setdefault(target, {}).update(blob_shas)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"公開マニフェスト保存エラー: {e}")
+
+
+class GitHubContentSync:
+    """変更のあったファイルだけをGit Trees APIで1コミットにまとめて公開する"""
+
+    def __init__(self, github_token: str, repo_owner: str, repo_name: str, branch: str = "main",
+                 api_base_url: str = GITHUB_API_URL, session: Optional[requests.Session] = None,
+                 manifest: Optional[PublishManifest] = None):
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.branch = branch
+        self.api_base_url = api_base_url.rstrip("/")
+        self.session = session or create_github_session(github_token)
+        self.manifest = manifest or PublishManifest()
+
+    @property
+    def manifest_key(self) -> str:
+        return f"{self.repo_owner}/{self.repo_name}@{self.branch}"
+
+    def _repo_url(self, path: str) -> str:
+        return f"{self.api_base_url}/repos/{self.repo_owner}/{self.repo_name}/{path}"
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        response = self.session.request(method, self._repo_url(path), timeout=30, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise RuntimeError(f"{method} {path} 失敗 ({response.status_code}): {message}")
+        return response
+
+    def publish(self, files: Dict[str, FileContent], commit_message: Optional[str] = None,
+                force: bool = False) -> Tuple[bool, str, List[str]]:
+        """
+        ファイル群を公開する
+
+        Args:
+            files: {リポジトリ内パス: 内容}
+            commit_message: コミットメッセージ（省略時は日時入り）
+            force: Trueの場合はマニフェストを無視してリモートと比較する
+
+        Returns:
+            (成功可否, メッセージ, 更新したパスのリスト)
+        """
+        try:
+            blob_shas = {path: git_blob_sha(content) for path, content in files.items()}
+
+            # 1. ローカルマニフェストで全ファイル未変更なら通信しない
+            published = self.manifest.get(self.manifest_key)
+            if not force and all(published.get(path) == sha for path, sha in blob_shas.items()):
+                logger.info(f"公開対象{len(files)}件はすべて未変更のためスキップしました")
+                return True, "変更がないため公開をスキップしました", []
+
+            # 2. リモートのツリーと比較し、blobハッシュが異なるファイルだけを送る
+            head_sha = self._request("GET", f"git/ref/heads/{self.branch}").json()["object"]["sha"]
+            base_tree_sha = self._request("GET", f"git/commits/{head_sha}").json()["tree"]["sha"]
+            remote_tree = self._request("GET", f"git/trees/{base_tree_sha}", params={"recursive": "1"}).json()
+            remote_shas = {item["path"]: item["sha"] for item in remote_tree.get("tree", []) if item.get("type") == "blob"}
+
+            changed = [path for path, sha in blob_shas.items() if remote_shas.get(path) != sha]
+            if not changed:
+                self.manifest.update(self.manifest_key, blob_shas)
+                logger.info("リモートと内容が一致しているため公開をスキップしました")
+                return True, "変更がないため公開をスキップしました", []
+
+            # 3. 変更ファイルをまとめて1コミットにする
+            tree_entries = [self._tree_entry(path, files[path]) for path in changed]
+            new_tree_sha = self._request("POST", "git/trees", json={
+                "base_tree": base_tree_sha,
+                "tree": tree_entries,
+            }).json()["sha"]
+
+            message = commit_message or f"Update integrated surgery dashboard - {datetime.now().strftime('%Y/%m/%d %H:%M')}"
+            commit_sha = self._request("POST", "git/commits", json={
+                "message": message,
+                "tree": new_tree_sha,
+                "parents": [head_sha],
+            }).json()["sha"]
+
+            self._request("PATCH", f"git/refs/heads/{self.branch}", json={"sha": commit_sha})
+
+            self.manifest.update(self.manifest_key, blob_shas)
+            logger.info(f"GitHub公開完了: {len(changed)}/{len(files)}件を更新 ({commit_sha[:7]})")
+            return True, f"{len(changed)}件のファイルを更新しました", changed
+
+        except Exception as e:
+            logger.error(f"GitHub差分公開エラー: {e}")
+            return False, str(e), []
+
+    def _tree_entry(self, path: str, content: FileContent) -> Dict[str, str]:
+        """ツリーエントリを作成（テキストは直接埋め込み、バイナリはblobを作成）"""
+        entry = {"path": path, "mode": "100644", "type": "blob"}
+        if isinstance(content, str):
+            entry["content"] = content
+        else:
+            entry["sha"] = self._request("POST", "git/blobs", json={
+                "content": base64.b64encode(content).decode("ascii"),
+                "encoding": "base64",
+            }).json()["sha"]
+        return entry
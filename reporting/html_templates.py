@@ -0,0 +1,124 @@
+# reporting/html_templates.py
+"""
+HTMLテンプレートレジストリ
+- reporting/templates 配下の静的アセット（CSS・JS・固定HTML）をインポート時に一度だけ読み込む
+- .html テンプレートは {{ name }} プレースホルダでリテラル片に分割し、コンパイル済みで保持する
+- 描画はテキストストリームへ片ごとに直接書き込み、ページ全体の中間文字列を作らない
+"""
+import io
+import os
+import re
+import logging
+from typing import Callable, Dict, Iterable, List, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# プレースホルダに渡せる値: 文字列 / 文字列のイテラブル / ストリームへ書き込む関数 / None（空）
+TemplateValue = Union[str, Iterable[str], Callable[[TextIO], None], None]
+
+
+class CompiledTemplate:
+    """リテラル片とプレースホルダ名に分割済みのテンプレート"""
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self._parts = self._compile(source)
+        self.placeholders = frozenset(text for is_placeholder, text in self._parts if is_placeholder)
+
+    @staticmethod
+    def _compile(source: str) -> List[Tuple[bool, str]]:
+        parts = []
+        position = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                parts.append((False, source[position:match.start()]))
+            parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(source):
+            parts.append((False, source[position:]))
+        return parts
+
+    def render_to(self, stream: TextIO, **values: TemplateValue) -> None:
+        """テンプレートをストリームへ直接書き込む"""
+        write = stream.write
+        for is_placeholder, text in self._parts:
+            if not is_placeholder:
+                write(text)
+                continue
+
+            if text not in values:
+                raise KeyError(f"テンプレート {self.name} の値が不足しています: {text}")
+            value = values[text]
+            if value is None:
+                continue
+            if isinstance(value, str):
+                write(value)
+            elif callable(value):
+                value(stream)
+            else:
+                for chunk in value:
+                    write(chunk)
+
+    def render(self, **values: TemplateValue) -> str:
+        """テンプレートを文字列として描画する"""
+        buffer = io.StringIO()
+        self.render_to(buffer, **values)
+        return buffer.getvalue()
+
+
+class TemplateRegistry:
+    """静的アセットとコンパイル済みテンプレートのレジストリ"""
+
+    def __init__(self, template_dir: str):
+        self.template_dir = template_dir
+        self._assets: Dict[str, str] = {}
+        self._templates: Dict[str, CompiledTemplate] = {}
+
+    def load(self) -> None:
+        """テンプレートディレクトリを読み込み、.html をコンパイルする"""
+        if not os.path.isdir(self.template_dir):
+            logger.warning(f"テンプレートディレクトリが見つかりません: {self.template_dir}")
+            return
+
+        for filename in sorted(os.listdir(self.template_dir)):
+            path = os.path.join(self.template_dir, filename)
+            if not os.path.isfile(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                self.register(filename, f.read())
+
+        logger.debug(f"テンプレート読み込み完了: アセット{len(self._assets)}件, テンプレート{len(self._templates)}件")
+
+    def register(self, name: str, source: str) -> None:
+        """アセットを登録し、.html の場合はコンパイルする"""
+        self._assets[name] = source
+        if name.endswith(".html"):
+            self._templates[name] = CompiledTemplate(name, source)
+
+    def asset(self, name: str) -> str:
+        return self._assets[name]
+
+    def template(self, name: str) -> CompiledTemplate:
+        return self._templates[name]
+
+    def asset_names(self) -> List[str]:
+        return list(self._assets)
+
+
+# インポート時に一度だけ読み込む
+registry = TemplateRegistry(TEMPLATE_DIR)
+registry.load()
+
+
+def get_asset(name: str) -> str:
+    """キャッシュ済みの静的アセットを取得"""
+    return registry.asset(name)
+
+
+def get_template(name: str) -> CompiledTemplate:
+    """コンパイル済みテンプレートを取得"""
+    return registry.template(name)
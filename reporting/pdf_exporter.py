@@ -4,24 +4,37 @@ import numpy as np
 import io
 import base64
 from datetime import datetime
-import plotly.io as pio
-import streamlit as st
 import pytz
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+import logging
+import zipfile
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import os
+import time
+
+# reportlab はPDFを実際に組版する関数の中でのみ読み込む（ボタン表示だけのページ描画では読み込まない）
 
 # --- 新しいモジュール構造に合わせてインポートパスを修正 ---
 from analysis import ranking as ranking_analyzer
 from config import style_config as sc
+from reporting.chart_renderer import get_chart_rasterizer
+
+logger = logging.getLogger(__name__)
+
+# 一括PDF生成のワーカープロセス数
+DEFAULT_PDF_WORKERS = min(4, os.cpu_count() or 1)
+# 並列PDF生成の待ち時間（秒）。超えた場合は逐次生成に切り替える
+PDF_WORKER_TIMEOUT = 300
+
+FOOTER_TEXT = "手術件数分析レポート (c) 医療情報管理部"
 
-# --- 日本語フォント設定 (変更なし) ---
+# --- 日本語フォント設定（プロセスごとに1回だけ登録） ---
+@functools.lru_cache(maxsize=None)
 def setup_japanese_font():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
     font_path = os.path.join(os.path.dirname(__file__), '..', 'fonts', 'NotoSansJP-Regular.ttf')
     if os.path.exists(font_path):
         pdfmetrics.registerFont(TTFont('NotoSansJP', font_path))
@@ -36,14 +49,29 @@ def setup_japanese_font():
 
 def fig_to_image(fig, width=700, height=350):
     if fig is None: return None
-    return pio.to_image(fig, format='png', width=width, height=height, scale=1.5)
+    # 常駐レンダラー + ディスクキャッシュ経由（同じグラフは再描画しない）
+    return get_chart_rasterizer().to_image(fig, width=width, height=height, scale=1.5)
+
+@functools.lru_cache(maxsize=None)
+def get_report_styles(japanese_font):
+    """レポート用の段落スタイル（フォントごとに1回だけ作成）"""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+    return {
+        'TableHeader': ParagraphStyle('TableHeader', parent=styles['Normal'], fontName=japanese_font, fontSize=10, alignment=1),
+        'SectionTitle': ParagraphStyle('SectionTitle', parent=styles['h2'], fontName=japanese_font, fontSize=14, spaceAfter=8),
+        'Description': ParagraphStyle('Description', parent=styles['Normal'], fontName=japanese_font, fontSize=10, spaceAfter=10, leading=14),
+    }
 
 def create_table_for_pdf(df, japanese_font):
     # ... (元のコードからテーブル作成ロジックを移植)
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
     if df is None or df.empty:
         return None
-    styles = getSampleStyleSheet()
-    header_style = ParagraphStyle('TableHeader', parent=styles['Normal'], fontName=japanese_font, fontSize=10, alignment=1)
+    header_style = get_report_styles(japanese_font)['TableHeader']
     header_cells = [Paragraph(str(col), header_style) for col in df.columns]
     table_data = [header_cells] + df.values.tolist()
     
@@ -57,33 +85,41 @@ def create_table_for_pdf(df, japanese_font):
     table.setStyle(style)
     return table
 
-def create_report_section(title, description, japanese_font, chart=None, table_df=None):
+def create_report_section(title, description, japanese_font, chart=None, table_df=None, image_data=None):
     # ... (元のコードからセクション作成ロジックを移植)
-    styles = getSampleStyleSheet()
-    section_title_style = ParagraphStyle('SectionTitle', parent=styles['h2'], fontName=japanese_font, fontSize=14, spaceAfter=8)
-    description_style = ParagraphStyle('Description', parent=styles['Normal'], fontName=japanese_font, fontSize=10, spaceAfter=10, leading=14)
-    content = [Paragraph(title, section_title_style), Paragraph(description.replace('\n', '<br/>'), description_style)]
-    if chart:
-        img_data = fig_to_image(chart)
-        if img_data:
-            content.append(Image(io.BytesIO(img_data), width=16*cm, height=8*cm))
-            content.append(Spacer(1, 10))
+    # image_data: 画像化済みのグラフ（一括生成ではメインプロセスでまとめて画像化して渡す）
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer, Image
+
+    styles = get_report_styles(japanese_font)
+    content = [Paragraph(title, styles['SectionTitle']), Paragraph(description.replace('\n', '<br/>'), styles['Description'])]
+    img_data = image_data if image_data is not None else (fig_to_image(chart) if chart else None)
+    if img_data:
+        content.append(Image(io.BytesIO(img_data), width=16*cm, height=8*cm))
+        content.append(Spacer(1, 10))
     if table_df is not None and not table_df.empty:
         content.append(create_table_for_pdf(table_df, japanese_font))
     return content
 
-def add_footer(canvas, doc, footer_text):
+def add_footer(canvas, doc, footer_text, creation_date_str=None):
     # ... (元のコードからフッター描画ロジックを移植)
+    from reportlab.lib.units import cm
+
     japanese_font = setup_japanese_font()
     canvas.saveState()
     canvas.setFont(japanese_font, 9)
-    creation_date_str = datetime.now(pytz.timezone('Asia/Tokyo')).strftime('%Y/%m/%d')
+    if creation_date_str is None:
+        creation_date_str = datetime.now(pytz.timezone('Asia/Tokyo')).strftime('%Y/%m/%d')
     center_text = f"{footer_text} | 作成日: {creation_date_str}"
     canvas.drawCentredString(doc.width/2.0 + doc.leftMargin, doc.bottomMargin - 10, center_text)
     canvas.drawRightString(doc.width + doc.leftMargin - 1*cm, doc.bottomMargin - 10, f"- {canvas.getPageNumber()} -")
     canvas.restoreState()
 
 def generate_hospital_report(summary_df, fig, target_dict, period_type):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=2*cm, bottomMargin=2.5*cm)
     japanese_font = setup_japanese_font()
@@ -94,15 +130,149 @@ def generate_hospital_report(summary_df, fig, target_dict, period_type):
     section = create_report_section(f"病院全体 {period_type}レポート", description, japanese_font, chart=fig, table_df=summary_df.tail(15))
     content.extend(section)
     
-    footer_text = "手術件数分析レポート (c) 医療情報管理部"
-    footer_func = lambda canvas, doc: add_footer(canvas, doc, footer_text)
+    footer_func = lambda canvas, doc: add_footer(canvas, doc, FOOTER_TEXT)
     doc.build(content, onFirstPage=footer_func, onLaterPages=footer_func)
     
     buffer.seek(0)
     return buffer
 
+# --- 全診療科の一括PDF生成 ---
+
+def build_department_report_jobs(df, target_dict, analysis_base_date, period_type="週次", departments=None):
+    """
+    一括PDF生成用のジョブ（診療科ごとの表・画像化済みグラフ）を作成
+    
+    全身麻酔・分析終了日での絞り込みは一度だけ行い、診療科ごとに分割して週次サマリーを計算する。
+    グラフはメインプロセスでまとめて画像化（キャッシュ利用）し、ワーカーには画像のバイト列だけを渡す。
+    """
+    from analysis import weekly
+    from plotting import trend_plots
+
+    if df is None or df.empty:
+        return []
+
+    gas_df = df[df['is_gas_20min']]
+    analysis_end_date = weekly.get_analysis_end_date(analysis_base_date) if analysis_base_date is not None else None
+    if analysis_end_date is not None:
+        gas_df = gas_df[gas_df['手術実施日_dt'] <= analysis_end_date]
+
+    if departments is None:
+        departments = sorted(target_dict.keys()) if target_dict else sorted(gas_df['実施診療科'].dropna().unique())
+
+    summaries = {}
+    for dept, dept_df in gas_df.groupby('実施診療科', sort=False):
+        if dept in departments:
+            summaries[dept] = weekly.get_summary(dept_df, analysis_base_date, use_complete_weeks=False)
+
+    figures = {
+        dept: trend_plots.create_weekly_dept_chart(summaries[dept], dept, target_dict or {})
+        for dept in departments if dept in summaries and not summaries[dept].empty
+    }
+    images = get_chart_rasterizer().to_images(figures, width=700, height=350, scale=1.5)
+
+    jobs = []
+    for dept in departments:
+        summary = summaries.get(dept)
+        if summary is None or summary.empty:
+            continue
+        table_df = summary.tail(15).copy()
+        table_df['週'] = table_df['週'].dt.strftime('%Y/%m/%d')
+        target = (target_dict or {}).get(dept)
+        description = f"{dept}の{period_type}サマリーです。" + (f"\n週次目標: {target:.1f}件" if target else "")
+        jobs.append({
+            'department': dept,
+            'title': f"{dept} {period_type}レポート",
+            'description': description,
+            'image': images.get(dept),
+            'table': table_df,
+        })
+    return jobs
+
+def _build_story(jobs, japanese_font):
+    from reportlab.platypus import PageBreak
+
+    content = []
+    for i, job in enumerate(jobs):
+        if i > 0:
+            content.append(PageBreak())
+        content.extend(create_report_section(
+            job['title'], job['description'], japanese_font,
+            table_df=job['table'], image_data=job['image']
+        ))
+    return content
+
+def build_report_pdf(jobs, creation_date_str):
+    """ジョブ（1件または複数）からPDFのバイト列を作成（ワーカープロセスで実行）"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    japanese_font = setup_japanese_font()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=2*cm, bottomMargin=2.5*cm)
+    footer_func = lambda canvas, doc: add_footer(canvas, doc, FOOTER_TEXT, creation_date_str)
+    doc.build(_build_story(jobs, japanese_font), onFirstPage=footer_func, onLaterPages=footer_func)
+    return buffer.getvalue()
+
+def _safe_filename(name):
+    return "".join(c if c not in '\\/:*?"<>|' else "_" for c in str(name))
+
+def generate_department_reports_zip(df, target_dict, analysis_base_date, period_type="週次",
+                                    departments=None, bundle=False, max_workers=DEFAULT_PDF_WORKERS):
+    """
+    全診療科のPDFを一括生成してZIPにまとめる
+    
+    Args:
+        bundle: Trueの場合は全診療科をまとめた1つのPDFも同梱する
+        max_workers: PDFを組版するワーカープロセス数（1以下なら逐次処理）
+    
+    Returns:
+        (ZIPのBytesIO, 生成したPDF数)
+    """
+    jobs = build_department_report_jobs(df, target_dict, analysis_base_date, period_type, departments)
+    if not jobs:
+        return None, 0
+
+    creation_date_str = datetime.now(pytz.timezone('Asia/Tokyo')).strftime('%Y/%m/%d')
+    now = datetime.now().strftime("%Y%m%d")
+    tasks = {f"{now}_{_safe_filename(job['department'])}_{period_type}.pdf": [job] for job in jobs}
+    if bundle:
+        tasks[f"{now}_全診療科_{period_type}.pdf"] = jobs
+
+    results = {}
+    if max_workers and max_workers > 1 and len(tasks) > 1:
+        # マルチスレッドのStreamlitサーバーやバッチのスレッドプールをforkしないよう、spawnでワーカーを起動する
+        executor = ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)),
+                                       mp_context=multiprocessing.get_context("spawn"))
+        try:
+            futures = {name: executor.submit(build_report_pdf, task_jobs, creation_date_str) for name, task_jobs in tasks.items()}
+            deadline = time.monotonic() + PDF_WORKER_TIMEOUT
+            results = {name: future.result(timeout=max(0, deadline - time.monotonic()))
+                       for name, future in futures.items()}
+            executor.shutdown(wait=True)
+        except Exception as e:
+            logger.warning(f"並列PDF生成に失敗したため逐次生成に切り替えます: {e!r}")
+            # 応答のないワーカーを待たずに戻る（未着手のタスクは取り消す）
+            executor.shutdown(wait=False, cancel_futures=True)
+            results = {}
+
+    for name, task_jobs in tasks.items():
+        if name not in results:
+            results[name] = build_report_pdf(task_jobs, creation_date_str)
+
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name in tasks:
+            zf.writestr(name, results[name])
+    zip_buffer.seek(0)
+
+    logger.info(f"診療科別PDF一括生成完了: {len(results)}件")
+    return zip_buffer, len(results)
+
 def add_pdf_report_button(data_type, period_type, df, fig, target_dict=None, department=None):
     """PDFレポートダウンロードボタンのラッパー関数"""
+    import streamlit as st
+
     if df is None or df.empty:
         return
 
@@ -118,4 +288,27 @@ def add_pdf_report_button(data_type, period_type, df, fig, target_dict=None, dep
                 data=pdf_buffer,
                 file_name=filename,
                 mime="application/pdf"
-            )
\ No newline at end of file
+            )
+
+def add_batch_pdf_report_button(df, target_dict, analysis_base_date, period_type="週次", key_suffix=""):
+    """全診療科PDFの一括生成・ZIPダウンロードボタン"""
+    import streamlit as st
+
+    if df is None or df.empty:
+        return
+
+    bundle = st.checkbox("全診療科をまとめたPDFも含める", value=False, key=f"pdf_batch_bundle_{key_suffix}")
+
+    if st.button("📦 全診療科のPDFを一括生成", key=f"pdf_batch_{period_type}_{key_suffix}"):
+        with st.spinner("全診療科のPDFレポートを生成中..."):
+            zip_buffer, count = generate_department_reports_zip(df, target_dict, analysis_base_date, period_type, bundle=bundle)
+            if zip_buffer is None:
+                st.warning("PDFを生成できる診療科データがありません")
+                return
+            st.download_button(
+                label=f"📥 ZIPをダウンロード（{count}件）",
+                data=zip_buffer,
+                file_name=f"{datetime.now().strftime('%Y%m%d')}_診療科別レポート_{period_type}.zip",
+                mime="application/zip",
+                key=f"pdf_batch_download_{key_suffix}"
+            )
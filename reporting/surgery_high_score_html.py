@@ -8,6 +8,8 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from reporting.html_templates import get_asset, get_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -307,25 +309,13 @@ def generate_weekly_ranking_html(df: pd.DataFrame, target_dict: Dict[str, float]
         summary = generate_weekly_ranking_summary(dept_scores)
         
         # HTML生成
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="ja">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>🏆 診療科別手術ハイスコア TOP3</title>
-            <style>{_get_weekly_ranking_css()}</style>
-        </head>
-        <body>
-            <div class="container">
-                {_generate_weekly_header_html(period, summary)}
-                {_generate_weekly_highlights_html(summary)}
-                {_generate_weekly_ranking_top3_html(dept_scores[:3])}
-                {_generate_footer_html("weekly_ranking")}
-            </div>
-        </body>
-        </html>
-        """
+        html_content = get_template('weekly_ranking.html').render(
+            css=_get_weekly_ranking_css(),
+            header=_generate_weekly_header_html(period, summary),
+            highlights=_generate_weekly_highlights_html(summary),
+            ranking=_generate_weekly_ranking_top3_html(dept_scores[:3]),
+            footer=_generate_footer_html("weekly_ranking"),
+        )
         
         logger.info(f"✅ 週報ランキングHTML生成完了: {len(dept_scores)}科")
         return html_content
@@ -371,13 +361,13 @@ def _generate_weekly_ranking_top3_html(top3: List[Dict[str, Any]]) -> str:
     if not top3:
         return ""
     
-    ranking_html = ""
+    ranking_cards = []
     
     for i, dept in enumerate(top3):
         rank_emoji = ["🥇", "🥈", "🥉"][i]
         achievement_pct = dept.get('achievement_rate', 0)
         
-        ranking_html += f"""
+        ranking_cards.append(f"""
         <div class="ranking-card rank-{i+1}">
             <div class="rank-header">
                 <span class="medal">{rank_emoji}</span>
@@ -389,7 +379,7 @@ def _generate_weekly_ranking_top3_html(top3: List[Dict[str, Any]]) -> str:
             </div>
             <div class="score-value">{dept['total_score']:.0f}点</div>
         </div>
-        """
+        """)
     
     # 1位の診療科データを動的に反映
     top_dept = top3[0]
@@ -433,497 +423,15 @@ def _generate_weekly_ranking_top3_html(top3: List[Dict[str, Any]]) -> str:
 
     return f"""
     <div class="ranking-section">
-        {ranking_html}
+        {''.join(ranking_cards)}
     </div>
     {score_details_html}
     """
 
 
 def _get_weekly_ranking_css() -> str:
-    """週報ランキング用CSS（年度比較カード対応版）"""
-    return """
-    body {
-        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
-        margin: 0;
-        padding: 0;
-        background: #f5f5f5;
-        color: #333;
-    }
-    
-    .container {
-        max-width: 900px;
-        margin: 0 auto;
-        padding: 20px;
-        background: white;
-    }
-    
-    .header {
-        text-align: center;
-        padding: 20px 0;
-        border-bottom: 3px solid #2c3e50;
-        margin-bottom: 30px;
-    }
-    
-    .header h1 {
-        font-size: 2em;
-        margin: 0 0 10px 0;
-        color: #2c3e50;
-    }
-    
-    .header-meta {
-        color: #666;
-        font-size: 0.9em;
-    }
-    
-    /* 年度比較カード専用スタイル */
-    .yearly-comparison-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 15px;
-        padding: 30px;
-        margin-bottom: 30px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.15);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .yearly-comparison-card::before {
-        content: '';
-        position: absolute;
-        top: -50%;
-        right: -20%;
-        width: 100%;
-        height: 200%;
-        background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-        pointer-events: none;
-    }
-    
-    .yearly-card-header {
-        display: flex;
-        align-items: center;
-        margin-bottom: 25px;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .yearly-card-icon {
-        font-size: 32px;
-        margin-right: 15px;
-    }
-    
-    .yearly-card-title {
-        font-size: 20px;
-        font-weight: bold;
-    }
-    
-    .yearly-card-subtitle {
-        font-size: 14px;
-        opacity: 0.9;
-        margin-top: 5px;
-    }
-    
-    .yearly-comparison-grid {
-        display: grid;
-        grid-template-columns: 1fr 1fr 1fr;
-        gap: 20px;
-        margin-bottom: 25px;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .yearly-metric {
-        text-align: center;
-        padding: 20px;
-        background: rgba(255, 255, 255, 0.15);
-        border-radius: 12px;
-        backdrop-filter: blur(10px);
-    }
-    
-    .yearly-metric-label {
-        font-size: 12px;
-        opacity: 0.9;
-        margin-bottom: 8px;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .yearly-metric-value {
-        font-size: 28px;
-        font-weight: bold;
-        margin-bottom: 5px;
-    }
-    
-    .yearly-metric-period {
-        font-size: 11px;
-        opacity: 0.8;
-    }
-    
-    .yearly-comparison-result {
-        background: rgba(255, 255, 255, 0.2);
-        border-radius: 12px;
-        padding: 20px;
-        text-align: center;
-        position: relative;
-        z-index: 1;
-    }
-    
-    .yearly-change-value {
-        font-size: 36px;
-        font-weight: bold;
-        margin-bottom: 10px;
-    }
-    
-    .yearly-change-label {
-        font-size: 14px;
-        opacity: 0.9;
-    }
-    
-    /* 病院サマリスタイル */
-    .hospital-summary {
-        background: white;
-        border-radius: 12px;
-        padding: 30px;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        margin-bottom: 30px;
-    }
-    
-    .summary-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 20px;
-        margin-top: 20px;
-    }
-    
-    .summary-metric {
-        background: linear-gradient(135deg, #4CAF50 0%, #45a049 100%);
-        color: white;
-        padding: 25px;
-        border-radius: 12px;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .summary-metric.primary {
-        background: linear-gradient(135deg, #4CAF50 0%, #45a049 100%);
-    }
-    
-    .summary-metric.secondary {
-        background: linear-gradient(135deg, #2196F3 0%, #1976D2 100%);
-    }
-    
-    .summary-metric.accent {
-        background: linear-gradient(135deg, #FF9800 0%, #F57C00 100%);
-    }
-    
-    .summary-metric.needs_improvement {
-        background: linear-gradient(135deg, #FF5722 0%, #D84315 100%);
-    }
-    
-    .summary-metric.good {
-        background: linear-gradient(135deg, #8BC34A 0%, #689F38 100%);
-    }
-    
-    .summary-metric.excellent {
-        background: linear-gradient(135deg, #4CAF50 0%, #388E3C 100%);
-    }
-    
-    .metric-icon {
-        font-size: 32px;
-        margin-bottom: 10px;
-    }
-    
-    .metric-value {
-        font-size: 32px;
-        font-weight: bold;
-        margin-bottom: 5px;
-    }
-    
-    .metric-label {
-        font-size: 14px;
-        opacity: 0.9;
-    }
-    
-    .metric-subtitle {
-        font-size: 12px;
-        opacity: 0.8;
-        margin-top: 5px;
-    }
-    
-    .metric-achievement {
-        font-size: 11px;
-        opacity: 0.9;
-        margin-top: 3px;
-        font-weight: bold;
-    }
-    
-    .metric-status {
-        font-size: 12px;
-        margin-top: 5px;
-        font-weight: bold;
-    }
-    
-    /* 月別トレンドチャート */
-    .trend-chart {
-        background: white;
-        border-radius: 8px;
-        padding: 20px;
-        margin: 20px 0;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-    }
-    
-    .trend-bars {
-        display: flex;
-        align-items: end;
-        gap: 8px;
-        height: 120px;
-        margin: 20px 0;
-    }
-    
-    .trend-bar {
-        flex: 1;
-        background: linear-gradient(to top, #667eea, #764ba2);
-        border-radius: 3px 3px 0 0;
-        position: relative;
-        min-height: 20px;
-    }
-    
-    .trend-bar-label {
-        position: absolute;
-        bottom: -25px;
-        left: 50%;
-        transform: translateX(-50%);
-        font-size: 10px;
-        color: #666;
-        white-space: nowrap;
-    }
-    
-    .trend-bar-value {
-        position: absolute;
-        top: -20px;
-        left: 50%;
-        transform: translateX(-50%);
-        font-size: 10px;
-        font-weight: bold;
-        color: #333;
-    }
-    
-    /* 分析セクション */
-    .analysis-section {
-        background: white;
-        border-radius: 12px;
-        padding: 30px;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        margin-bottom: 30px;
-    }
-    
-    .analysis-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        gap: 20px;
-        margin-top: 20px;
-    }
-    
-    .analysis-card {
-        background: #f8f9fa;
-        border-left: 4px solid #667eea;
-        border-radius: 8px;
-        padding: 20px;
-    }
-    
-    .analysis-card.improvement {
-        border-left-color: #4CAF50;
-        background: #e8f5e8;
-    }
-    
-    .analysis-card.concern {
-        border-left-color: #FF9800;
-        background: #fff3cd;
-    }
-    
-    .analysis-card.action {
-        border-left-color: #2196F3;
-        background: #e3f2fd;
-    }
-    
-    /* 既存のランキングスタイル */
-    .stats-highlight {
-        background: #f8f9fa;
-        padding: 20px;
-        border-radius: 8px;
-        margin-bottom: 30px;
-        text-align: center;
-    }
-    
-    .stats-highlight h2 {
-        margin: 0;
-        color: #2c3e50;
-    }
-    
-    .ranking-section {
-        margin-bottom: 40px;
-    }
-    
-    .ranking-card {
-        background: #fff;
-        border: 2px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 20px;
-        margin-bottom: 15px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .ranking-card.rank-1 {
-        border-color: #ffd700;
-        background: linear-gradient(135deg, #fffef5 0%, #fffdf0 100%);
-    }
-    
-    .ranking-card.rank-2 {
-        border-color: #c0c0c0;
-        background: linear-gradient(135deg, #fafafa 0%, #f8f8f8 100%);
-    }
-    
-    .ranking-card.rank-3 {
-        border-color: #cd7f32;
-        background: linear-gradient(135deg, #fffaf5 0%, #fff8f0 100%);
-    }
-    
-    .rank-header {
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        margin-bottom: 10px;
-    }
-    
-    .medal {
-        font-size: 2em;
-    }
-    
-    .rank-label {
-        font-weight: bold;
-        color: #666;
-    }
-    
-    .dept-name {
-        font-size: 1.5em;
-        font-weight: bold;
-        margin-bottom: 10px;
-        color: #2c3e50;
-    }
-    
-    .score-info {
-        display: flex;
-        justify-content: space-between;
-        align-items: baseline;
-        margin-bottom: 10px;
-    }
-    
-    .achievement {
-        color: #666;
-        font-size: 1.1em;
-    }
-    
-    .score-value {
-        font-size: 2em;
-        font-weight: bold;
-        color: #e74c3c;
-        text-align: right;
-    }
-    
-    .scoring-info {
-        background: #f8f9fa;
-        padding: 15px;
-        margin: 20px 0;
-        border-radius: 8px;
-        display: flex;
-        align-items: center;
-        gap: 15px;
-    }
-    
-    .score-icon {
-        font-size: 2em;
-    }
-    
-    .score-label {
-        font-size: 1.2em;
-        font-weight: bold;
-        color: #2c3e50;
-    }
-    
-    .score-detail {
-        margin-left: auto;
-        font-size: 1.1em;
-        color: #e74c3c;
-    }
-    
-    .score-breakdown {
-        background: #fff;
-        border: 1px solid #ddd;
-        border-radius: 8px;
-        padding: 20px;
-        margin-bottom: 30px;
-    }
-    
-    .score-breakdown h3 {
-        margin: 0 0 15px 0;
-        color: #2c3e50;
-    }
-    
-    .score-table {
-        width: 100%;
-        border-collapse: collapse;
-    }
-    
-    .score-table td {
-        padding: 8px;
-        border-bottom: 1px solid #eee;
-    }
-    
-    .score-table td:first-child {
-        font-weight: 500;
-        color: #666;
-    }
-    
-    .score-table td:nth-child(2) {
-        text-align: right;
-        font-weight: bold;
-        color: #2c3e50;
-    }
-    
-    .score-table td:nth-child(3) {
-        text-align: right;
-        color: #666;
-        font-size: 0.9em;
-    }
-    
-    .footer {
-        margin-top: 40px;
-        padding-top: 20px;
-        border-top: 1px solid #e0e0e0;
-        text-align: center;
-        color: #666;
-        font-size: 0.9em;
-    }
-    
-    /* レスポンシブ対応 */
-    @media (max-width: 768px) {
-        .yearly-comparison-grid {
-            grid-template-columns: 1fr;
-        }
-        
-        .summary-grid {
-            grid-template-columns: 1fr;
-        }
-        
-        .analysis-grid {
-            grid-template-columns: 1fr;
-        }
-        
-        .container {
-            padding: 10px;
-        }
-    }
-    """
+    """週報ランキング用CSS（年度比較カード対応版、インポート時にキャッシュ済み）"""
+    return get_asset('weekly_ranking.css')
 
 
 def _generate_footer_html(report_type: str) -> str:
@@ -937,26 +445,7 @@ def _generate_footer_html(report_type: str) -> str:
 
 def _generate_empty_weekly_ranking_html() -> str:
     """空の週報ランキングHTML"""
-    return f"""
-    <!DOCTYPE html>
-    <html lang="ja">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>週報ランキング - データなし</title>
-        <style>{_get_weekly_ranking_css()}</style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>📊 週報ランキング</h1>
-            <div class="empty-message">
-                <p>評価対象のデータがありません。</p>
-                <p>データと目標設定を確認してください。</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return get_template('weekly_ranking_empty.html').render(css=_get_weekly_ranking_css())
 
 
 def _generate_error_html(error_message: str) -> str:
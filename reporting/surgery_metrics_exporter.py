@@ -2,18 +2,249 @@
 """
 手術分析メトリクスCSV出力モジュール
 ポータル統合用の標準化されたCSVデータを出力
+- 期間でのフィルタリング・時刻の解析は出力1回につき一度だけ行い、各メトリクスは集計結果から作成する
+- 縦持ちのメトリクス表は列ごとに値を集め、DataFrameコンストラクタ1回で作成する
+- CSVに加えてParquetでも出力でき、年度内の全週（全月）を一括で出力できる
+- 過去の全期間の週次・月次メトリクスを分割してファイルへ書き出せる（バックフィル）
 """
 
 import pandas as pd
-import streamlit as st
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
+import importlib.util
 import logging
 from pathlib import Path
 import io
 
 logger = logging.getLogger(__name__)
 
+# Parquet出力は pyarrow / fastparquet のどちらかがある場合のみ（分割出力は pyarrow のみ）
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+PARQUET_AVAILABLE = PYARROW_AVAILABLE or importlib.util.find_spec("fastparquet") is not None
+
+METRIC_COLUMNS = ["診療科名", "メトリクス名", "値", "単位", "期間", "期間タイプ", "カテゴリ", "データ種別"]
+
+# バックフィルで一度に書き出す期間数
+BACKFILL_CHUNK_PERIODS = 26
+
+# 手術室稼働率の前提（平日の手術室数 × 1日の稼働可能時間）
+OPERATING_ROOMS = 10
+DAILY_CAPACITY_HOURS = 8
+
+
+class _MetricTable:
+    """縦持ちメトリクス表を列単位で組み立てる"""
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {name: [] for name in METRIC_COLUMNS}
+        self.notes: list = []
+        self.base_dates: list = []
+
+    def add(self, dept, name, value, unit, period, period_type, category, data_type, note=None) -> None:
+        for column, item in zip(METRIC_COLUMNS, (dept, name, value, unit, period, period_type, category, data_type)):
+            self.columns[column].append(item)
+        self.notes.append(note)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def to_frame(self, calculated_at: str, app_name: str, extra: Optional[Dict[str, list]] = None,
+                 with_notes: bool = False) -> pd.DataFrame:
+        """with_notes=True の場合は補足がなくても補足列を出力する（分割出力で列をそろえるため）"""
+        if not self.notes:
+            return pd.DataFrame()
+        data = dict(self.columns)
+        data["計算日時"] = calculated_at
+        data["アプリ名"] = app_name
+        if with_notes or any(note is not None for note in self.notes):
+            data["補足"] = [np.nan if note is None else note for note in self.notes]
+        if extra:
+            data.update(extra)
+        return pd.DataFrame(data)
+
+
+class _MetricsStreamWriter:
+    """メトリクス表を分割して CSV / Parquet に追記するライター"""
+
+    def __init__(self, output, file_format: str = "csv"):
+        if file_format not in ("csv", "parquet"):
+            raise ValueError(f"未対応の出力形式です: {file_format}")
+        if file_format == "parquet" and not PYARROW_AVAILABLE:
+            raise ImportError("Parquetの分割出力には pyarrow が必要です")
+        self.file_format = file_format
+        self._owns_handle = isinstance(output, (str, Path))
+        self._handle = open(output, "wb") if self._owns_handle else output
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.file_format == "csv":
+            # BOM付きUTF-8（Excel向け）はファイル先頭にだけ付ける
+            chunk.to_csv(self._handle, index=False, header=not self._header_written,
+                         encoding='utf-8' if self._header_written else 'utf-8-sig')
+            self._header_written = True
+            return
+        
+        chunk = chunk.astype({"値": float})
+        if self._parquet_writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            schema = schema.set(schema.get_field_index("補足"), pa.field("補足", pa.string()))
+            self._parquet_writer = pq.ParquetWriter(self._handle, schema)
+        self._parquet_writer.write_table(
+            pa.Table.from_pandas(chunk, schema=self._parquet_writer.schema, preserve_index=False)
+        )
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._owns_handle:
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _parse_hhmm(series: pd.Series) -> pd.Series:
+    """'%H:%M' 形式の時刻を解析（一意な値だけを解析して元の行に戻す）"""
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format='%H:%M', errors='coerce').to_numpy()
+    values = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = codes >= 0
+    values[valid] = parsed[codes[valid]]
+    return pd.Series(values, index=series.index)
+
+
+class _PeriodAggregates:
+    """
+    複数期間のメトリクス計算に使う集計結果（全期間分をまとめて一度だけ集計する）
+    - 期間内の診療科・術者・時間帯・平均手術時間は、期間キーでのgroupbyで全期間分を集計
+    - 直近週・直近4週・年度累計などの日付範囲の件数は、ソート済み日付の二分探索で求める
+    """
+
+    def __init__(self, prepared: pd.DataFrame, period_infos: List[Dict]):
+        self._period_index: Dict[Tuple, int] = {}
+        for info in period_infos:
+            self._period_index.setdefault(self._bounds(info), len(self._period_index))
+        self._all_period = any(info["type"] == "全期間" for info in period_infos)
+        
+        dates = prepared['date']
+        is_gas = prepared['is_gas']
+        weekday = prepared['is_weekday']
+        
+        # 日付範囲の件数・時間合計用のソート済み配列
+        self._windows = {
+            'all': self._sorted_dates(dates),
+            'gas': self._sorted_dates(dates[is_gas]),
+            'gas_weekday': self._sorted_dates(dates[is_gas & weekday]),
+            'weekday': self._sorted_dates(dates[weekday]),
+        }
+        if 'recorded_minutes' in prepared.columns:
+            self._minutes_column = 'recorded_minutes'
+        elif 'parsed_minutes' in prepared.columns:
+            self._minutes_column = 'parsed_minutes'
+        else:
+            self._minutes_column = None
+        if self._minutes_column is not None:
+            weekday_rows = prepared.loc[weekday & dates.notna(), ['date', self._minutes_column]].sort_values('date', kind='stable')
+            self._weekday_minutes_dates = weekday_rows['date'].to_numpy()
+            self._weekday_minutes_cumsum = np.concatenate(
+                [[0.0], np.cumsum(weekday_rows[self._minutes_column].fillna(0).to_numpy(dtype=float))]
+            )
+        
+        self._dept_gas: Dict[Any, np.ndarray] = {}
+        if 'dept' in prepared.columns:
+            for dept, dept_dates in dates[is_gas].groupby(prepared.loc[is_gas, 'dept'], sort=False):
+                self._dept_gas[dept] = self._sorted_dates(dept_dates)
+        
+        # 期間キーでの集計
+        period_key = self._assign_period_keys(dates)
+        in_period = prepared.loc[period_key >= 0].assign(period=period_key[period_key >= 0])
+        self.row_counts = in_period.groupby('period').size()
+        
+        self.departments: Dict[int, list] = {}
+        if 'dept' in in_period.columns:
+            for key, dept in in_period.groupby(['period', 'dept'], sort=False, dropna=False).size().index:
+                self.departments.setdefault(key, []).append(dept)
+        
+        self.surgeon_counts = self._ranked_counts(in_period, 'surgeon', top=10)
+        self.time_slot_counts = self._ranked_counts(in_period, 'time_slot')
+        self.mean_duration = (
+            in_period.groupby('period')['parsed_minutes'].mean()
+            if 'parsed_minutes' in in_period.columns else pd.Series(dtype=float)
+        )
+
+    @staticmethod
+    def _bounds(period_info: Dict) -> Tuple:
+        return (pd.Timestamp(period_info["start_date"]), pd.Timestamp(period_info["end_date"]))
+
+    @staticmethod
+    def _sorted_dates(dates: pd.Series) -> np.ndarray:
+        return np.sort(dates.dropna().to_numpy())
+
+    @staticmethod
+    def _count_between(sorted_dates: np.ndarray, start, end) -> int:
+        start, end = np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end))
+        return int(np.searchsorted(sorted_dates, end, side='right') - np.searchsorted(sorted_dates, start, side='left'))
+
+    def _assign_period_keys(self, dates: pd.Series) -> pd.Series:
+        """各行が属する期間キー（どの期間にも入らない行は -1）"""
+        if self._all_period:
+            return pd.Series(0, index=dates.index)
+        
+        bounds = sorted(self._period_index.items(), key=lambda item: item[0][0])
+        starts = np.array([start.to_datetime64() for (start, _), _ in bounds], dtype='datetime64[ns]')
+        ends = np.array([end.to_datetime64() for (_, end), _ in bounds], dtype='datetime64[ns]')
+        keys = np.array([key for _, key in bounds])
+        
+        values = dates.to_numpy(dtype='datetime64[ns]')
+        position = np.searchsorted(starts, values, side='right') - 1
+        clipped = np.clip(position, 0, None)
+        inside = (position >= 0) & (values <= ends[clipped]) & ~np.isnat(values)
+        return pd.Series(np.where(inside, keys[clipped], -1), index=dates.index)
+
+    @staticmethod
+    def _ranked_counts(in_period: pd.DataFrame, column: str, top: Optional[int] = None) -> Dict[int, pd.Series]:
+        """期間ごとの件数（期間内でのvalue_countsと同じ並び順）"""
+        if column not in in_period.columns:
+            return {}
+        counts = in_period.groupby(['period', column], sort=False).size()
+        ranked = {}
+        for key, period_counts in counts.groupby(level=0, sort=False):
+            period_counts = period_counts.droplevel(0).sort_values(ascending=False)
+            ranked[key] = period_counts.head(top) if top else period_counts
+        return ranked
+
+    def period_key(self, period_info: Dict) -> int:
+        return self._period_index[self._bounds(period_info)]
+
+    def count(self, kind: str, start, end) -> int:
+        """日付範囲 [start, end] の件数（kind: all / gas / gas_weekday / weekday）"""
+        return self._count_between(self._windows[kind], start, end)
+
+    def department_gas_count(self, dept, start, end) -> int:
+        sorted_dates = self._dept_gas.get(dept)
+        return self._count_between(sorted_dates, start, end) if sorted_dates is not None else 0
+
+    def weekday_minutes(self, start, end) -> float:
+        """日付範囲 [start, end] の平日の手術時間合計（分）"""
+        if self._minutes_column is None:
+            # デフォルト値として平均60分と仮定
+            return self.count('weekday', start, end) * 60
+        start, end = np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end))
+        left = np.searchsorted(self._weekday_minutes_dates, start, side='left')
+        right = np.searchsorted(self._weekday_minutes_dates, end, side='right')
+        return float(self._weekday_minutes_cumsum[right] - self._weekday_minutes_cumsum[left])
+
+
 class SurgeryMetricsExporter:
     """手術分析メトリクス出力クラス"""
     
@@ -38,49 +269,169 @@ class SurgeryMetricsExporter:
             if analysis_date is None:
                 analysis_date = datetime.now()
             
-            # 期間設定
-            period_info = self._calculate_period(analysis_date, period_type)
-            
-            # メトリクス計算
-            metrics_data = []
-            
-            # 1. 全体メトリクス
-            overall_metrics = self._calculate_overall_metrics(
-                df, target_dict, period_info
-            )
-            metrics_data.extend(overall_metrics)
+            period_info = self._calculate_period(analysis_date, period_type, df)
+            prepared = self._prepare_frame(df, [period_info])
+            if 'date' not in prepared.columns:
+                return pd.DataFrame(), self._generate_filename(analysis_date, period_type)
             
-            # 2. 診療科別メトリクス
-            dept_metrics = self._calculate_department_metrics(
-                df, target_dict, period_info
-            )
-            metrics_data.extend(dept_metrics)
+            table = _MetricTable()
+            self._collect_metrics(table, _PeriodAggregates(prepared, [period_info]), target_dict, period_info)
+            metrics_df = table.to_frame(datetime.now().isoformat(), self.app_name)
             
-            # 3. 術者別メトリクス
-            surgeon_metrics = self._calculate_surgeon_metrics(
-                df, period_info
-            )
-            metrics_data.extend(surgeon_metrics)
+            filename = self._generate_filename(analysis_date, period_type)
+            return metrics_df, filename
             
-            # 4. 時間別メトリクス
-            time_metrics = self._calculate_time_metrics(
-                df, period_info
+        except Exception as e:
+            logger.error(f"メトリクス出力エラー: {e}")
+            raise
+
+    def export_metrics_multi_period(
+        self,
+        df: pd.DataFrame,
+        target_dict: Dict[str, float] = None,
+        fiscal_year: Optional[int] = None,
+        period_type: str = "週次",
+        analysis_dates: Optional[List[datetime]] = None
+    ) -> Tuple[pd.DataFrame, str]:
+        """
+        複数期間（既定: 年度内の全週）のメトリクスを1回の呼び出しでまとめて出力
+        
+        時刻の解析・全身麻酔/平日の判定は全期間分を一度だけ行い、各期間はその結果を共有する。
+        どの期間の行かは「基準日」列で区別する。
+        
+        Returns:
+            Tuple[pd.DataFrame, str]: (メトリクスデータフレーム, ファイル名)
+        """
+        try:
+            if analysis_dates is None:
+                analysis_dates = self._fiscal_year_analysis_dates(df, fiscal_year, period_type)
+            if not analysis_dates:
+                return pd.DataFrame(), self._generate_filename(datetime.now(), f"{period_type}_複数期間")
+            
+            period_infos = [self._calculate_period(date, period_type, df) for date in analysis_dates]
+            prepared = self._prepare_frame(df, period_infos)
+            if 'date' not in prepared.columns:
+                return pd.DataFrame(), self._generate_filename(analysis_dates[-1], f"{period_type}_複数期間")
+            
+            table = self._collect_period_table(
+                _PeriodAggregates(prepared, period_infos), target_dict, zip(analysis_dates, period_infos)
             )
-            metrics_data.extend(time_metrics)
-            
-            # データフレーム作成
-            metrics_df = pd.DataFrame(metrics_data)
-            
-            # ファイル名生成
-            filename = self._generate_filename(analysis_date, period_type)
+            metrics_df = table.to_frame(datetime.now().isoformat(), self.app_name, extra={"基準日": table.base_dates})
             
+            label = f"{fiscal_year}年度" if fiscal_year is not None else "複数期間"
+            filename = self._generate_filename(analysis_dates[-1], f"{period_type}_{label}")
+            logger.info(f"複数期間メトリクス出力: {len(period_infos)}期間 / {len(metrics_df)}件")
             return metrics_df, filename
             
         except Exception as e:
-            logger.error(f"メトリクス出力エラー: {e}")
+            logger.error(f"複数期間メトリクス出力エラー: {e}")
+            raise
+
+    def backfill_metrics(
+        self,
+        df: pd.DataFrame,
+        output,
+        target_dict: Dict[str, float] = None,
+        period_type: str = "週次",
+        file_format: str = "csv",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_periods: int = BACKFILL_CHUNK_PERIODS
+    ) -> int:
+        """
+        データ全期間（または指定範囲）の週次・月次メトリクスを順に書き出す（過去分の一括作成用）
+        
+        期間ごとの集計は期間キーでのgroupbyで一度に行い、メトリクス行は chunk_periods 期間ずつ
+        CSV / Parquet に追記するため、期間数が増えてもメトリクス表全体をメモリに持たない。
+        
+        Args:
+            output: 出力先のファイルパスまたはバイナリのファイルオブジェクト
+            file_format: "csv" または "parquet"（Parquetは pyarrow が必要）
+        
+        Returns:
+            int: 書き出したメトリクス行数
+        """
+        try:
+            if period_type not in ("週次", "月次"):
+                raise ValueError(f"バックフィルは週次・月次のみ対応しています: {period_type}")
+            
+            analysis_dates = self._backfill_analysis_dates(df, period_type, start_date, end_date)
+            if not analysis_dates:
+                logger.info("バックフィル対象の期間がありません")
+                return 0
+            
+            period_infos = [self._calculate_period(date, period_type, df) for date in analysis_dates]
+            prepared = self._prepare_frame(df, period_infos)
+            aggregates = _PeriodAggregates(prepared, period_infos)
+            del prepared
+            
+            calculated_at = datetime.now().isoformat()
+            periods = list(zip(analysis_dates, period_infos))
+            written = 0
+            with _MetricsStreamWriter(output, file_format) as writer:
+                for offset in range(0, len(periods), max(1, chunk_periods)):
+                    table = self._collect_period_table(aggregates, target_dict, periods[offset:offset + chunk_periods])
+                    chunk = table.to_frame(calculated_at, self.app_name, extra={"基準日": table.base_dates}, with_notes=True)
+                    if not chunk.empty:
+                        writer.write(chunk)
+                        written += len(chunk)
+            
+            logger.info(f"メトリクスバックフィル完了: {len(periods)}期間 / {written}件")
+            return written
+            
+        except Exception as e:
+            logger.error(f"メトリクスバックフィルエラー: {e}")
             raise
+
+    def _collect_period_table(self, aggregates: "_PeriodAggregates", target_dict: Dict[str, float],
+                              periods) -> _MetricTable:
+        """(基準日, 期間情報) の並びについてメトリクスを集め、各行に基準日を付ける"""
+        table = _MetricTable()
+        table.base_dates = []
+        for analysis_date, period_info in periods:
+            before = len(table)
+            self._collect_metrics(table, aggregates, target_dict, period_info)
+            table.base_dates.extend([analysis_date.strftime('%Y/%m/%d')] * (len(table) - before))
+        return table
+
+    def _backfill_analysis_dates(self, df: pd.DataFrame, period_type: str,
+                                 start_date: Optional[datetime], end_date: Optional[datetime]) -> List[datetime]:
+        """バックフィル対象の各期間の基準日（週次: 各週の月曜日、月次: 各月1日）"""
+        if '手術実施日_dt' not in df.columns or df['手術実施日_dt'].isna().all():
+            return []
+        
+        first = pd.Timestamp(start_date) if start_date is not None else df['手術実施日_dt'].min()
+        last = pd.Timestamp(end_date) if end_date is not None else df['手術実施日_dt'].max()
+        first, last = first.normalize(), last.normalize()
+        if last < first:
+            return []
+        
+        if period_type == "月次":
+            dates = pd.date_range(first.replace(day=1), last, freq='MS')
+        else:
+            dates = pd.date_range(first - pd.Timedelta(days=first.weekday()), last, freq='7D')
+        return [date.to_pydatetime() for date in dates]
+
+    def _fiscal_year_analysis_dates(self, df: pd.DataFrame, fiscal_year: Optional[int],
+                                    period_type: str) -> List[datetime]:
+        """年度内の各期間の基準日（週次: 各週の月曜日、月次: 各月1日）。データの最終日以降は含めない"""
+        latest_date = df['手術実施日_dt'].max() if '手術実施日_dt' in df.columns and not df.empty else pd.Timestamp.now()
+        if fiscal_year is None:
+            fiscal_year = latest_date.year if latest_date.month >= 4 else latest_date.year - 1
+        
+        fiscal_start = pd.Timestamp(fiscal_year, 4, 1)
+        fiscal_end = min(pd.Timestamp(fiscal_year + 1, 3, 31), latest_date.normalize())
+        if fiscal_end < fiscal_start:
+            return []
+        
+        if period_type == "月次":
+            dates = pd.date_range(fiscal_start, fiscal_end, freq='MS')
+        else:
+            first_monday = fiscal_start - pd.Timedelta(days=fiscal_start.weekday())
+            dates = pd.date_range(first_monday, fiscal_end, freq='7D')
+        return [date.to_pydatetime() for date in dates]
     
-    def _calculate_period(self, analysis_date: datetime, period_type: str) -> Dict:
+    def _calculate_period(self, analysis_date: datetime, period_type: str, df: Optional[pd.DataFrame] = None) -> Dict:
         """期間情報を計算"""
         if period_type == "週次":
             # 月曜日開始の週
@@ -106,487 +457,217 @@ class SurgeryMetricsExporter:
                 "label": f"{month_start.strftime('%Y年%m月')}"
             }
         else:
+            has_dates = df is not None and '手術実施日_dt' in df.columns
             return {
                 "type": "全期間",
-                "start_date": df['手術実施日_dt'].min() if '手術実施日_dt' in df.columns else analysis_date,
-                "end_date": df['手術実施日_dt'].max() if '手術実施日_dt' in df.columns else analysis_date,
+                "start_date": df['手術実施日_dt'].min() if has_dates else analysis_date,
+                "end_date": df['手術実施日_dt'].max() if has_dates else analysis_date,
                 "label": "全期間"
             }
 
-    def _calculate_overall_metrics(
-        self, 
-        df: pd.DataFrame, 
-        target_dict: Dict[str, float],
-        period_info: Dict
-    ) -> List[Dict]:
-        """全体メトリクス計算（拡張版）"""
-        metrics = []
+    def _prepare_frame(self, df: pd.DataFrame, period_infos: List[Dict]) -> pd.DataFrame:
+        """
+        集計に使う列だけを持つ作業用フレームを一度だけ作成
         
-        # 期間内データフィルタリング
-        period_df = self._filter_by_period(df, period_info)
+        - 日付・全身麻酔・平日の判定
+        - 入退室時刻からの手術時間（分）と入室時間帯（対象期間・直近4週にかかる行だけ解析）
+        """
+        prepared = pd.DataFrame(index=df.index)
+        if '手術実施日_dt' not in df.columns:
+            return prepared
+        
+        dates = df['手術実施日_dt']
+        prepared['date'] = dates
+        prepared['is_gas'] = (df['is_gas_20min'] == True) if 'is_gas_20min' in df.columns else True
+        prepared['is_weekday'] = dates.dt.weekday < 5
+        if '実施診療科' in df.columns:
+            prepared['dept'] = df['実施診療科']
+        if '実施術者' in df.columns:
+            prepared['surgeon'] = df['実施術者']
+        if '手術時間_分' in df.columns:
+            prepared['recorded_minutes'] = df['手術時間_分']
+        
+        # 時刻の解析が必要なのは、各期間と直近4週にかかる行だけ
+        needs_times = pd.Series(False, index=df.index)
+        for info in period_infos:
+            start = min(info["start_date"], info["end_date"] - timedelta(days=27))
+            needs_times |= (dates >= start) & (dates <= info["end_date"])
+        
+        if '入室時刻' in df.columns:
+            entry = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+            entry[needs_times] = _parse_hhmm(df.loc[needs_times, '入室時刻'])
+            hours = entry.dt.hour
+            prepared['time_slot'] = np.select(
+                [(hours >= 6) & (hours < 12), (hours >= 12) & (hours < 18), hours.notna()],
+                ['午前', '午後', '夜間'],
+                default=None
+            )
+            
+            if '退室時刻' in df.columns:
+                try:
+                    exit_time = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+                    exit_time[needs_times] = _parse_hhmm(df.loc[needs_times, '退室時刻'])
+                    # 深夜跨ぎの処理
+                    exit_time = exit_time.where(~(exit_time < entry), exit_time + pd.Timedelta(days=1))
+                    minutes = (exit_time - entry).dt.total_seconds() / 60
+                    # 異常値除外（0分未満、24時間以上）
+                    prepared['parsed_minutes'] = minutes.where((minutes >= 0) & (minutes <= 1440))
+                except Exception as e:
+                    logger.error(f"手術時間計算エラー: {e}")
         
-        if period_df.empty:
-            return metrics
+        return prepared
+
+    def _collect_metrics(self, table: _MetricTable, aggregates: _PeriodAggregates,
+                         target_dict: Dict[str, float], period_info: Dict) -> None:
+        """1期間分のメトリクスを追加（全体 → 診療科別 → 術者別 → 時間別）"""
+        key = aggregates.period_key(period_info)
+        if aggregates.row_counts.get(key, 0) == 0:
+            return
         
-        # === 直近週パフォーマンス ===
-        from datetime import timedelta
+        self._calculate_overall_metrics(table, aggregates, period_info)
+        self._calculate_department_metrics(table, aggregates, key, target_dict, period_info)
+        self._calculate_surgeon_metrics(table, aggregates, key, period_info)
+        self._calculate_time_metrics(table, aggregates, key, period_info)
+
+    def _calculate_overall_metrics(
+        self,
+        table: _MetricTable,
+        aggregates: _PeriodAggregates,
+        period_info: Dict
+    ) -> None:
+        """全体メトリクス計算（拡張版）"""
         analysis_date = period_info.get("end_date", datetime.now())
-        week_start = analysis_date - timedelta(days=6)
-        recent_week_df = df[
-            (df['手術実施日_dt'] >= week_start) & 
-            (df['手術実施日_dt'] <= analysis_date)
-        ]
         
-        # 全身麻酔手術件数（直近週）
-        gas_recent_week = recent_week_df[recent_week_df.get('is_gas_20min', False) == True] if 'is_gas_20min' in recent_week_df.columns else recent_week_df
-        gas_count_week = len(gas_recent_week)
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全身麻酔手術件数_直近週",
-            "値": gas_count_week,
-            "単位": "件",
-            "期間": f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # 全手術件数（直近週）
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全手術件数_直近週",
-            "値": len(recent_week_df),
-            "単位": "件",
-            "期間": f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # 平日1日あたり全身麻酔手術件数（直近週）
-        weekday_gas = gas_recent_week[gas_recent_week['手術実施日_dt'].dt.weekday < 5] if not gas_recent_week.empty else pd.DataFrame()
-        num_weekdays = len(pd.bdate_range(start=week_start, end=analysis_date))
-        daily_avg_week = len(weekday_gas) / num_weekdays if num_weekdays > 0 else 0
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "平日1日あたり全身麻酔手術_直近週",
-            "値": round(daily_avg_week, 1),
-            "単位": "件/日",
-            "期間": f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # === 直近4週間パフォーマンス ===
-        four_weeks_start = analysis_date - timedelta(days=27)
-        four_weeks_df = df[
-            (df['手術実施日_dt'] >= four_weeks_start) & 
-            (df['手術実施日_dt'] <= analysis_date)
-        ]
+        # === 直近週・直近4週パフォーマンス ===
+        for label, days in (("直近週", 6), ("直近4週", 27)):
+            window_start = analysis_date - timedelta(days=days)
+            num_weekdays = len(pd.bdate_range(start=window_start, end=analysis_date))
+            weekday_gas = aggregates.count('gas_weekday', window_start, analysis_date)
+            daily_avg = weekday_gas / num_weekdays if num_weekdays > 0 else 0
+            period = f"{window_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}"
+            
+            table.add("全体", f"全身麻酔手術件数_{label}", aggregates.count('gas', window_start, analysis_date),
+                      "件", period, label, "全体指標", "実績")
+            table.add("全体", f"全手術件数_{label}", aggregates.count('all', window_start, analysis_date),
+                      "件", period, label, "全体指標", "実績")
+            table.add("全体", f"平日1日あたり全身麻酔手術_{label}", round(daily_avg, 1), "件/日", period, label, "全体指標", "実績")
         
-        gas_four_weeks = four_weeks_df[four_weeks_df.get('is_gas_20min', False) == True] if 'is_gas_20min' in four_weeks_df.columns else four_weeks_df
-        
-        # 全身麻酔手術件数（直近4週）
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全身麻酔手術件数_直近4週",
-            "値": len(gas_four_weeks),
-            "単位": "件",
-            "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近4週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # 全手術件数（直近4週）
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全手術件数_直近4週",
-            "値": len(four_weeks_df),
-            "単位": "件",
-            "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近4週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # 平日1日あたり全身麻酔手術件数（直近4週）
-        weekday_gas_4w = gas_four_weeks[gas_four_weeks['手術実施日_dt'].dt.weekday < 5] if not gas_four_weeks.empty else pd.DataFrame()
-        num_weekdays_4w = len(pd.bdate_range(start=four_weeks_start, end=analysis_date))
-        daily_avg_4w = len(weekday_gas_4w) / num_weekdays_4w if num_weekdays_4w > 0 else 0
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "平日1日あたり全身麻酔手術_直近4週",
-            "値": round(daily_avg_4w, 1),
-            "単位": "件/日",
-            "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近4週",
-            "カテゴリ": "全体指標",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
+        four_weeks_start = analysis_date - timedelta(days=27)
+        num_weekdays_4w = num_weekdays
         
         # === 年度比較 ===
         current_year = analysis_date.year
         fiscal_year_start = datetime(current_year, 4, 1) if analysis_date.month >= 4 else datetime(current_year - 1, 4, 1)
+        current_fiscal_count = aggregates.count('gas', fiscal_year_start, analysis_date)
         
-        # 今年度累計
-        current_fiscal_df = df[
-            (df['手術実施日_dt'] >= fiscal_year_start) & 
-            (df['手術実施日_dt'] <= analysis_date)
-        ]
-        gas_current_fiscal = current_fiscal_df[current_fiscal_df.get('is_gas_20min', False) == True] if 'is_gas_20min' in current_fiscal_df.columns else current_fiscal_df
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全身麻酔手術件数_今年度累計",
-            "値": len(gas_current_fiscal),
-            "単位": "件",
-            "期間": f"{fiscal_year_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "年度累計",
-            "カテゴリ": "年度比較",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        # 昨年度同期
+        table.add("全体", "全身麻酔手術件数_今年度累計", current_fiscal_count, "件",
+                  f"{fiscal_year_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
+                  "年度累計", "年度比較", "実績")
+        
+        # 昨年度同期（2/29は前年の2/28にそろえる）
         prev_fiscal_start = datetime(fiscal_year_start.year - 1, 4, 1)
-        prev_fiscal_end = analysis_date.replace(year=analysis_date.year - 1)
+        prev_fiscal_end = (pd.Timestamp(analysis_date) - pd.DateOffset(years=1)).to_pydatetime()
+        prev_fiscal_count = aggregates.count('gas', prev_fiscal_start, prev_fiscal_end)
         
-        prev_fiscal_df = df[
-            (df['手術実施日_dt'] >= prev_fiscal_start) & 
-            (df['手術実施日_dt'] <= prev_fiscal_end)
-        ]
-        gas_prev_fiscal = prev_fiscal_df[prev_fiscal_df.get('is_gas_20min', False) == True] if 'is_gas_20min' in prev_fiscal_df.columns else prev_fiscal_df
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "全身麻酔手術件数_昨年度同期",
-            "値": len(gas_prev_fiscal),
-            "単位": "件",
-            "期間": f"{prev_fiscal_start.strftime('%Y/%m/%d')}~{prev_fiscal_end.strftime('%Y/%m/%d')}",
-            "期間タイプ": "年度比較",
-            "カテゴリ": "年度比較",
-            "データ種別": "実績",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
+        table.add("全体", "全身麻酔手術件数_昨年度同期", prev_fiscal_count, "件",
+                  f"{prev_fiscal_start.strftime('%Y/%m/%d')}~{prev_fiscal_end.strftime('%Y/%m/%d')}",
+                  "年度比較", "年度比較", "実績")
         
         # 前年度同期比
-        growth = len(gas_current_fiscal) - len(gas_prev_fiscal)
-        growth_rate = (growth / len(gas_prev_fiscal) * 100) if len(gas_prev_fiscal) > 0 else 0
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "前年度同期比_件数",
-            "値": growth,
-            "単位": "件",
-            "期間": analysis_date.strftime('%Y/%m/%d時点'),
-            "期間タイプ": "年度比較",
-            "カテゴリ": "年度比較",
-            "データ種別": "計算値",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "前年度同期比_率",
-            "値": round(growth_rate, 1),
-            "単位": "%",
-            "期間": analysis_date.strftime('%Y/%m/%d時点'),
-            "期間タイプ": "年度比較",
-            "カテゴリ": "年度比較",
-            "データ種別": "計算値",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
+        growth = current_fiscal_count - prev_fiscal_count
+        growth_rate = (growth / prev_fiscal_count * 100) if prev_fiscal_count > 0 else 0
+        as_of = analysis_date.strftime('%Y/%m/%d時点')
+        table.add("全体", "前年度同期比_件数", growth, "件", as_of, "年度比較", "年度比較", "計算値")
+        table.add("全体", "前年度同期比_率", round(growth_rate, 1), "%", as_of, "年度比較", "年度比較", "計算値")
         
         # === 手術室稼働率 ===
-        # 平日の手術室稼働可能時間（例：8時間 × 手術室数）
-        operating_rooms = 10  # 手術室数（設定可能にする）
-        daily_capacity_hours = 8  # 1日の稼働可能時間
-        
-        weekday_df = four_weeks_df[four_weeks_df['手術実施日_dt'].dt.weekday < 5]
-        
-        if '手術時間_分' in weekday_df.columns:
-            total_surgery_minutes = weekday_df['手術時間_分'].sum()
-        elif '入室時刻' in weekday_df.columns and '退室時刻' in weekday_df.columns:
-            time_df = self._calculate_surgery_duration(weekday_df)
-            total_surgery_minutes = time_df['手術時間_分'].sum() if not time_df.empty else 0
-        else:
-            # デフォルト値として平均60分と仮定
-            total_surgery_minutes = len(weekday_df) * 60
-        
-        total_capacity_minutes = num_weekdays_4w * operating_rooms * daily_capacity_hours * 60
+        total_surgery_minutes = aggregates.weekday_minutes(four_weeks_start, analysis_date)
+        total_capacity_minutes = num_weekdays_4w * OPERATING_ROOMS * DAILY_CAPACITY_HOURS * 60
         utilization_rate = (total_surgery_minutes / total_capacity_minutes * 100) if total_capacity_minutes > 0 else 0
         
-        metrics.append({
-            "診療科名": "全体",
-            "メトリクス名": "手術室稼働率_直近4週",
-            "値": round(utilization_rate, 1),
-            "単位": "%",
-            "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-            "期間タイプ": "直近4週",
-            "カテゴリ": "稼働率",
-            "データ種別": "計算値",
-            "計算日時": datetime.now().isoformat(),
-            "アプリ名": self.app_name
-        })
-        return metrics
+        table.add("全体", "手術室稼働率_直近4週", round(utilization_rate, 1), "%",
+                  f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
+                  "直近4週", "稼働率", "計算値")
 
     def _calculate_department_metrics(
         self,
-        df: pd.DataFrame,
+        table: _MetricTable,
+        aggregates: _PeriodAggregates,
+        key: int,
         target_dict: Dict[str, float],
         period_info: Dict
-    ) -> List[Dict]:
-        """診療科別メトリクス計算（修正版）"""
-        metrics = []
-        
-        # 分析基準日
+    ) -> None:
+        """診療科別メトリクス計算"""
         analysis_date = period_info.get("end_date", datetime.now())
-        
-        # 期間内データフィルタリング
-        period_df = self._filter_by_period(df, period_info)
-        
-        if period_df.empty or '実施診療科' not in period_df.columns:
-            return metrics
-        
-        # 診療科リスト取得
-        departments = period_df['実施診療科'].unique()
-        
-        for dept in departments:
-            # --- 修正箇所 ここから ---
-            # 4週平均の計算は、期間で絞り込む前の元の`df`から行う
-            four_weeks_start = analysis_date - timedelta(days=27)
-            
-            # まず診療科で絞り込む
-            dept_df_full = df[df['実施診療科'] == dept]
-            
-            # 次に全身麻酔で絞り込む
-            if 'is_gas_20min' in dept_df_full.columns:
-                gas_dept_df_full = dept_df_full[dept_df_full['is_gas_20min'] == True]
-            else:
-                gas_dept_df_full = dept_df_full
-            
-            # 最後に4週間の期間で絞り込む
-            four_weeks_dept = gas_dept_df_full[
-                (gas_dept_df_full['手術実施日_dt'] >= four_weeks_start) & 
-                (gas_dept_df_full['手術実施日_dt'] <= analysis_date)
-            ]
-            
-            # 4週間の総件数を4で割って週平均を算出
-            total_4weeks = len(four_weeks_dept)
-            avg_4weeks = total_4weeks / 4.0
-            # --- 修正箇所 ここまで ---
-            
-            metrics.append({
-                "診療科名": dept,
-                "メトリクス名": "全身麻酔手術_4週平均",
-                "値": round(avg_4weeks, 1),
-                "単位": "件/週",
-                "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-                "期間タイプ": "4週平均",
-                "カテゴリ": "診療科別実績",
-                "データ種別": "実績",
-                "計算日時": datetime.now().isoformat(),
-                "アプリ名": self.app_name,
-                "補足": f"4週間総数{total_4weeks}件÷4週"
-            })
-            
-            # === 直近週実績など、他の期間に依存する指標は period_df を使用する ===
-            dept_df_period = period_df[period_df['実施診療科'] == dept]
-            if 'is_gas_20min' in dept_df_period.columns:
-                gas_dept_df_period = dept_df_period[dept_df_period['is_gas_20min'] == True]
-            else:
-                gas_dept_df_period = dept_df_period
-    
-            week_start = analysis_date - timedelta(days=6)
-            recent_week_dept = gas_dept_df_period[
-                (gas_dept_df_period['手術実施日_dt'] >= week_start) & 
-                (gas_dept_df_period['手術実施日_dt'] <= analysis_date)
-            ]
-            recent_week_count = len(recent_week_dept)
-            
-            metrics.append({
-                "診療科名": dept,
-                "メトリクス名": "全身麻酔手術_直近週実績",
-                "値": recent_week_count,
-                "単位": "件",
-                "期間": f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-                "期間タイプ": "直近週",
-                "カテゴリ": "診療科別実績",
-                "データ種別": "実績",
-                "計算日時": datetime.now().isoformat(),
-                "アプリ名": self.app_name
-            })
+        four_weeks_start = analysis_date - timedelta(days=27)
+        week_start = analysis_date - timedelta(days=6)
+        # 直近週は期間内のデータだけで数える（月次では期間末の1週間、週次では期間そのもの）
+        recent_week_start = max(week_start, period_info["start_date"]) if period_info["type"] != "全期間" else week_start
+        four_weeks_period = f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}"
+        week_period = f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}"
+        
+        for dept in aggregates.departments.get(key, []):
+            # 4週平均は期間で絞り込む前のデータから集計する
+            total_4weeks = aggregates.department_gas_count(dept, four_weeks_start, analysis_date)
+            recent_week_count = aggregates.department_gas_count(dept, recent_week_start, analysis_date)
+            
+            table.add(dept, "全身麻酔手術_4週平均", round(total_4weeks / 4.0, 1), "件/週",
+                      four_weeks_period, "4週平均", "診療科別実績", "実績",
+                      note=f"4週間総数{total_4weeks}件÷4週")
+            table.add(dept, "全身麻酔手術_直近週実績", recent_week_count, "件",
+                      week_period, "直近週", "診療科別実績", "実績")
             
             # === 週次目標と達成率 ===
             if target_dict and dept in target_dict:
                 weekly_target = target_dict[dept]
-                
-                metrics.append({
-                    "診療科名": dept,
-                    "メトリクス名": "全身麻酔手術_週次目標",
-                    "値": weekly_target,
-                    "単位": "件/週",
-                    "期間": period_info["label"],
-                    "期間タイプ": period_info["type"],
-                    "カテゴリ": "診療科別目標",
-                    "データ種別": "目標",
-                    "計算日時": datetime.now().isoformat(),
-                    "アプリ名": self.app_name
-                })
-                
-                # 達成率（直近週実績 / 週次目標）
                 achievement_rate = (recent_week_count / weekly_target * 100) if weekly_target > 0 else 0
-                
-                metrics.append({
-                    "診療科名": dept,
-                    "メトリクス名": "全身麻酔手術_達成率",
-                    "値": round(achievement_rate, 1),
-                    "単位": "%",
-                    "期間": f"{week_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-                    "期間タイプ": "直近週",
-                    "カテゴリ": "診療科別目標",
-                    "データ種別": "計算値",
-                    "計算日時": datetime.now().isoformat(),
-                    "アプリ名": self.app_name
-                })
-                
+                table.add(dept, "全身麻酔手術_週次目標", weekly_target, "件/週",
+                          period_info["label"], period_info["type"], "診療科別目標", "目標")
+                table.add(dept, "全身麻酔手術_達成率", round(achievement_rate, 1), "%",
+                          week_period, "直近週", "診療科別目標", "計算値")
+            
             # === 4週間総数も出力（参考値） ===
-            metrics.append({
-                "診療科名": dept,
-                "メトリクス名": "全身麻酔手術_4週間総数",
-                "値": total_4weeks,
-                "単位": "件",
-                "期間": f"{four_weeks_start.strftime('%Y/%m/%d')}~{analysis_date.strftime('%Y/%m/%d')}",
-                "期間タイプ": "4週間",
-                "カテゴリ": "診療科別実績",
-                "データ種別": "実績",
-                "計算日時": datetime.now().isoformat(),
-                "アプリ名": self.app_name
-            })
-        
-        return metrics
+            table.add(dept, "全身麻酔手術_4週間総数", total_4weeks, "件",
+                      four_weeks_period, "4週間", "診療科別実績", "実績")
 
     def _calculate_surgeon_metrics(
         self,
-        df: pd.DataFrame,
+        table: _MetricTable,
+        aggregates: _PeriodAggregates,
+        key: int,
         period_info: Dict
-    ) -> List[Dict]:
-        """術者別メトリクス計算"""
-        metrics = []
-        
-        # 期間内データフィルタリング
-        period_df = self._filter_by_period(df, period_info)
-        
-        if period_df.empty or '実施術者' not in period_df.columns:
-            return metrics
-        
-        # 術者別集計
-        surgeon_counts = period_df['実施術者'].value_counts()
-        
-        # トップ10術者のみ出力
-        top_surgeons = surgeon_counts.head(10)
-        
-        for surgeon, count in top_surgeons.items():
-            metrics.append({
-                "診療科名": "術者別",
-                "メトリクス名": f"手術件数_{surgeon}",
-                "値": count,
-                "単位": "件",
-                "期間": period_info["label"],
-                "期間タイプ": period_info["type"],
-                "カテゴリ": "術者別実績",
-                "データ種別": "実績",
-                "計算日時": datetime.now().isoformat(),
-                "アプリ名": self.app_name
-            })
-        
-        return metrics
+    ) -> None:
+        """術者別メトリクス計算（トップ10術者のみ出力）"""
+        surgeon_counts = aggregates.surgeon_counts.get(key)
+        if surgeon_counts is None:
+            return
+        
+        for surgeon, count in surgeon_counts.items():
+            table.add("術者別", f"手術件数_{surgeon}", count, "件",
+                      period_info["label"], period_info["type"], "術者別実績", "実績")
     
     def _calculate_time_metrics(
         self,
-        df: pd.DataFrame,
+        table: _MetricTable,
+        aggregates: _PeriodAggregates,
+        key: int,
         period_info: Dict
-    ) -> List[Dict]:
+    ) -> None:
         """時間関連メトリクス計算"""
-        metrics = []
-        
-        # 期間内データフィルタリング
-        period_df = self._filter_by_period(df, period_info)
-        
-        if period_df.empty:
-            return metrics
-        
         # 手術時間分析（入室・退室時刻がある場合）
-        if '入室時刻' in period_df.columns and '退室時刻' in period_df.columns:
-            try:
-                # 手術時間計算
-                time_data = self._calculate_surgery_duration(period_df)
-                
-                if not time_data.empty:
-                    avg_duration = time_data['手術時間_分'].mean()
-                    
-                    metrics.append({
-                        "診療科名": "全体",
-                        "メトリクス名": "平均手術時間",
-                        "値": round(avg_duration, 1),
-                        "単位": "分",
-                        "期間": period_info["label"],
-                        "期間タイプ": period_info["type"],
-                        "カテゴリ": "時間分析",
-                        "データ種別": "実績",
-                        "計算日時": datetime.now().isoformat(),
-                        "アプリ名": self.app_name
-                    })
-            except Exception as e:
-                logger.warning(f"手術時間計算エラー: {e}")
+        mean_duration = aggregates.mean_duration.get(key)
+        if mean_duration is not None and not pd.isna(mean_duration):
+            table.add("全体", "平均手術時間", round(mean_duration, 1), "分",
+                      period_info["label"], period_info["type"], "時間分析", "実績")
         
         # 時間帯別分析
-        if '入室時刻' in period_df.columns:
-            try:
-                time_slot_analysis = self._analyze_time_slots(period_df)
-                
-                for time_slot, count in time_slot_analysis.items():
-                    metrics.append({
-                        "診療科名": "全体",
-                        "メトリクス名": f"手術件数_{time_slot}",
-                        "値": count,
-                        "単位": "件",
-                        "期間": period_info["label"],
-                        "期間タイプ": period_info["type"],
-                        "カテゴリ": "時間帯分析",
-                        "データ種別": "実績",
-                        "計算日時": datetime.now().isoformat(),
-                        "アプリ名": self.app_name
-                    })
-            except Exception as e:
-                logger.warning(f"時間帯分析エラー: {e}")
-        
-        return metrics
+        for time_slot, count in aggregates.time_slot_counts.get(key, pd.Series(dtype=int)).items():
+            table.add("全体", f"手術件数_{time_slot}", count, "件",
+                      period_info["label"], period_info["type"], "時間帯分析", "実績")
     
-    def _filter_by_period(self, df: pd.DataFrame, period_info: Dict) -> pd.DataFrame:
+    def _filter_by_period(self, df: pd.DataFrame, period_info: Dict, date_column: str = '手術実施日_dt') -> pd.DataFrame:
         """期間でデータをフィルタリング"""
-        if '手術実施日_dt' not in df.columns:
+        if date_column not in df.columns:
             return df
         
         if period_info["type"] == "全期間":
@@ -596,57 +677,14 @@ class SurgeryMetricsExporter:
         end_date = period_info["end_date"]
         
         return df[
-            (df['手術実施日_dt'] >= start_date) & 
-            (df['手術実施日_dt'] <= end_date)
+            (df[date_column] >= start_date) & 
+            (df[date_column] <= end_date)
         ]
     
-    def _calculate_surgery_duration(self, df: pd.DataFrame) -> pd.DataFrame:
-        """手術時間を計算"""
-        try:
-            # 時刻文字列をdatetimeに変換
-            df_copy = df.copy()
-            df_copy['入室時刻_dt'] = pd.to_datetime(df_copy['入室時刻'], format='%H:%M', errors='coerce')
-            df_copy['退室時刻_dt'] = pd.to_datetime(df_copy['退室時刻'], format='%H:%M', errors='coerce')
-            
-            # 深夜跨ぎの処理
-            mask = df_copy['退室時刻_dt'] < df_copy['入室時刻_dt']
-            df_copy.loc[mask, '退室時刻_dt'] += pd.Timedelta(days=1)
-            
-            # 手術時間（分）計算
-            df_copy['手術時間_分'] = (df_copy['退室時刻_dt'] - df_copy['入室時刻_dt']).dt.total_seconds() / 60
-            
-            # 異常値除外（0分未満、24時間以上）
-            df_copy = df_copy[
-                (df_copy['手術時間_分'] >= 0) & 
-                (df_copy['手術時間_分'] <= 1440)
-            ]
-            
-            return df_copy
-        except Exception as e:
-            logger.error(f"手術時間計算エラー: {e}")
-            return pd.DataFrame()
-    
-    def _analyze_time_slots(self, df: pd.DataFrame) -> Dict[str, int]:
-        """時間帯別分析"""
-        try:
-            df_copy = df.copy()
-            df_copy['入室時刻_dt'] = pd.to_datetime(df_copy['入室時刻'], format='%H:%M', errors='coerce')
-            df_copy = df_copy.dropna(subset=['入室時刻_dt'])
-            
-            df_copy['時間帯'] = df_copy['入室時刻_dt'].dt.hour.map(
-                lambda x: '午前' if 6 <= x < 12 else '午後' if 12 <= x < 18 else '夜間'
-            )
-            
-            time_slot_counts = df_copy['時間帯'].value_counts()
-            return time_slot_counts.to_dict()
-        except Exception as e:
-            logger.error(f"時間帯分析エラー: {e}")
-            return {}
-    
-    def _generate_filename(self, analysis_date: datetime, period_type: str) -> str:
+    def _generate_filename(self, analysis_date: datetime, period_type: str, extension: str = "csv") -> str:
         """ファイル名生成"""
         date_str = analysis_date.strftime("%Y%m%d")
-        return f"{date_str}_{self.app_name}_メトリクス_{period_type}.csv"
+        return f"{date_str}_{self.app_name}_メトリクス_{period_type}.{extension}"
     
     def create_downloadable_csv(self, metrics_df: pd.DataFrame) -> io.BytesIO:
         """ダウンロード可能なCSVファイルを作成"""
@@ -655,9 +693,21 @@ class SurgeryMetricsExporter:
         output.seek(0)
         return output
 
+    def create_downloadable_parquet(self, metrics_df: pd.DataFrame) -> Optional[io.BytesIO]:
+        """ダウンロード可能なParquetファイルを作成（pyarrow / fastparquet が必要）"""
+        if not PARQUET_AVAILABLE:
+            logger.warning("Parquet出力には pyarrow または fastparquet が必要です")
+            return None
+        output = io.BytesIO()
+        metrics_df.to_parquet(output, index=False)
+        output.seek(0)
+        return output
+
 
 def create_surgery_metrics_export_interface():
     """手術メトリクス出力インターフェース"""
+    import streamlit as st
+
     try:
         st.subheader("📊 手術メトリクス出力")
         
@@ -688,14 +738,36 @@ def create_surgery_metrics_export_interface():
                 help="分析の基準となる日付を選択してください"
             )
         
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            all_periods = st.checkbox(
+                "年度内の全期間をまとめて出力",
+                value=False,
+                disabled=period_type == "全期間",
+                help="基準日の年度に含まれる全週（月次の場合は全月）のメトリクスを1つのファイルに出力します"
+            )
+            all_periods = all_periods and period_type != "全期間"
+        
+        with col4:
+            output_formats = ["CSV", "Parquet"] if PARQUET_AVAILABLE else ["CSV"]
+            output_format = st.radio("出力形式", output_formats, horizontal=True)
+        
+        def _calculate(exporter: SurgeryMetricsExporter) -> Tuple[pd.DataFrame, str]:
+            base_date = datetime.combine(analysis_date, datetime.min.time())
+            if all_periods:
+                fiscal_year = base_date.year if base_date.month >= 4 else base_date.year - 1
+                return exporter.export_metrics_multi_period(df, target_dict, fiscal_year, period_type)
+            return exporter.export_metrics_csv(df, target_dict, base_date, period_type)
+        
+        preview_key = (period_type, analysis_date, all_periods)
+        
         # プレビュー表示
         if st.button("📋 メトリクスプレビュー", type="secondary"):
             with st.spinner("メトリクス計算中..."):
                 try:
                     exporter = SurgeryMetricsExporter()
-                    metrics_df, filename = exporter.export_metrics_csv(
-                        df, target_dict, datetime.combine(analysis_date, datetime.min.time()), period_type
-                    )
+                    metrics_df, filename = _calculate(exporter)
                     
                     st.success(f"✅ メトリクス計算完了: {len(metrics_df)}件のメトリクス")
                     
@@ -725,6 +797,7 @@ def create_surgery_metrics_export_interface():
                     # セッションに保存
                     st.session_state['preview_metrics_df'] = metrics_df
                     st.session_state['preview_filename'] = filename
+                    st.session_state['preview_metrics_key'] = preview_key
                     
                 except Exception as e:
                     st.error(f"❌ メトリクス計算エラー: {e}")
@@ -733,40 +806,73 @@ def create_surgery_metrics_export_interface():
         # CSV出力
         st.markdown("---")
         
-        if st.button("📥 CSV出力", type="primary"):
+        if st.button(f"📥 {output_format}出力", type="primary"):
             try:
                 # 修正箇所: exporterをtryブロックの最初にインスタンス化する
                 # これにより、プレビューの有無に関わらず常にexporterが利用可能になる
                 exporter = SurgeryMetricsExporter()
 
-                # プレビューデータがあればそれを使用、なければ新規計算
-                if 'preview_metrics_df' in st.session_state:
+                # 同じ条件のプレビューデータがあればそれを使用、なければ新規計算
+                if st.session_state.get('preview_metrics_key') == preview_key and 'preview_metrics_df' in st.session_state:
                     metrics_df = st.session_state['preview_metrics_df']
                     filename = st.session_state['preview_filename']
                 else:
                     with st.spinner("メトリクス計算中..."):
                         # 事前に作成したexporterを使用
-                        metrics_df, filename = exporter.export_metrics_csv(
-                            df, target_dict, datetime.combine(analysis_date, datetime.min.time()), period_type
-                        )
+                        metrics_df, filename = _calculate(exporter)
                 
-                # CSV出力
                 # これで、この行に到達したときには必ずexporterが存在する
-                csv_data = exporter.create_downloadable_csv(metrics_df)
-                
-                st.download_button(
-                    label="💾 メトリクスCSVダウンロード",
-                    data=csv_data,
-                    file_name=filename,
-                    mime="text/csv",
-                    help=f"{filename} をダウンロードします。ポータル統合用の標準化されたメトリクスデータです。"
-                )
+                if output_format == "Parquet":
+                    file_data = exporter.create_downloadable_parquet(metrics_df)
+                    filename = str(Path(filename).with_suffix(".parquet"))
+                    mime = "application/octet-stream"
+                else:
+                    file_data = exporter.create_downloadable_csv(metrics_df)
+                    mime = "text/csv"
                 
-                st.success(f"✅ CSV出力準備完了: {len(metrics_df)}件のメトリクス")
+                if file_data is None:
+                    st.error(f"❌ {output_format}出力に必要なライブラリがありません")
+                else:
+                    st.download_button(
+                        label=f"💾 メトリクス{output_format}ダウンロード",
+                        data=file_data,
+                        file_name=filename,
+                        mime=mime,
+                        help=f"{filename} をダウンロードします。ポータル統合用の標準化されたメトリクスデータです。"
+                    )
+                    
+                    st.success(f"✅ {output_format}出力準備完了: {len(metrics_df)}件のメトリクス")
                 
             except Exception as e:
-                st.error(f"❌ CSV出力エラー: {e}")
-                logger.error(f"CSV出力エラー: {e}")
+                st.error(f"❌ {output_format}出力エラー: {e}")
+                logger.error(f"{output_format}出力エラー: {e}")
+        
+        # 過去分の一括出力
+        with st.expander("📚 過去分の一括出力（バックフィル）"):
+            st.caption("データの全期間について、週次または月次のメトリクスを1ファイルにまとめて出力します")
+            backfill_period = st.radio("期間タイプ", ["週次", "月次"], horizontal=True, key="metrics_backfill_period")
+            
+            if st.button("📚 バックフィル出力を作成", key="metrics_backfill_button"):
+                try:
+                    exporter = SurgeryMetricsExporter()
+                    file_format = "parquet" if output_format == "Parquet" and PYARROW_AVAILABLE else "csv"
+                    output = io.BytesIO()
+                    with st.spinner("全期間のメトリクスを計算中..."):
+                        row_count = exporter.backfill_metrics(df, output, target_dict, backfill_period, file_format)
+                    output.seek(0)
+                    
+                    filename = exporter._generate_filename(datetime.now(), f"{backfill_period}_全履歴", file_format)
+                    st.download_button(
+                        label="💾 バックフィルデータをダウンロード",
+                        data=output,
+                        file_name=filename,
+                        mime="text/csv" if file_format == "csv" else "application/octet-stream",
+                        key="metrics_backfill_download"
+                    )
+                    st.success(f"✅ バックフィル出力準備完了: {row_count}件のメトリクス")
+                except Exception as e:
+                    st.error(f"❌ バックフィル出力エラー: {e}")
+                    logger.error(f"バックフィル出力エラー: {e}")
         
         # 使用方法説明
         with st.expander("ℹ️ 使用方法とデータ形式"):
@@ -796,6 +902,8 @@ def create_surgery_metrics_export_interface():
             - 診療科名、メトリクス名、値、単位、期間などの共通フォーマット
             - ポータルwebページで自動読み込み・表示可能
             - 他のアプリ（入退院分析等）と統合表示
+            - Parquet形式でも同じ列構成で出力できます
+            - 年度内の全期間をまとめて出力した場合やバックフィル出力では「基準日」列で期間を区別します
             """)
     
     except Exception as e:
@@ -805,5 +913,6 @@ def create_surgery_metrics_export_interface():
 
 if __name__ == "__main__":
     # テスト用
+    import streamlit as st
     st.title("手術メトリクス出力テスト")
     create_surgery_metrics_export_interface()
\ No newline at end of file
@@ -0,0 +1,462 @@
+function showView(viewId) {
+    // すべてのタブとコンテンツを非アクティブ化
+    document.querySelectorAll('.view-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    document.querySelectorAll('.view-content').forEach(content => {
+        content.classList.remove('active');
+    });
+
+    // 選択されたタブとコンテンツをアクティブ化
+    event.target.classList.add('active');
+    document.getElementById(viewId).classList.add('active');
+
+    // タブ表示時に必要なデータを読み込む
+    DashboardData.activate(viewId);
+}
+
+// 情報パネルの表示/非表示
+function toggleInfoPanel() {
+    const panel = document.getElementById('info-panel');
+    const overlay = document.getElementById('info-overlay');
+
+    if (panel.style.display === 'block') {
+        panel.style.display = 'none';
+        overlay.style.display = 'none';
+    } else {
+        panel.style.display = 'block';
+        overlay.style.display = 'block';
+    }
+}
+
+// オーバーレイクリックで閉じる
+function closeInfoPanel() {
+    document.getElementById('info-panel').style.display = 'none';
+    document.getElementById('info-overlay').style.display = 'none';
+}
+
+// ページ読み込み時の初期化
+document.addEventListener('DOMContentLoaded', function() {
+    // デフォルトで病院全体手術サマリを表示
+    document.getElementById('surgery-summary').classList.add('active');
+    DashboardData.activate('surgery-summary');
+});
+
+// === データAPI（data/v1/*.json）の遅延読み込みとセクション・チャート描画 ===
+// タブ要素の data-datasets に書かれたデータセットを、タブを初めて表示したときに取得する。
+// data-section（カード・ランキング等）、data-chart（グラフ）、data-field（フッターの基準日等）を描画する。
+// 単一ページ版では <script type="application/json" id="dashboard-data-名前"> に埋め込まれたデータを使う。
+const DashboardData = (function() {
+    const cache = {};
+
+    function load(name, base) {
+        if (!cache[name]) {
+            const embedded = document.getElementById('dashboard-data-' + name);
+            if (embedded) {
+                cache[name] = Promise.resolve(JSON.parse(embedded.textContent));
+            } else {
+                cache[name] = fetch(base + name + '.json', { cache: 'no-cache' }).then(response => {
+                    if (!response.ok) {
+                        throw new Error(name + '.json の取得に失敗しました (' + response.status + ')');
+                    }
+                    return response.json();
+                });
+            }
+        }
+        return cache[name];
+    }
+
+    function activate(viewId) {
+        const view = document.getElementById(viewId);
+        if (!view || !view.dataset.datasets || view.dataset.loaded) {
+            return;
+        }
+        view.dataset.loaded = 'true';
+
+        const base = view.dataset.source || 'data/v1/';
+        view.dataset.datasets.split(' ').forEach(name => {
+            load(name, base)
+                .then(payload => render(view, name, payload.data))
+                .catch(error => console.error(error));
+        });
+    }
+
+    function render(view, name, data) {
+        view.querySelectorAll('[data-section]').forEach(element => {
+            const [datasetName, key] = element.dataset.section.split('.');
+            if (datasetName === name && sectionRenderers[key]) {
+                element.innerHTML = sectionRenderers[key](data, element);
+            }
+        });
+        view.querySelectorAll('[data-chart]').forEach(canvas => {
+            const [datasetName, key] = canvas.dataset.chart.split('.');
+            if (datasetName === name && data[key] && chartRenderers[key]) {
+                chartRenderers[key](canvas, data[key]);
+            }
+        });
+        document.querySelectorAll('[data-field]').forEach(element => {
+            const [datasetName, key] = element.dataset.field.split('.');
+            if (datasetName === name && data[key] !== undefined && data[key] !== null) {
+                element.textContent = data[key];
+            }
+        });
+    }
+
+    // --- 表示形式（Python版の書式 {:,} / {:.1f} / {:+.1f} に合わせる） ---
+    function escapeHtml(value) {
+        return String(value === undefined || value === null ? '' : value).replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[ch]);
+    }
+
+    function toNumber(value) {
+        const number = Number(value);
+        return isFinite(number) ? number : 0;
+    }
+
+    function formatCount(value) {
+        return Math.trunc(toNumber(value)).toLocaleString('en-US');
+    }
+
+    function formatFixed(value, digits) {
+        return toNumber(value).toFixed(digits);
+    }
+
+    function formatSigned(value, digits) {
+        const number = toNumber(value);
+        return (number >= 0 ? '+' : '') + number.toFixed(digits);
+    }
+
+    function formatSignedCount(value) {
+        const number = Math.trunc(toNumber(value));
+        return (number >= 0 ? '+' : '') + number.toLocaleString('en-US');
+    }
+
+    function parsePercent(value) {
+        const number = parseFloat(String(value === undefined || value === null ? '' : value).replace('%', ''));
+        return isNaN(number) ? null : number;
+    }
+
+    // 閾値（降順）から評価クラスを決める
+    function levelClass(value, thresholds, fallback) {
+        for (const [threshold, cssClass] of thresholds) {
+            if (value >= threshold) {
+                return cssClass;
+            }
+        }
+        return fallback;
+    }
+
+    const LEVEL_LABELS = { success: '優秀', info: '良好', warning: '注意', danger: '要改善' };
+
+    function metricRow(label, value) {
+        return '<div class="metric-row"><span>' + label + '</span>'
+            + '<span class="metric-value-row">' + value + '</span></div>';
+    }
+
+    function achievementRow(label, value) {
+        return '<div class="achievement-row"><span>' + label + '</span><span>' + value + '</span></div>';
+    }
+
+    function progressBar(percent) {
+        return '<div class="progress-bar"><div class="progress-fill" style="width: '
+            + Math.min(Math.max(percent, 0), 100) + '%;"></div></div>';
+    }
+
+    function metricCard(cssClass, title, body) {
+        return '<div class="metric-card ' + cssClass + '"><div class="metric-title">' + title + '</div>'
+            + body + '</div>';
+    }
+
+    function statItem(value, label) {
+        return '<div class="stat-item"><div class="stat-value">' + value + '</div>'
+            + '<div class="stat-label">' + label + '</div></div>';
+    }
+
+    const sectionRenderers = {
+        // 病院全体サマリー（kpi.json）
+        summary: function(kpi) {
+            const basic = kpi.basic || {};
+            const recent = kpi.recent_week || {};
+            const yearly = kpi.yearly || {};
+            if (!Object.keys(yearly).length && !Object.keys(basic).length) {
+                return '<div><p>病院サマリーデータを準備中です...</p></div>';
+            }
+
+            const recentGas = toNumber(recent['全身麻酔手術件数 (直近週)']);
+            const recentClass = levelClass(recentGas, [[100, 'success'], [80, 'info'], [70, 'warning']], 'danger');
+            const recentCard = metricCard(recentClass, '📅 直近週パフォーマンス',
+                metricRow('全身麻酔手術件数', formatCount(recentGas) + ' 件')
+                + metricRow('全手術件数', formatCount(recent['全手術件数 (直近週)']) + ' 件')
+                + metricRow('平日1日あたり全身麻酔手術', escapeHtml(recent['平日1日あたり全身麻酔手術件数 (直近週)'] || '0.0') + ' 件')
+                + achievementRow('評価', LEVEL_LABELS[recentClass]));
+
+            const gas4w = toNumber(basic['全身麻酔手術件数 (直近4週)']);
+            const fourWeekClass = levelClass(gas4w, [[400, 'success'], [350, 'info'], [280, 'warning']], 'danger');
+            const fourWeekCard = metricCard(fourWeekClass, '📊 直近4週間パフォーマンス',
+                metricRow('全身麻酔手術件数', formatCount(gas4w) + ' 件')
+                + metricRow('全手術件数', formatCount(basic['全手術件数 (直近4週)']) + ' 件')
+                + metricRow('平日1日あたり全身麻酔手術', escapeHtml(basic['平日1日あたり全身麻酔手術件数'] || '0.0') + ' 件')
+                + achievementRow('評価', LEVEL_LABELS[fourWeekClass]));
+
+            const growthRate = toNumber(yearly.growth_rate);
+            const yearlyClass = growthRate > 5 ? 'success' : growthRate >= 0 ? 'warning' : 'danger';
+            const yearlyCard = metricCard(yearlyClass, '📈 全身麻酔手術件数 年度比較',
+                metricRow('今年度累計 (' + escapeHtml(yearly.comparison_period || 'N/A') + ')', formatCount(yearly.current_fiscal_total) + ' 件')
+                + metricRow('昨年度同期', formatCount(yearly.prev_fiscal_total) + ' 件')
+                + metricRow('年度末予測', formatCount(yearly.projected_annual) + ' 件')
+                + achievementRow('前年度同期比', formatSignedCount(yearly.difference) + ' 件 (' + formatSigned(growthRate, 1) + '%)')
+                + progressBar(Math.abs(growthRate) * 10));
+
+            const utilizationText = basic['手術室稼働率 (全手術、平日のみ)'] || '0.0%';
+            const utilization = parsePercent(utilizationText);
+            const utilizationClass = utilization === null ? 'danger'
+                : levelClass(utilization, [[85, 'success'], [80, 'warning'], [75, 'info']], 'danger');
+            const prevUtilization = yearly.prev_year_utilization_rate;
+            const utilizationCard = metricCard(utilizationClass, '🏥 手術室稼働率 (直近4週)',
+                metricRow('現在の稼働率', escapeHtml(utilizationText))
+                + (prevUtilization && prevUtilization !== 'N/A' ? metricRow('前年度同期稼働率', escapeHtml(prevUtilization)) : '')
+                + achievementRow('評価', utilizationClass === 'danger' ? '改善余地あり' : LEVEL_LABELS[utilizationClass])
+                + progressBar(utilization || 0));
+
+            return '<div class="summary"><h2>🏥 病院全体サマリー</h2></div>'
+                + '<div class="grid-container">' + recentCard + fourWeekCard + yearlyCard + utilizationCard + '</div>';
+        },
+
+        // 詳細分析・改善提案（kpi.json）
+        analysis: function(kpi) {
+            const basic = kpi.basic || {};
+            const yearly = kpi.yearly || {};
+            const growthRate = toNumber(yearly.growth_rate);
+            const utilization = parsePercent(basic['手術室稼働率 (全手術、平日のみ)'] || '0%') || 0;
+            const projected = toNumber(yearly.projected_annual);
+
+            const improvementClass = growthRate > 0 ? 'success' : growthRate >= -2 ? 'warning' : 'danger';
+            const improvementTitle = growthRate > 0 ? '✅ 年度目標達成状況' : growthRate >= -2 ? '⚠️ 注意ポイント' : '🚨 緊急対応事項';
+            const improvementAnalysis = '<div class="analysis-card ' + improvementClass + '"><h3>' + improvementTitle + '</h3><ul>'
+                + '<li>前年度同期比' + formatSigned(growthRate, 1) + '%' + (growthRate > 0 ? 'の順調な増加' : 'で要改善') + '</li>'
+                + '<li>手術室稼働率' + formatFixed(utilization, 1) + '%は' + (utilization >= 80 ? '適正水準' : '改善余地あり') + '</li>'
+                + '<li>年度末予測' + formatCount(projected) + '件' + (growthRate > 10 ? 'は過去最高水準' : 'の実現を目指す') + '</li>'
+                + '<li>' + (growthRate > 5 ? '継続的な成長基調を維持' : '更なる取り組み強化が必要') + '</li>'
+                + '</ul></div>';
+
+            const actionPlan = '<div class="analysis-card info"><h3>🎯 目標達成施策</h3><ul>'
+                + '<li>手術室稼働率を' + formatFixed(Math.max(85, utilization + 5), 0) + '%以上に向上させる</li>'
+                + '<li>診療科間の手術枠最適化を実施する</li>'
+                + '<li>緊急手術体制の強化を検討する</li>'
+                + '<li>年度末目標：' + formatCount(projected * 1.03) + '件を目指す</li>'
+                + '<li>' + (growthRate > 5 ? '現在の成長ペースを維持する' : 'パフォーマンス向上策を強化する') + '</li>'
+                + '</ul></div>';
+
+            const excellent = growthRate > 5 && utilization >= 85;
+            const good = growthRate >= 0 || utilization >= 80;
+            const kpiSummary = metricCard(excellent ? 'success' : good ? 'warning' : 'danger', '📊 統合パフォーマンス指標',
+                metricRow('年度成長率', formatSigned(growthRate, 1) + '%')
+                + metricRow('手術室稼働率', formatFixed(utilization, 1) + '%')
+                + metricRow('年度末予測', formatCount(projected) + '件')
+                + achievementRow('総合評価', excellent ? '優秀' : good ? '良好' : '要改善'));
+
+            return '<div class="summary"><h2>📈 詳細分析・改善提案</h2></div>'
+                + '<div class="grid-container" style="grid-template-columns: 1fr;">' + kpiSummary + '</div>'
+                + '<div class="analysis-section"><h2>📊 年度目標達成分析</h2>'
+                + '<div class="analysis-grid">' + improvementAnalysis + actionPlan + '</div></div>';
+        },
+
+        // ハイスコア TOP3（ranking.json）
+        top3: function(ranking) {
+            const top3 = (ranking.departments || []).slice(0, 3);
+            if (!top3.length) {
+                return '<p>ハイスコアデータがありません</p>';
+            }
+
+            const cards = top3.map((dept, i) =>
+                '<div class="ranking-card rank-' + (i + 1) + '"><div class="rank-header">'
+                + '<span class="medal">' + ['🥇', '🥈', '🥉'][i] + '</span>'
+                + '<span class="rank-label">診療科' + (i + 1) + '位</span></div>'
+                + '<div class="dept-name">' + escapeHtml(dept.display_name || dept.department) + '</div>'
+                + '<div class="score-info"><div class="achievement">達成率 ' + formatFixed(dept.achievement_rate, 1) + '%</div>'
+                + '<div class="score-value">' + formatFixed(dept.total_score, 0) + '点</div></div></div>'
+            ).join('');
+
+            const top = top3[0];
+            const breakdown = '<div class="summary"><h2>👑 診療科1位：' + escapeHtml(top.display_name || top.department) + '</h2>'
+                + '<div class="summary-stats">'
+                + statItem(formatFixed(top.total_score, 0) + '点', '総合スコア')
+                + statItem(formatFixed(top.achievement_rate, 1) + '%', '達成率')
+                + statItem(Math.trunc(toNumber(top.hospital_rank)) + '位', '病院内順位')
+                + '</div></div>'
+                + '<div class="grid-container">'
+                + metricCard('success', '📊 対目標パフォーマンス',
+                    metricRow('スコア', formatFixed(top.target_score, 0) + '点')
+                    + achievementRow('達成率', formatFixed(top.achievement_rate, 1) + '%'))
+                + metricCard('info', '📈 改善・継続性',
+                    metricRow('スコア', formatFixed(top.improvement_score, 0) + '点')
+                    + achievementRow('安定性', formatFixed(top.stability_score, 0) + '点'))
+                + metricCard('warning', '🎯 相対競争力',
+                    metricRow('スコア', formatFixed(top.competitive_score, 0) + '点')
+                    + achievementRow('改善度', formatSigned(top.improvement_rate, 1) + '%'))
+                + '</div>';
+
+            return '<div class="stats-highlight"><h2>🏆 診療科ランキング TOP3</h2>'
+                + '<p>評価期間: ' + escapeHtml(ranking.period) + '</p></div>'
+                + '<div class="ranking-section">' + cards + '</div>'
+                + breakdown;
+        },
+
+        // 診療科別パフォーマンス（performance.json、リンク先はタブ要素の data-links）
+        departments: function(rows, element) {
+            if (!rows || !rows.length) {
+                return '<p>診療科別パフォーマンスデータがありません</p>';
+            }
+            const view = element.closest('[data-links]');
+            const links = view ? JSON.parse(view.dataset.links || '{}') : {};
+
+            const rates = rows.map(row => row['達成率(%)']).filter(rate => rate !== null && rate !== undefined);
+            const achieving = rates.filter(rate => rate >= 100).length;
+            const average = rates.length ? rates.reduce((sum, rate) => sum + rate, 0) / rates.length : 0;
+
+            const cards = rows.map(row => {
+                const rate = toNumber(row['達成率(%)']);
+                const cssClass = levelClass(rate, [[100, 'success'], [90, 'info'], [80, 'warning']], 'danger');
+                const name = escapeHtml(row['診療科']);
+                const title = links[row['診療科']]
+                    ? '<a href="' + escapeHtml(links[row['診療科']]) + '">' + name + ' ›</a>'
+                    : name;
+                return metricCard(cssClass, title,
+                    metricRow('4週平均', formatFixed(row['4週平均'], 1) + ' 件')
+                    + metricRow('直近週実績', escapeHtml(row['直近週実績']) + ' 件')
+                    + metricRow('週次目標', formatFixed(row['週次目標'], 1) + ' 件')
+                    + achievementRow('達成率', formatFixed(rate, 1) + '%')
+                    + progressBar(rate));
+            }).join('');
+
+            return '<div class="summary"><h2>📊 診療科別パフォーマンス概要</h2><div class="summary-stats">'
+                + statItem(rows.length, '診療科数')
+                + statItem(achieving, '目標達成科数')
+                + statItem(formatFixed(average, 1) + '%', '平均達成率')
+                + '</div></div>'
+                + '<div class="grid-container">' + cards + '</div>';
+        }
+    };
+
+    function countLabel(context) {
+        let label = context.dataset.label || '';
+        if (label) {
+            label += ': ';
+        }
+        if (context.parsed.y !== null) {
+            label += context.parsed.y + '件';
+        }
+        return label;
+    }
+
+    function lineChartOptions(data) {
+        return {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: true,
+                    position: 'top',
+                },
+                tooltip: {
+                    mode: 'index',
+                    intersect: false,
+                    callbacks: { label: countLabel }
+                }
+            },
+            scales: {
+                y: {
+                    display: true,
+                    suggestedMin: data.suggested_min,
+                    suggestedMax: data.suggested_max,
+                    grid: {
+                        color: 'rgba(0, 0, 0, 0.05)'
+                    },
+                    ticks: {
+                        callback: function(value) {
+                            return Math.round(value) + '件';
+                        }
+                    }
+                }
+            },
+            interaction: {
+                mode: 'nearest',
+                axis: 'x',
+                intersect: false
+            }
+        };
+    }
+
+    function targetLine(data, color) {
+        return {
+            label: '目標ライン',
+            data: data.labels.map(() => data.target),
+            borderColor: color,
+            borderWidth: 2,
+            borderDash: [10, 5],
+            pointRadius: 0,
+            fill: false
+        };
+    }
+
+    const chartRenderers = {
+        monthly: function(canvas, data) {
+            new Chart(canvas, {
+                type: 'line',
+                data: {
+                    labels: data.labels,
+                    datasets: [
+                        {
+                            label: '当月実績',
+                            data: data.values,
+                            borderColor: 'rgb(102, 126, 234)',
+                            backgroundColor: 'rgba(102, 126, 234, 0.1)',
+                            borderWidth: 3,
+                            tension: 0.1,
+                            pointRadius: 5,
+                        },
+                        {
+                            label: '前年同月実績',
+                            data: data.last_year_values,
+                            borderColor: 'rgb(156, 163, 175)',
+                            backgroundColor: 'rgba(156, 163, 175, 0.1)',
+                            borderWidth: 2,
+                            borderDash: [5, 5],
+                            tension: 0.1,
+                            pointRadius: 4,
+                            spanGaps: true,
+                        },
+                        targetLine(data, 'rgb(255, 152, 0)')
+                    ]
+                },
+                options: lineChartOptions(data)
+            });
+        },
+        weekly: function(canvas, data) {
+            new Chart(canvas, {
+                type: 'line',
+                data: {
+                    labels: data.labels,
+                    datasets: [
+                        {
+                            label: '当週実績',
+                            data: data.values,
+                            borderColor: 'rgb(34, 197, 94)',
+                            backgroundColor: 'rgba(34, 197, 94, 0.1)',
+                            borderWidth: 3,
+                            tension: 0.1,
+                            pointRadius: 5,
+                            pointBackgroundColor: 'rgb(34, 197, 94)',
+                        },
+                        targetLine(data, 'rgb(239, 68, 68)')
+                    ]
+                },
+                options: lineChartOptions(data)
+            });
+        }
+    };
+
+    return { load: load, activate: activate };
+})();
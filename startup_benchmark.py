@@ -0,0 +1,100 @@
+# startup_benchmark.py - 起動時間（コールドスタート）の計測
+"""
+アプリ起動時に読み込まれるモジュールのインポート時間を、新しいPythonプロセスで繰り返し計測する
+
+    python startup_benchmark.py
+    python startup_benchmark.py --page 将来予測 --repeat 5
+    python startup_benchmark.py --importtime 15
+
+- 毎回別プロセスで実行するため、2回目以降もキャッシュ済みモジュールの影響を受けない
+- 起動時に読み込まれた重いライブラリ（statsmodels・scikit-learn・reportlab 等）を表示する
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# app.py の起動経路で読み込まれるモジュール
+STARTUP_MODULES = ("ui.session_manager", "ui.sidebar", "ui.page_router")
+
+# 起動時には読み込まれてほしくない重いライブラリ
+HEAVY_MODULES = ("statsmodels", "sklearn", "scipy", "reportlab", "plotly.io", "kaleido")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import importlib
+for name in {modules!r}:
+    importlib.import_module(name)
+from ui.page_router import get_router, LazyPage
+router = get_router()
+page = {page!r}
+if page:
+    func = router._pages[page]
+    if isinstance(func, LazyPage):
+        func.load()
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy, "modules": len(sys.modules)}}))
+"""
+
+
+def _root() -> str:
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once(page: Optional[str] = None) -> Dict:
+    """新しいプロセスで起動モジュールを読み込み、所要時間を返す"""
+    code = _PROBE.format(modules=STARTUP_MODULES, page=page, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=_root(), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def top_import_times(limit: int, page: Optional[str] = None) -> List[tuple]:
+    """-X importtime の結果から累積時間の大きいモジュールを返す"""
+    code = _PROBE.format(modules=STARTUP_MODULES, page=page, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=_root(), capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 形式: "import time: <self us> | <cumulative us> | <module>"
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((name.strip(), int(cumulative_us) / 1e6))
+    return sorted(entries, key=lambda entry: entry[1], reverse=True)[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="起動時間（コールドスタート）の計測")
+    parser.add_argument("--page", default=None, help="起動後に読み込むページ（例: ダッシュボード）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="-X importtime で累積時間の大きいモジュールを N 件表示")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.page) for _ in range(max(1, args.repeat))]
+    seconds = [run["seconds"] for run in runs]
+    label = f"起動 + {args.page}" if args.page else "起動"
+    print(f"{label}: 中央値 {statistics.median(seconds):.3f}秒"
+          f"（最小 {min(seconds):.3f} / 最大 {max(seconds):.3f}、{len(seconds)}回）")
+    print(f"読み込みモジュール数: {runs[-1]['modules']}")
+    print(f"読み込まれた重いライブラリ: {', '.join(runs[-1]['heavy']) or 'なし'}")
+
+    if args.importtime:
+        print()
+        print(f"{'累積秒':>8}  モジュール")
+        for name, cumulative in top_import_times(args.importtime, args.page):
+            print(f"{cumulative:>8.3f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ import pandas as pd
 from typing import Optional, Dict, Any, List
 import logging
 
+from ui.components.fragment import render_fragment
+from ui.components.table_provider import TableDataProvider, get_table_provider
+
 logger = logging.getLogger(__name__)
 
 def display_dataframe(
@@ -92,7 +95,7 @@ def display_paginated_table(
     page_size: int = 20,
     search_columns: Optional[List[str]] = None
 ) -> None:
-    """ページネーション付きテーブルを表示"""
+    """ページネーション付きテーブルを表示（検索・ページ切り替えはこのテーブルだけを再実行）"""
     try:
         if title:
             st.subheader(title)
@@ -101,55 +104,66 @@ def display_paginated_table(
             st.info("表示するデータがありません")
             return
         
-        # 検索機能
-        filtered_df = df.copy()
-        if search_columns:
-            search_term = st.text_input(
-                "🔍 検索",
-                placeholder=f"検索対象列: {', '.join(search_columns)}"
-            )
-            
-            if search_term:
-                mask = pd.Series(False, index=df.index)
-                for col in search_columns:
-                    if col in df.columns:
-                        mask |= df[col].astype(str).str.contains(search_term, case=False, na=False)
-                filtered_df = df[mask]
-        
-        # ページネーション
-        total_rows = len(filtered_df)
-        total_pages = (total_rows - 1) // page_size + 1 if total_rows > 0 else 1
-        
-        if total_pages > 1:
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                page = st.selectbox(
-                    "ページ",
-                    range(1, total_pages + 1),
-                    format_func=lambda x: f"ページ {x} / {total_pages}"
-                )
-            
-            start_idx = (page - 1) * page_size
-            end_idx = min(start_idx + page_size, total_rows)
-            display_df = filtered_df.iloc[start_idx:end_idx]
-            
-            st.caption(f"表示中: {start_idx + 1}-{end_idx} / {total_rows}件")
-        else:
-            display_df = filtered_df
-        
-        # テーブル表示
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        render_fragment(_render_paginated_table, df, page_size, search_columns)
     except Exception as e:
         logger.error(f"ページネーションテーブル表示エラー: {e}")
         st.error("テーブル表示中にエラーが発生しました")
 
+def _render_paginated_table(
+    df: pd.DataFrame,
+    page_size: int,
+    search_columns: Optional[List[str]]
+) -> None:
+    """検索・ページネーション部分（フラグメントとして描画）"""
+    provider = get_table_provider(df, search_columns)
+    
+    # 検索機能（検索インデックスはテーブルごとに一度だけ作成）
+    search_term = ""
+    if search_columns:
+        search_term = st.text_input(
+            "🔍 検索",
+            placeholder=f"検索対象列: {', '.join(search_columns)}"
+        )
+    positions = provider.positions(search_term)
+    
+    # 表示するページの行だけを取り出して描画
+    display_df = _render_page_slice(provider, positions, page_size)
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+def _render_page_slice(provider: TableDataProvider, positions, page_size: int) -> pd.DataFrame:
+    """ページ選択UIを描画し、選択ページの行を返す"""
+    total_rows = len(positions)
+    total_pages = (total_rows - 1) // page_size + 1 if total_rows > 0 else 1
+    
+    if total_pages <= 1:
+        return provider.rows(positions)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        page = st.selectbox(
+            "ページ",
+            range(1, total_pages + 1),
+            format_func=lambda x: f"ページ {x} / {total_pages}"
+        )
+    
+    start_idx = (page - 1) * page_size
+    end_idx = min(start_idx + page_size, total_rows)
+    st.caption(f"表示中: {start_idx + 1}-{end_idx} / {total_rows}件")
+    return provider.rows(positions, start_idx, end_idx)
+
 def display_interactive_table(
     df: pd.DataFrame,
     title: Optional[str] = None,
     sortable_columns: Optional[List[str]] = None,
-    filterable_columns: Optional[Dict[str, List[str]]] = None
+    filterable_columns: Optional[Dict[str, List[str]]] = None,
+    page_size: int = 100
 ) -> pd.DataFrame:
-    """インタラクティブテーブルを表示"""
+    """
+    インタラクティブテーブルを表示（フィルタ・ソート操作はこのテーブルだけを再実行）
+    
+    Returns:
+        ページ全体の実行時点のフィルタ・ソート結果
+    """
     try:
         if title:
             st.subheader(title)
@@ -158,56 +172,70 @@ def display_interactive_table(
             st.info("表示するデータがありません")
             return df
         
-        filtered_df = df.copy()
-        
-        # フィルタリング機能
-        if filterable_columns:
-            with st.expander("🔧 フィルタ設定"):
-                for col, options in filterable_columns.items():
-                    if col in df.columns:
-                        selected_values = st.multiselect(
-                            f"{col} でフィルタ",
-                            options=options,
-                            default=options
-                        )
-                        if selected_values:
-                            filtered_df = filtered_df[filtered_df[col].isin(selected_values)]
-        
-        # ソート機能
-        if sortable_columns:
-            col1, col2 = st.columns(2)
-            with col1:
-                sort_column = st.selectbox(
-                    "ソート列",
-                    options=["なし"] + [col for col in sortable_columns if col in df.columns]
-                )
-            
-            with col2:
-                if sort_column != "なし":
-                    sort_ascending = st.radio(
-                        "ソート順",
-                        ["昇順", "降順"],
-                        horizontal=True
-                    ) == "昇順"
-                    
-                    filtered_df = filtered_df.sort_values(
-                        by=sort_column,
-                        ascending=sort_ascending
-                    )
-        
-        # テーブル表示
-        st.dataframe(filtered_df, use_container_width=True, hide_index=True)
-        
-        # 統計情報表示
-        if len(filtered_df) != len(df):
-            st.caption(f"フィルタ結果: {len(filtered_df):,}件 / 全体: {len(df):,}件")
-        
-        return filtered_df
+        filtered_df = render_fragment(_render_interactive_table, df, sortable_columns, filterable_columns, page_size)
+        return df if filtered_df is None else filtered_df
     except Exception as e:
         logger.error(f"インタラクティブテーブル表示エラー: {e}")
         st.error("テーブル表示中にエラーが発生しました")
         return df
 
+def _render_interactive_table(
+    df: pd.DataFrame,
+    sortable_columns: Optional[List[str]],
+    filterable_columns: Optional[Dict[str, List[str]]],
+    page_size: int
+) -> pd.DataFrame:
+    """フィルタ・ソート部分（フラグメントとして描画）"""
+    provider = get_table_provider(df)
+    mask = None
+    
+    # フィルタリング機能
+    if filterable_columns:
+        with st.expander("🔧 フィルタ設定"):
+            for col, options in filterable_columns.items():
+                if col in df.columns:
+                    selected_values = st.multiselect(
+                        f"{col} でフィルタ",
+                        options=options,
+                        default=options
+                    )
+                    if selected_values:
+                        col_mask = provider.value_mask(col, selected_values)
+                        mask = col_mask if mask is None else mask & col_mask
+    
+    # ソート機能（列・順序ごとの並びはキャッシュ済み）
+    sort_column = None
+    sort_ascending = True
+    if sortable_columns:
+        col1, col2 = st.columns(2)
+        with col1:
+            sort_column = st.selectbox(
+                "ソート列",
+                options=["なし"] + [col for col in sortable_columns if col in df.columns]
+            )
+        
+        with col2:
+            if sort_column != "なし":
+                sort_ascending = st.radio(
+                    "ソート順",
+                    ["昇順", "降順"],
+                    horizontal=True
+                ) == "昇順"
+            else:
+                sort_column = None
+    
+    positions = provider.positions(sort_column=sort_column, ascending=sort_ascending, mask=mask)
+    
+    # テーブル表示（表示ページの行だけ）
+    display_df = _render_page_slice(provider, positions, page_size)
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    
+    # 統計情報表示
+    if len(positions) != len(df):
+        st.caption(f"フィルタ結果: {len(positions):,}件 / 全体: {len(df):,}件")
+    
+    return provider.rows(positions)
+
 def create_download_csv_button(
     df: pd.DataFrame,
     filename: str = "data.csv",
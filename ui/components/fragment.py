@@ -0,0 +1,25 @@
+# ui/components/fragment.py
+"""
+フラグメント描画の共通ヘルパー
+- st.fragment で囲んだ範囲は、その中のウィジェット操作時にその範囲だけが再実行される
+  （サイドバーのランキングや他のグラフは再計算されない）
+- 再実行時の引数は直前のページ全体の実行時に渡したもの（計算済みのDataFrame等）がそのまま使われる
+- フラグメント内からは st.sidebar に書き込まないこと
+"""
+
+import streamlit as st
+from typing import Any, Callable
+
+FRAGMENT_AVAILABLE = hasattr(st, 'fragment')
+
+
+def render_fragment(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    func をフラグメントとして描画（st.fragment 未対応のバージョンでは通常どおり描画）
+
+    Returns:
+        ページ全体の実行時の func の戻り値（フラグメント単位の再実行時は呼び出し元に戻らない）
+    """
+    if FRAGMENT_AVAILABLE:
+        return st.fragment(func)(*args, **kwargs)
+    return func(*args, **kwargs)
@@ -12,6 +12,8 @@ from datetime import datetime
 
 from ui.session_manager import SessionManager
 from analysis import weekly
+from data_processing.dataset_version import derive_version
+from utils import date_helpers
 
 logger = logging.getLogger(__name__)
 
@@ -157,6 +159,8 @@ class PeriodSelector:
                 (df['手術実施日_dt'] >= start_date) & 
                 (df['手術実施日_dt'] <= end_date)
             ]
+            # 分析キャッシュは元データのバージョン + 期間で識別する
+            derive_version(filtered_df, df, 'period', start_date, end_date)
             
             logger.info(f"期間フィルタリング: {len(df)} -> {len(filtered_df)} 件")
             return filtered_df
@@ -180,8 +184,7 @@ class PeriodSelector:
             }
         
         total_days = (end_date - start_date).days + 1
-        weekdays = sum(1 for i in range(total_days) 
-                      if (start_date + pd.Timedelta(days=i)).weekday() < 5)
+        weekdays = date_helpers.count_weekdays(start_date, end_date)
         
         return {
             'period_name': period_name,
@@ -224,10 +227,7 @@ class PeriodSelector:
     def calculate_weekdays_in_period(start_date: pd.Timestamp, end_date: pd.Timestamp) -> int:
         """期間内の平日数を計算"""
         try:
-            total_days = (end_date - start_date).days + 1
-            weekdays = sum(1 for i in range(total_days) 
-                          if (start_date + pd.Timedelta(days=i)).weekday() < 5)
-            return weekdays
+            return date_helpers.count_weekdays(start_date, end_date)
         except Exception as e:
             logger.error(f"平日数計算エラー: {e}")
             return 0
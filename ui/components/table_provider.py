@@ -0,0 +1,153 @@
+# ui/components/table_provider.py
+"""
+大きなテーブル用のデータプロバイダー
+- 検索対象列ごとに「ユニーク値の小文字化文字列 + 行→ユニーク値のコード」の検索インデックスを一度だけ作成し、
+  キー入力のたびに全行を文字列変換しない（一致判定はユニーク値に対してだけ行う）
+- 列・昇順/降順ごとのソート順（行位置の並び）をキャッシュし、操作のたびにDataFrameを並べ替えない
+- 表示するのは現在のページの行だけ（st.dataframe に全行を渡さない）
+- プロバイダーは「データセットバージョン × 検索対象列」ごとに共有し、同じDataFrameオブジェクトでは
+  トークン計算も省略する
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_processing.dataset_version import DATAFRAME_HASH_FUNCS
+
+logger = logging.getLogger(__name__)
+
+# 直近の検索結果を保持する件数（入力中の語の前方一致で同じ語が繰り返されるため）
+SEARCH_CACHE_SIZE = 8
+
+
+class TableDataProvider:
+    """検索インデックス・ソート順をキャッシュし、表示ページ分の行だけを返す"""
+
+    def __init__(self, df: pd.DataFrame, search_columns: Optional[Iterable[str]] = None):
+        self.df = df
+        self.search_columns = [col for col in (search_columns or []) if col in df.columns]
+        self._lock = threading.Lock()
+        self._search_index = [self._build_search_index(df[col]) for col in self.search_columns]
+        self._search_cache: Dict[str, np.ndarray] = {}
+        self._sort_orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._value_codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @staticmethod
+    def _build_search_index(series: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+        codes, uniques = pd.factorize(series.astype(str))
+        return codes, pd.Series(uniques, dtype=object).str.lower()
+
+    def search_mask(self, term: str) -> Optional[np.ndarray]:
+        """検索語を含む行のマスク（大文字小文字を区別しない部分一致。検索語が空ならNone）"""
+        term = (term or "").strip().lower()
+        if not term or not self._search_index:
+            return None
+        with self._lock:
+            cached = self._search_cache.get(term)
+        if cached is not None:
+            return cached
+
+        mask = np.zeros(len(self.df), dtype=bool)
+        for codes, lowered in self._search_index:
+            hits = np.append(lowered.str.contains(term, regex=False).to_numpy(dtype=bool), False)
+            mask |= hits[codes]  # コード -1（欠損）は末尾の False を参照する
+
+        with self._lock:
+            if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                self._search_cache.pop(next(iter(self._search_cache)))
+            self._search_cache[term] = mask
+        return mask
+
+    def sort_order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """列でソートしたときの行位置（安定ソート、欠損は末尾）"""
+        key = (column, ascending)
+        with self._lock:
+            order = self._sort_orders.get(key)
+        if order is None:
+            values = self.df[column].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            with self._lock:
+                self._sort_orders[key] = order
+        return order
+
+    def value_mask(self, column: str, values: Iterable[Any]) -> np.ndarray:
+        """列の値が values のいずれかに一致する行のマスク（列の因子化は一度だけ）"""
+        with self._lock:
+            factorized = self._value_codes.get(column)
+        if factorized is None:
+            codes, uniques = pd.factorize(self.df[column])
+            factorized = (codes, pd.Index(uniques))
+            with self._lock:
+                self._value_codes[column] = factorized
+        codes, uniques = factorized
+        hits = np.append(uniques.isin(list(values)), False)
+        return hits[codes]
+
+    def positions(self, search_term: str = "", sort_column: Optional[str] = None,
+                  ascending: bool = True, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        検索・絞り込み・ソートを適用した行位置
+
+        Args:
+            mask: 追加の絞り込み条件（行数と同じ長さのboolマスク）
+        """
+        search = self.search_mask(search_term)
+        if search is not None:
+            mask = search if mask is None else mask & search
+
+        if sort_column and sort_column in self.df.columns:
+            order = self.sort_order(sort_column, ascending)
+            return order if mask is None else order[mask[order]]
+        if mask is None:
+            return np.arange(len(self.df))
+        return np.flatnonzero(mask)
+
+    def rows(self, positions: np.ndarray, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """行位置の [start, stop) に当たる行だけを取り出す"""
+        return self.df.iloc[positions[start:stop]]
+
+
+_providers: Dict[int, Any] = {}
+_providers_lock = threading.Lock()
+
+
+@st.cache_resource(max_entries=16, hash_funcs=DATAFRAME_HASH_FUNCS, show_spinner=False)
+def _shared_provider(df: pd.DataFrame, search_columns: Tuple[str, ...]) -> TableDataProvider:
+    logger.info(f"テーブルプロバイダー作成: {len(df):,}行 / 検索列 {list(search_columns)}")
+    return TableDataProvider(df, search_columns)
+
+
+def get_table_provider(df: pd.DataFrame, search_columns: Optional[List[str]] = None) -> TableDataProvider:
+    """
+    テーブルのデータプロバイダーを取得
+
+    同じDataFrameオブジェクト（フラグメントの再実行など）はそのまま再利用し、
+    新しいオブジェクトはデータセットバージョン（未登録なら内容フィンガープリント）で共有キャッシュを引く
+    """
+    columns = tuple(search_columns or ())
+    key = id(df)
+    with _providers_lock:
+        entry = _providers.get(key)
+    if entry is not None and entry[0]() is df and entry[1] == columns:
+        return entry[2]
+
+    provider = _shared_provider(df, columns)
+    with _providers_lock:
+        _providers[key] = (weakref.ref(df, lambda _ref, key=key: _discard(key, _ref)), columns, provider)
+    return provider
+
+
+def _discard(key: int, ref) -> None:
+    with _providers_lock:
+        entry = _providers.get(key)
+        if entry is not None and entry[0] is ref:
+            del _providers[key]
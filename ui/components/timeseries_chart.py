@@ -0,0 +1,68 @@
+# ui/components/timeseries_chart.py
+"""
+日別推移などの長い時系列グラフ
+- 点数が予算（style_config.DOWNSAMPLE_POINT_BUDGET）以下ならそのまま描画
+- 超える場合は間引いた系列を描画し、「表示範囲」スライダーで範囲を狭めると
+  キャッシュ済みのピラミッドから細かい粒度の系列を切り出して再描画する（この部分だけをフラグメントで再実行）
+"""
+
+import logging
+from typing import Dict, Optional
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from config import style_config as sc
+from plotting.downsample import downsample_frame
+from ui.components.fragment import render_fragment
+
+logger = logging.getLogger(__name__)
+
+
+def render_time_series_chart(data: pd.DataFrame, x_col: str, y_col: str, title: str,
+                             labels: Optional[Dict[str, str]] = None, key: str = "timeseries",
+                             color_col: Optional[str] = None, budget: Optional[int] = None) -> None:
+    """
+    時系列の折れ線グラフを表示（長い系列は間引いて描画）
+
+    Args:
+        key: 表示範囲スライダーのキー（ページ内で一意にする）
+        color_col: 系列を分ける列（術者別など）
+        budget: 1系列あたりの最大点数の目安
+    """
+    budget = budget or sc.DOWNSAMPLE_POINT_BUDGET
+    longest = data.groupby(color_col).size().max() if color_col else len(data)
+
+    if longest <= budget:
+        fig = px.line(data, x=x_col, y=y_col, color=color_col, title=title, labels=labels)
+        st.plotly_chart(fig, use_container_width=True)
+        return
+
+    render_fragment(_render_downsampled_chart, data, x_col, y_col, title, labels, key, color_col, budget)
+
+
+def _render_downsampled_chart(data: pd.DataFrame, x_col: str, y_col: str, title: str,
+                              labels: Optional[Dict[str, str]], key: str,
+                              color_col: Optional[str], budget: int) -> None:
+    """間引いた系列と表示範囲スライダー（フラグメントとして描画）"""
+    first = pd.Timestamp(data[x_col].min()).to_pydatetime()
+    last = pd.Timestamp(data[x_col].max()).to_pydatetime()
+
+    chart = st.container()
+    start, end = st.slider(
+        "表示範囲",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY/MM/DD",
+        key=f"{key}_range",
+        help="範囲を狭めると、より細かい粒度で表示します"
+    )
+
+    reduced = downsample_frame(data, x_col, y_col, budget, pd.Timestamp(start), pd.Timestamp(end), color_col)
+    fig = px.line(reduced, x=x_col, y=y_col, color=color_col, title=title, labels=labels)
+    fig.update_xaxes(range=[start, end])
+    with chart:
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"表示点数: {len(reduced):,} / 全{len(data):,}点（山・谷を保って間引き表示）")
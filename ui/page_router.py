@@ -5,51 +5,70 @@
 """
 
 import streamlit as st
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, Optional, Tuple
+import importlib
 import logging
+import threading
 
 from ui.session_manager import SessionManager
 from ui.error_handler import safe_streamlit_operation, ErrorHandler
 
 logger = logging.getLogger(__name__)
 
+# ページ名 → (モジュール, クラス)。モジュールは最初にそのページを開いたときに読み込む
+PAGE_MODULES: Dict[str, Tuple[str, str]] = {
+    "ダッシュボード": ("ui.pages.dashboard_page", "DashboardPage"),
+    "データ管理": ("ui.pages.data_management_page", "DataManagementPage"),
+    "病院全体分析": ("ui.pages.hospital_page", "HospitalPage"),
+    "診療科別分析": ("ui.pages.department_page", "DepartmentPage"),
+    "術者分析": ("ui.pages.surgeon_page", "SurgeonPage"),
+    "将来予測": ("ui.pages.prediction_page", "PredictionPage"),
+}
+
+
+class LazyPage:
+    """ページクラスの render を初回呼び出し時に読み込むラッパー"""
+    
+    def __init__(self, page_name: str, module_name: str, class_name: str):
+        self.page_name = page_name
+        self.module_name = module_name
+        self.class_name = class_name
+        self._render: Optional[Callable] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._render is not None
+    
+    def load(self) -> Callable:
+        """ページモジュールを読み込んで render を返す（ImportErrorはそのまま送出）"""
+        if self._render is None:
+            with self._lock:
+                if self._render is None:
+                    module = importlib.import_module(self.module_name)
+                    self._render = getattr(module, self.class_name).render
+                    logger.info(f"ページモジュール読み込み: {self.page_name} ({self.module_name})")
+        return self._render
+    
+    def __call__(self) -> None:
+        self.load()()
+
 
 class PageRouter:
-    """ページルーティングを管理するクラス"""
+    """ページルーティングを管理するクラス（プロセスで1つを共有し、ページは初回表示時に読み込む）"""
     
     def __init__(self):
         self._pages: Dict[str, Callable] = {}
         self._setup_routes()
     
     def _setup_routes(self) -> None:
-        """ルートを設定"""
-        try:
-            # 遅延インポートでページモジュールを読み込み
-            from ui.pages.dashboard_page import DashboardPage
-            from ui.pages.data_management_page import DataManagementPage
-            from ui.pages.hospital_page import HospitalPage
-            from ui.pages.department_page import DepartmentPage
-            from ui.pages.surgeon_page import SurgeonPage
-            from ui.pages.prediction_page import PredictionPage
-            
-            # 全ページを設定
-            self._pages = {
-                "ダッシュボード": DashboardPage.render,
-                "データアップロード": self._render_upload_page_legacy,  # legacy版を継続使用
-                "データ管理": DataManagementPage.render,
-                "病院全体分析": HospitalPage.render,
-                "診療科別分析": DepartmentPage.render,
-                "術者分析": SurgeonPage.render,
-                "将来予測": PredictionPage.render,
-            }
-            
-            logger.info(f"ページルート設定完了: {list(self._pages.keys())}")
-            
-        except ImportError as e:
-            logger.error(f"ページモジュールのインポートエラー: {e}")
-            st.error(f"ページモジュールの読み込みに失敗しました: {e}")
-            # フォールバック: 基本ページのみ設定
-            self._setup_fallback_routes()
+        """ルートを設定（ページモジュールはここでは読み込まない）"""
+        self._pages = {
+            name: LazyPage(name, module_name, class_name)
+            for name, (module_name, class_name) in PAGE_MODULES.items()
+        }
+        self._pages["データアップロード"] = self._render_upload_page_legacy  # legacy版を継続使用
+        logger.info(f"ページルート設定完了: {list(self._pages.keys())}")
     
     def _setup_fallback_routes(self) -> None:
         """フォールバック用の基本ルート設定"""
@@ -82,6 +101,15 @@ class PageRouter:
         # ページを描画
         try:
             page_func = self._pages[current_view]
+            if isinstance(page_func, LazyPage):
+                try:
+                    page_func = page_func.load()
+                except ImportError as e:
+                    # 読み込めないページだけをフォールバック表示にする（他のページには影響しない）
+                    logger.error(f"ページモジュールのインポートエラー ({current_view}): {e}")
+                    st.error(f"ページモジュールの読み込みに失敗しました: {e}")
+                    self._render_fallback_page()
+                    return
             page_func()
             
         except Exception as e:
@@ -173,7 +201,7 @@ class PageRouter:
         from datetime import datetime
         from data_processing import loader
         from config import target_loader
-        from data_persistence import save_data_to_file, create_backup, get_data_info
+        from data_persistence import save_data_in_background, create_backup, get_data_info
         
         st.header("📤 データアップロード")
         
@@ -230,22 +258,17 @@ class PageRouter:
                             SessionManager.set_target_dict(target_dict)
                             st.success(f"✅ 目標データを読み込みました。{len(target_dict)}件の診療科目標を設定。")
                         
-                        # 自動保存
+                        # 自動保存（バックグラウンドで実行し、画面は待たせない）
                         if auto_save:
-                            save_success = save_data_to_file(df, target_dict, {
+                            save_data_in_background(df, target_dict, {
                                 'upload_time': datetime.now().isoformat(),
                                 'base_file_name': base_file.name,
                                 'update_files_count': len(update_files) if update_files else 0,
                                 'target_file_name': target_file.name if target_file else None
                             })
                             
-                            if save_success:
-                                if existing_data_info:
-                                    st.success("💾 データを更新保存しました。次回起動時に自動で読み込まれます。")
-                                else:
-                                    st.success("💾 データを新規保存しました。次回起動時に自動で読み込まれます。")
-                            else:
-                                st.error("❌ データ保存に失敗しました。")
+                            action = "更新保存" if existing_data_info else "新規保存"
+                            st.info(f"💾 データの{action}をバックグラウンドで開始しました。保存状況はデータ管理ページで確認できます。")
                     else:
                         st.warning("基礎データファイルをアップロードしてください。")
                         
@@ -269,16 +292,18 @@ class PageRouter:
             logger.info(f"ページを削除: {name}")
 
 
-# グローバルルーター
+# グローバルルーター（Streamlitの再実行ごとに作り直さず、プロセスで共有する）
 _router_instance: Optional[PageRouter] = None
+_router_lock = threading.Lock()
 
 
 def get_router() -> PageRouter:
     """ルーターのシングルトンインスタンスを取得"""
     global _router_instance
-    if _router_instance is None:
-        _router_instance = PageRouter()
-    return _router_instance
+    with _router_lock:
+        if _router_instance is None:
+            _router_instance = PageRouter()
+        return _router_instance
 
 
 def render_current_page() -> None:
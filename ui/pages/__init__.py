@@ -5,13 +5,17 @@ UI ページパッケージ
 各分析ページのクラスへの便利なアクセスを提供します。
 """
 
-# 各ページクラスをインポート
-from .dashboard_page import DashboardPage
-from .data_management_page import DataManagementPage
-from .hospital_page import HospitalPage
-from .department_page import DepartmentPage
-from .surgeon_page import SurgeonPage
-from .prediction_page import PredictionPage
+import importlib
+
+# 各ページクラスは参照されたときに読み込む（起動時に全ページの依存ライブラリを読み込まない）
+_PAGE_MODULES = {
+    'DashboardPage': '.dashboard_page',
+    'DataManagementPage': '.data_management_page',
+    'HospitalPage': '.hospital_page',
+    'DepartmentPage': '.department_page',
+    'SurgeonPage': '.surgeon_page',
+    'PredictionPage': '.prediction_page',
+}
 
 # 利用可能なページ一覧
 AVAILABLE_PAGES = [
@@ -24,16 +28,27 @@ AVAILABLE_PAGES = [
     '将来予測'
 ]
 
-# ページクラスマッピング
-PAGE_CLASSES = {
-    'ダッシュボード': DashboardPage,
-    'データ管理': DataManagementPage,
-    '病院全体分析': HospitalPage,
-    '診療科別分析': DepartmentPage,
-    '術者分析': SurgeonPage,
-    '将来予測': PredictionPage,
+# ページクラスマッピング（ページ名 → クラス名。PAGE_CLASSES は参照時にクラスを読み込む）
+_PAGE_CLASS_NAMES = {
+    'ダッシュボード': 'DashboardPage',
+    'データ管理': 'DataManagementPage',
+    '病院全体分析': 'HospitalPage',
+    '診療科別分析': 'DepartmentPage',
+    '術者分析': 'SurgeonPage',
+    '将来予測': 'PredictionPage',
 }
 
+
+def __getattr__(name):
+    if name in _PAGE_MODULES:
+        page_class = getattr(importlib.import_module(_PAGE_MODULES[name], __name__), name)
+        globals()[name] = page_class
+        return page_class
+    if name == 'PAGE_CLASSES':
+        return {page: __getattr__(class_name) for page, class_name in _PAGE_CLASS_NAMES.items()}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     # ページクラス
     'DashboardPage',
@@ -157,18 +157,16 @@ class DashboardPage:
             # 週報ランキング計算
             with st.spinner("週報ランキングを計算中..."):
                 try:
-                    from analysis.weekly_surgery_ranking import (
-                        calculate_weekly_surgery_ranking, 
-                        generate_weekly_ranking_summary
-                    )
+                    from analysis.ranking_snapshot import get_ranking_snapshot
                     
-                    dept_scores = calculate_weekly_surgery_ranking(df, target_dict, period)
+                    snapshot = get_ranking_snapshot(df, target_dict, 'weekly_ranking', period)
+                    dept_scores = snapshot['dept_scores']
                     
                     if not dept_scores:
                         st.warning("週報ランキングデータがありません。データと目標設定を確認してください。")
                         return
                     
-                    summary = generate_weekly_ranking_summary(dept_scores)
+                    summary = snapshot['summary']
                     
                 except ImportError:
                     st.error("❌ 週報ランキング機能が利用できません。")
@@ -332,18 +330,16 @@ class DashboardPage:
             # ハイスコア計算
             with st.spinner("ハイスコアを計算中..."):
                 try:
-                    from analysis.surgery_high_score import (
-                        calculate_surgery_high_scores, 
-                        generate_surgery_high_score_summary
-                    )
+                    from analysis.ranking_snapshot import get_ranking_snapshot
                     
-                    dept_scores = calculate_surgery_high_scores(df, target_dict, period)
+                    snapshot = get_ranking_snapshot(df, target_dict, 'high_score', period)
+                    dept_scores = snapshot['dept_scores']
                     
                     if not dept_scores:
                         st.warning("ハイスコアデータがありません。")
                         return
                     
-                    summary = generate_surgery_high_score_summary(dept_scores)
+                    summary = snapshot['summary']
                     
                 except ImportError:
                     st.error("❌ ハイスコア機能が利用できません。")
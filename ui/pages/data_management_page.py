@@ -9,13 +9,16 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, Optional
 import logging
+import os
+import shutil
 
 from ui.session_manager import SessionManager
 from ui.error_handler import safe_streamlit_operation, safe_file_operation
 from data_persistence import (
     get_data_info, get_file_sizes, get_backup_info, restore_from_backup,
     export_data_package, import_data_package, create_backup,
-    load_data_from_file, save_data_to_file, delete_saved_data
+    load_data_from_file, delete_saved_data,
+    read_backup_bytes, save_data_in_background, get_save_status
 )
 
 # メトリクス出力機能をインポート
@@ -161,23 +164,21 @@ class DataManagementPage:
                     date_range = (df['手術実施日_dt'].max() - df['手術実施日_dt'].min()).days + 1
                     st.metric("データ期間", f"{date_range}日間")
             
-            # セッションデータ保存
+            # セッションデータ保存（バックグラウンドで実行）
             if st.button("💾 セッションデータを保存"):
-                with st.spinner("データ保存中..."):
-                    try:
-                        metadata = {
-                            "save_source": "session",
-                            "user_action": "manual_save",
-                            "data_version": "2.0"
-                        }
-                        
-                        save_success = save_data_to_file(df, target_dict, metadata)
-                        if save_success:
-                            st.success("✅ セッションデータを保存しました")
-                        else:
-                            st.error("❌ データ保存に失敗しました")
-                    except Exception as e:
-                        st.error(f"❌ 保存エラー: {e}")
+                try:
+                    metadata = {
+                        "save_source": "session",
+                        "user_action": "manual_save",
+                        "data_version": "2.0"
+                    }
+                    
+                    save_data_in_background(df, target_dict, metadata)
+                    st.info("💾 バックグラウンドで保存を開始しました")
+                except Exception as e:
+                    st.error(f"❌ 保存エラー: {e}")
+            
+            DataManagementPage._render_save_status()
         else:
             st.warning("⚠️ セッションにデータなし")
             st.caption("データアップロードページでデータを読み込んでください")
@@ -188,6 +189,21 @@ class DataManagementPage:
                 for file_type, size in file_sizes.items():
                     st.write(f"• {file_type}: {size}")
     
+    @staticmethod
+    def _render_save_status() -> None:
+        """バックグラウンド保存の状況を表示"""
+        status = get_save_status()
+        state = status.get('state')
+        
+        if state == 'running':
+            st.info(f"⏳ 保存中... ({status.get('rows', 0):,}件)")
+            if st.button("🔄 保存状況を更新", key="refresh_save_status"):
+                st.rerun()
+        elif state == 'done':
+            st.caption(f"✅ 最終保存: {status.get('finished_at', '')[:19].replace('T', ' ')}（{status.get('rows', 0):,}件）")
+        elif state == 'failed':
+            st.error(f"❌ データ保存に失敗しました: {status.get('error')}")
+    
     @staticmethod
     def _render_backup_management_tab() -> None:
         """バックアップ管理タブを描画"""
@@ -261,14 +277,16 @@ class DataManagementPage:
     def _download_backup(backup: dict) -> None:
         """バックアップファイルをダウンロード"""
         try:
-            with open(backup['path'], 'rb') as f:
-                st.download_button(
-                    label="💾 ダウンロード開始",
-                    data=f.read(),
-                    file_name=backup['filename'],
-                    mime="application/octet-stream",
-                    key=f"download_btn_{backup['filename']}"
-                )
+            file_name = backup['filename']
+            if backup.get('kind') == 'snapshot':
+                file_name = f"{file_name}.pkl"
+            st.download_button(
+                label="💾 ダウンロード開始",
+                data=read_backup_bytes(backup),
+                file_name=file_name,
+                mime="application/octet-stream",
+                key=f"download_btn_{backup['filename']}"
+            )
         except Exception as e:
             st.error(f"❌ ダウンロードエラー: {e}")
     
@@ -317,7 +335,7 @@ class DataManagementPage:
         """エクスポートセクションを描画"""
         st.subheader("📤 データエクスポート")
         
-        st.info("全てのデータをZIPファイルとしてエクスポートします。")
+        st.info("全てのデータをデータパッケージ（tar形式・チェックサム付き）としてエクスポートします。")
         
         if st.button("📦 データパッケージをエクスポート"):
             with st.spinner("エクスポート中..."):
@@ -331,9 +349,9 @@ class DataManagementPage:
                         with open(result, 'rb') as f:
                             st.download_button(
                                 label="💾 エクスポートファイルをダウンロード",
-                                data=f.read(),
-                                file_name=result.split('/')[-1],
-                                mime="application/zip"
+                                data=f,
+                                file_name=os.path.basename(result),
+                                mime="application/x-tar"
                             )
                     else:
                         st.error(f"❌ エクスポート失敗: {result}")
@@ -347,12 +365,12 @@ class DataManagementPage:
         """インポートセクションを描画"""
         st.subheader("📥 データインポート")
         
-        st.info("エクスポートしたZIPファイルからデータを復元します。")
+        st.info("エクスポートしたデータパッケージからデータを復元します（チェックサムを検証してから取り込みます）。")
         
         uploaded_file = st.file_uploader(
             "インポートファイル選択",
-            type=['zip'],
-            help="エクスポートしたZIPファイルを選択してください"
+            type=['tar', 'zip'],
+            help="エクスポートしたデータパッケージ（.tar、従来の.zipも可）を選択してください"
         )
         
         if uploaded_file is not None:
@@ -361,11 +379,15 @@ class DataManagementPage:
                     try:
                         # 一時ファイルに保存
                         import tempfile
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-                            tmp_file.write(uploaded_file.read())
+                        suffix = os.path.splitext(uploaded_file.name)[1] or '.tar'
+                        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+                            shutil.copyfileobj(uploaded_file, tmp_file)
                             tmp_path = tmp_file.name
                         
-                        success, message = import_data_package(tmp_path)
+                        try:
+                            success, message = import_data_package(tmp_path)
+                        finally:
+                            os.remove(tmp_path)
                         
                         if success:
                             st.success(f"✅ {message}")
@@ -7,15 +7,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
 
 from ui.session_manager import SessionManager
 from ui.error_handler import safe_streamlit_operation, safe_data_operation
 from ui.components.period_selector import PeriodSelector
+from ui.components.fragment import render_fragment
+from ui.components.timeseries_chart import render_time_series_chart
 
 # 既存の分析モジュールをインポート
-from analysis import weekly, ranking, surgeon
+from analysis import ranking, surgeon, trend_stats
+from analysis.department_kpis import get_department_kpis, get_department_frame
+from data_processing.dataset_version import derive_version
 from plotting import trend_plots, generic_plots
 
 logger = logging.getLogger(__name__)
@@ -39,13 +43,21 @@ class DepartmentPage:
             st.warning("⚠️ データが読み込まれていません")
             return
         
-        # 診療科選択
-        selected_dept = DepartmentPage._render_department_selector(df)
+        # 診療科選択（診療科一覧は全診療科KPIのキャッシュから取得）
+        all_kpis = get_department_kpis(df, target_dict)
+        selected_dept = DepartmentPage._render_department_selector(list(all_kpis['by_dept']))
         if not selected_dept:
             return
         
         st.markdown("---")
         
+        # 期間選択以降はフラグメントにし、期間変更時はこの範囲だけを再実行する
+        render_fragment(DepartmentPage._render_period_analysis, df, target_dict, selected_dept, latest_date)
+    
+    @staticmethod
+    def _render_period_analysis(df: pd.DataFrame, target_dict: Dict[str, Any], selected_dept: str,
+                                latest_date: Optional[pd.Timestamp]) -> None:
+        """期間選択と選択期間の診療科分析（フラグメントとして描画）"""
         # 期間選択セクション
         period_name, start_date, end_date = PeriodSelector.render(
             page_name=f"department_{selected_dept}",
@@ -56,24 +68,34 @@ class DepartmentPage:
         # 期間に基づいてデータをフィルタリング
         filtered_df = PeriodSelector.filter_data_by_period(df, start_date, end_date)
         
-        # 選択された診療科のデータを抽出
-        dept_df = filtered_df[filtered_df['実施診療科'] == selected_dept]
+        # 選択期間の全診療科KPIを一度に計算し、選択中の診療科は辞書から参照する
+        kpis = get_department_kpis(
+            filtered_df, target_dict, start_date, end_date, SessionManager.get_analysis_base_date()
+        )
+        dept_kpi = kpis['by_dept'].get(selected_dept)
         
-        if dept_df.empty:
+        if dept_kpi is None:
             st.warning(f"⚠️ {selected_dept}の選択期間（{period_name}）にデータがありません")
             return
         
+        # 選択された診療科のデータを抽出（KPI集計時の行位置を使う）
+        dept_df = get_department_frame(filtered_df, kpis, selected_dept)
+        derive_version(dept_df, filtered_df, 'department', selected_dept)
+        
         # 期間サマリー表示（診療科特化）
         if start_date and end_date:
             st.markdown("---")
             DepartmentPage._render_department_period_summary(
-                selected_dept, period_name, start_date, end_date, dept_df
+                selected_dept, period_name, start_date, end_date, dept_kpi
             )
         
         st.markdown("---")
         
         # KPI表示
-        DepartmentPage._render_department_kpi(dept_df, start_date, end_date, selected_dept)
+        DepartmentPage._render_department_kpi(dept_kpi, target_dict, start_date, end_date, selected_dept)
+        
+        # 全診療科比較
+        DepartmentPage._render_department_comparison(kpis['table'], selected_dept, period_name)
         
         # 週次推移
         DepartmentPage._render_department_trend(
@@ -82,12 +104,27 @@ class DepartmentPage:
         
         # 詳細分析タブ
         DepartmentPage._render_detailed_analysis_tabs(dept_df, selected_dept, period_name)
+        
+        # 全診療科PDF一括出力
+        DepartmentPage._render_batch_pdf_export(df, target_dict, latest_date)
     
     @staticmethod
-    def _render_department_selector(df: pd.DataFrame) -> Optional[str]:
+    def _render_batch_pdf_export(df: pd.DataFrame, target_dict: Dict[str, Any],
+                                 latest_date: Optional[pd.Timestamp]) -> None:
+        """全診療科のPDFレポート一括出力"""
+        with st.expander("📄 全診療科PDFレポート一括出力"):
+            try:
+                from reporting.pdf_exporter import add_batch_pdf_report_button
+            except ImportError as e:
+                st.info(f"PDF出力に必要なライブラリがありません: {e}")
+                return
+            
+            analysis_base_date = SessionManager.get_analysis_base_date() or latest_date
+            add_batch_pdf_report_button(df, target_dict, analysis_base_date, key_suffix="department_page")
+    
+    @staticmethod
+    def _render_department_selector(departments: List[str]) -> Optional[str]:
         """診療科選択UI"""
-        departments = sorted(df["実施診療科"].dropna().unique())
-        
         if not departments:
             st.warning("データに診療科情報がありません。")
             return None
@@ -117,13 +154,13 @@ class DepartmentPage:
                                         period_name: str, 
                                         start_date: pd.Timestamp, 
                                         end_date: pd.Timestamp,
-                                        dept_df: pd.DataFrame) -> None:
+                                        dept_kpi: Dict[str, Any]) -> None:
         """診療科特化期間サマリー情報を表示"""
         period_info = PeriodSelector.get_period_info(period_name, start_date, end_date)
         
         # 全身麻酔20分以上の件数
-        gas_cases = len(dept_df[dept_df['is_gas_20min']]) if 'is_gas_20min' in dept_df.columns else len(dept_df)
-        weekday_cases = len(dept_df[dept_df['is_weekday']]) if 'is_weekday' in dept_df.columns else gas_cases
+        gas_cases = dept_kpi['全身麻酔件数']
+        weekday_cases = dept_kpi['平日件数']
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -150,24 +187,18 @@ class DepartmentPage:
 
     @staticmethod
     @safe_data_operation("診療科KPI計算")
-    def _render_department_kpi(dept_df: pd.DataFrame, 
+    def _render_department_kpi(dept_kpi: Dict[str, Any],
+                            target_dict: Dict[str, Any],
                             start_date: Optional[pd.Timestamp],
                             end_date: Optional[pd.Timestamp],
                             dept_name: str) -> None:
-        """診療科別KPI表示"""
+        """診療科別KPI表示（dept_kpi: get_department_kpis の診療科の行）"""
         try:
             st.subheader(f"📊 {dept_name} 主要指標")
             
             # 基本統計
-            total_cases = len(dept_df)
-            gas_cases = len(dept_df[dept_df['is_gas_20min']]) if 'is_gas_20min' in dept_df.columns else total_cases
-            
-            # 期間中の週数を計算
-            if start_date and end_date:
-                weeks_in_period = (end_date - start_date).days / 7
-                weekly_avg = gas_cases / weeks_in_period if weeks_in_period > 0 else 0
-            else:
-                weekly_avg = 0
+            total_cases = dept_kpi['全手術件数']
+            gas_cases = dept_kpi['全身麻酔件数']
 
             col1, col2, col3 = st.columns(3)  # 4列から3列に変更
             
@@ -178,18 +209,14 @@ class DepartmentPage:
                 st.metric("🔴 全身麻酔20分以上", f"{gas_cases:,}件")
             
             with col3:
-                gas_ratio = (gas_cases / total_cases * 100) if total_cases > 0 else 0
-                st.metric("🎯 全身麻酔比率", f"{gas_ratio:.1f}%")
+                st.metric("🎯 全身麻酔比率", f"{dept_kpi['全身麻酔比率(%)']:.1f}%")
             
             # 目標との比較
-            target_dict = SessionManager.get_target_dict()
             target_value = target_dict.get(dept_name)
             
             if target_value and start_date and end_date:
-                # 期間中の週数を計算
-                weeks_in_period = (end_date - start_date).days / 7
-                weekly_avg = gas_cases / weeks_in_period if weeks_in_period > 0 else 0
-                achievement_rate = (weekly_avg / target_value * 100) if target_value > 0 else 0
+                weekly_avg = dept_kpi['週次実績']
+                achievement_rate = dept_kpi['達成率(%)']
                 
                 col1, col2, col3 = st.columns(3)
                 
@@ -200,7 +227,6 @@ class DepartmentPage:
                     st.metric("📈 週次実績", f"{weekly_avg:.1f}件/週")
                 
                 with col3:
-                    color = "🟢" if achievement_rate >= 100 else "🟡" if achievement_rate >= 80 else "🔴"
                     st.metric("📊 達成率", f"{achievement_rate:.1f}%", 
                             delta=f"{achievement_rate - 100:.1f}%" if achievement_rate != 100 else "目標達成")
                 
@@ -218,6 +244,29 @@ class DepartmentPage:
             st.error(f"KPI計算エラー: {e}")
             logger.error(f"診療科別KPI計算エラー ({dept_name}): {e}")
     
+    @staticmethod
+    @safe_data_operation("全診療科比較")
+    def _render_department_comparison(kpi_table: pd.DataFrame, selected_dept: str, period_name: str) -> None:
+        """全診療科のKPI比較表（選択中の診療科を強調）"""
+        with st.expander(f"🗂️ 全診療科比較 - {period_name}"):
+            if kpi_table.empty:
+                st.info("比較できる診療科データがありません")
+                return
+            
+            sort_column = '達成率(%)' if kpi_table['達成率(%)'].notna().any() else '全身麻酔件数'
+            table = kpi_table.sort_values(sort_column, ascending=False, na_position='last')
+            
+            def highlight(row: pd.Series):
+                style = 'background-color: rgba(31, 119, 180, 0.15); font-weight: bold' if row.name == selected_dept else ''
+                return [style] * len(row)
+            
+            styled = table.style.apply(highlight, axis=1).format({
+                '全身麻酔比率(%)': '{:.1f}', '週次実績': '{:.1f}', '週次目標': '{:.1f}',
+                '達成率(%)': '{:.1f}', 'トレンド変化(%)': '{:+.1f}',
+            }, na_rep='-')
+            st.dataframe(styled, use_container_width=True)
+            st.caption("トレンド変化: 直近4週と前4週の週合計件数の比較（8週以上のデータがある場合）")
+    
     @staticmethod
     @safe_data_operation("診療科別週次推移表示")
     def _render_department_trend(filtered_df: pd.DataFrame, 
@@ -237,8 +286,11 @@ class DepartmentPage:
                 key=f"complete_weeks_{dept_name}"
             )
             
-            summary = weekly.get_summary(
+            # 週次サマリー・トレンド指標は全診療科分を一度に計算してキャッシュし、この診療科の分を切り出す
+            analysis_base_date = SessionManager.get_analysis_base_date()
+            summary = trend_stats.get_weekly_summary(
                 filtered_df, 
+                analysis_base_date,
                 department=dept_name, 
                 use_complete_weeks=use_complete_weeks
             )
@@ -249,22 +301,27 @@ class DepartmentPage:
                 )
                 st.plotly_chart(fig, use_container_width=True)
                 
+                stats = trend_stats.get_trend_statistics(
+                    filtered_df, analysis_base_date, metric='週合計件数', use_complete_weeks=use_complete_weeks
+                ).loc[dept_name]
+                
                 # 統計情報
                 with st.expander("📊 統計サマリー"):
                     col1, col2 = st.columns(2)
                     
                     with col1:
                         st.write("**基本統計:**")
-                        st.write(f"• 分析週数: {len(summary)}週")
-                        st.write(f"• 最大値: {summary['週合計件数'].max():.0f}件/週")
-                        st.write(f"• 最小値: {summary['週合計件数'].min():.0f}件/週")
-                        st.write(f"• 平均値: {summary['週合計件数'].mean():.1f}件/週")
+                        st.write(f"• 分析週数: {stats['週数']}週")
+                        st.write(f"• 最大値: {stats['最大']:.0f}件/週")
+                        st.write(f"• 最小値: {stats['最小']:.0f}件/週")
+                        st.write(f"• 平均値: {stats['平均']:.1f}件/週")
+                        st.write(f"• 変動係数: {stats['変動係数']:.2f}")
                     
                     with col2:
                         st.write("**目標との比較:**")
                         target_value = target_dict.get(dept_name)
                         if target_value:
-                            avg_actual = summary['週合計件数'].mean()
+                            avg_actual = stats['平均']
                             achievement_rate = (avg_actual / target_value * 100)
                             st.write(f"• 目標値: {target_value:.1f}件/週")
                             st.write(f"• 平均達成率: {achievement_rate:.1f}%")
@@ -278,19 +335,20 @@ class DepartmentPage:
                             st.info("この診療科の目標値は設定されていません")
                 
                 # トレンド分析
-                if len(summary) >= 4:
-                    recent_4 = summary.tail(4)['週合計件数'].mean()
-                    if len(summary) >= 8:
-                        previous_4 = summary.iloc[-8:-4]['週合計件数'].mean()
-                        trend_change = ((recent_4 / previous_4 - 1) * 100) if previous_4 > 0 else 0
-                        
-                        st.markdown("**📈 トレンド分析**")
-                        if trend_change > 10:
-                            st.success(f"🔺 明確な上昇トレンド: {trend_change:+.1f}%")
-                        elif trend_change < -10:
-                            st.error(f"🔻 明確な下降トレンド: {trend_change:+.1f}%")
-                        else:
-                            st.info(f"➡️ 安定トレンド: {trend_change:+.1f}%")
+                if stats['週数'] >= 8:
+                    trend_change = stats['前4週比(%)']
+                    
+                    st.markdown("**📈 トレンド分析**")
+                    if trend_change > 10:
+                        st.success(f"🔺 明確な上昇トレンド: {trend_change:+.1f}%")
+                    elif trend_change < -10:
+                        st.error(f"🔻 明確な下降トレンド: {trend_change:+.1f}%")
+                    else:
+                        st.info(f"➡️ 安定トレンド: {trend_change:+.1f}%")
+                    st.caption(
+                        f"直近週 {stats['直近週']:.0f}件（前週差 {stats['前週差']:+.0f}件）・"
+                        f"次週予測 {stats['次週予測']:.1f}件/週（{stats['予測下限']:.1f} - {stats['予測上限']:.1f}）"
+                    )
             else:
                 st.warning(f"{dept_name}の選択期間（{period_name}）に週次データがありません")
                 
@@ -418,14 +476,14 @@ class DepartmentPage:
                 if len(gas_df) > 7:
                     daily_counts = gas_df.groupby('手術実施日_dt').size().reset_index(name='件数')
                     
-                    fig_daily = px.line(
+                    render_time_series_chart(
                         daily_counts, 
-                        x='手術実施日_dt', 
-                        y='件数',
+                        '手術実施日_dt', 
+                        '件数',
                         title=f"{dept_name} 日別推移 - {period_name}",
-                        labels={'手術実施日_dt': '日付', '件数': '手術件数'}
+                        labels={'手術実施日_dt': '日付', '件数': '手術件数'},
+                        key=f"dept_daily_{dept_name}"
                     )
-                    st.plotly_chart(fig_daily, use_container_width=True)
             else:
                 st.info("全身麻酔20分以上の手術データがありません")
                 
@@ -452,7 +510,7 @@ class DepartmentPage:
                         st.dataframe(desc_df.round(2), use_container_width=True)
                     
                     # カテゴリデータの統計
-                    categorical_columns = gas_df.select_dtypes(include=['object']).columns
+                    categorical_columns = gas_df.select_dtypes(include=['object', 'string']).columns
                     if len(categorical_columns) > 0:
                         st.write("**カテゴリデータ統計:**")
                         for col in categorical_columns[:5]:  # 上位5列のみ表示
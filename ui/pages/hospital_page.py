@@ -6,24 +6,23 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from typing import Dict, Any, Optional
+import importlib.util
 import logging
 
 from ui.session_manager import SessionManager
 from ui.error_handler import safe_streamlit_operation, safe_data_operation
 from ui.components.period_selector import PeriodSelector
+from ui.components.fragment import render_fragment
 
 # 既存の分析モジュールをインポート
-from analysis import weekly, ranking
+from analysis import ranking, trend_stats
 from plotting import trend_plots, generic_plots
+from config import style_config as sc
 
-# 追加の統計分析用ライブラリ（オプション）
-try:
-    from sklearn.linear_model import LinearRegression
-    import numpy as np
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+# 追加の統計分析用ライブラリ（オプション。読み込みが重いため有無だけ確認し、回帰分析の実行時に読み込む）
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +45,12 @@ class HospitalPage:
             st.warning("⚠️ データが読み込まれていません")
             return
         
+        # 期間選択以降はフラグメントにし、期間変更時はこの範囲だけを再実行する
+        render_fragment(HospitalPage._render_period_analysis, df, target_dict)
+    
+    @staticmethod
+    def _render_period_analysis(df: pd.DataFrame, target_dict: Dict[str, Any]) -> None:
+        """期間選択と選択期間の分析（フラグメントとして描画）"""
         # 期間選択セクション
         st.markdown("---")
         period_name, start_date, end_date = PeriodSelector.render(
@@ -127,8 +132,9 @@ class HospitalPage:
         st.subheader(f"📈 週次推移分析 - {period_name}")
         
         try:
-            # 完全週データ取得（フィルタ済みデータで）
-            summary = weekly.get_summary(filtered_df, use_complete_weeks=True)
+            # 完全週データ取得（フィルタ済みデータで。週次集計行列のキャッシュから切り出す）
+            analysis_base_date = SessionManager.get_analysis_base_date()
+            summary = trend_stats.get_weekly_summary(filtered_df, analysis_base_date, use_complete_weeks=True)
             
             if summary.empty:
                 st.warning("選択期間の週次推移データがありません。")
@@ -158,22 +164,16 @@ class HospitalPage:
                 st.markdown(f"**移動平均トレンド（4週移動平均）- {period_name}**")
                 if len(summary) >= 4:
                     try:
-                        summary_ma = summary.copy()
-                        summary_ma['4週移動平均'] = summary_ma['平日1日平均件数'].rolling(window=4).mean()
-                        
-                        # 移動平均チャートを既存関数で作成
+                        # 移動平均チャートを既存関数で作成（4週移動平均は集計行列で計算済み）
                         fig2 = trend_plots.create_weekly_summary_chart(
-                            summary_ma, f"移動平均トレンド（4週移動平均）- {period_name}", target_dict
+                            summary, f"移動平均トレンド（4週移動平均）- {period_name}", target_dict
                         )
                         st.plotly_chart(fig2, use_container_width=True)
                         
                         # 移動平均の数値テーブル
                         with st.expander("移動平均データ"):
-                            try:
-                                ma_display = summary_ma[['平日1日平均件数', '4週移動平均']].dropna().reset_index()
-                                st.dataframe(ma_display.round(1), use_container_width=True)
-                            except Exception as e:
-                                st.dataframe(summary_ma[['平日1日平均件数', '4週移動平均']].dropna().round(1))
+                            ma_display = summary[['週', '平日1日平均件数', '4週移動平均']].dropna()
+                            st.dataframe(ma_display.round(1), use_container_width=True)
                     except Exception as e:
                         st.error(f"移動平均計算エラー: {e}")
                         logger.error(f"移動平均計算エラー: {e}")
@@ -216,23 +216,23 @@ class HospitalPage:
             # 統計サマリー
             with st.expander("📊 統計サマリー"):
                 try:
+                    stats = trend_stats.get_trend_statistics(filtered_df, analysis_base_date).loc[trend_stats.HOSPITAL_TOTAL]
                     col1, col2, col3 = st.columns(3)
                     
                     with col1:
-                        st.metric("🗓️ 分析週数", f"{len(summary)}週")
-                        st.metric("📈 最大値", f"{summary['平日1日平均件数'].max():.1f}件/日")
+                        st.metric("🗓️ 分析週数", f"{stats['週数']}週")
+                        st.metric("📈 最大値", f"{stats['最大']:.1f}件/日")
                     
                     with col2:
-                        st.metric("📉 最小値", f"{summary['平日1日平均件数'].min():.1f}件/日") 
-                        st.metric("📊 平均値", f"{summary['平日1日平均件数'].mean():.1f}件/日")
+                        st.metric("📉 最小値", f"{stats['最小']:.1f}件/日") 
+                        st.metric("📊 平均値", f"{stats['平均']:.1f}件/日")
                     
                     with col3:
-                        if len(summary) >= 8:  # 十分なデータがある場合のみ
-                            recent_avg = summary.tail(4)['平日1日平均件数'].mean()
-                            earlier_avg = summary.head(4)['平日1日平均件数'].mean()
-                            trend_change = ((recent_avg/earlier_avg - 1)*100) if earlier_avg > 0 else 0
+                        if stats['週数'] >= 8:  # 十分なデータがある場合のみ
+                            earlier_avg = stats['前半4週平均']
+                            trend_change = ((stats['直近4週平均']/earlier_avg - 1)*100) if earlier_avg > 0 else 0
                             st.metric("📈 トレンド変化", f"{trend_change:+.1f}%")
-                        st.metric("🔄 標準偏差", f"{summary['平日1日平均件数'].std():.1f}")
+                        st.metric("🔄 標準偏差", f"{stats['標準偏差']:.1f}")
                 except Exception as e:
                     st.write("統計計算中にエラーが発生しました")
                     logger.error(f"統計サマリーエラー: {e}")
@@ -342,6 +342,8 @@ class HospitalPage:
             daily_counts = daily_counts.sort_values('手術実施日_dt')
             
             if len(daily_counts) >= 7:
+                from sklearn.linear_model import LinearRegression
+                
                 # 線形回帰でトレンド分析
                 X = np.arange(len(daily_counts)).reshape(-1, 1)
                 y = daily_counts['件数'].values
@@ -497,40 +499,43 @@ class HospitalPage:
                 st.warning("選択期間にトレンド分析可能なデータがありません。")
                 return
             
-            # 週次データでトレンド分析
-            summary = weekly.get_summary(filtered_df, use_complete_weeks=True)
+            # 週次データでトレンド分析（週次サマリー・トレンド指標は集計行列のキャッシュを共有）
+            analysis_base_date = SessionManager.get_analysis_base_date()
+            summary = trend_stats.get_weekly_summary(filtered_df, analysis_base_date, use_complete_weeks=True)
             
             if summary.empty:
                 st.warning("選択期間のトレンド分析用データがありません。")
                 return
             
+            stats = trend_stats.get_trend_statistics(filtered_df, analysis_base_date).loc[trend_stats.HOSPITAL_TOTAL]
+            
             tab1, tab2, tab3 = st.tabs(["📈 基本トレンド", "📊 季節性分析", "🔮 短期予測"])
             
             with tab1:
-                HospitalPage._render_basic_trend_analysis(summary)
+                HospitalPage._render_basic_trend_analysis(stats)
             
             with tab2:
                 HospitalPage._render_seasonality_analysis(summary, filtered_df)
             
             with tab3:
-                HospitalPage._render_short_term_prediction(summary)
+                HospitalPage._render_short_term_prediction(stats)
                 
         except Exception as e:
             st.error(f"トレンド分析エラー: {e}")
             logger.error(f"トレンド分析エラー: {e}")
     
     @staticmethod
-    def _render_basic_trend_analysis(summary: pd.DataFrame) -> None:
-        """基本トレンド分析"""
+    def _render_basic_trend_analysis(stats: pd.Series) -> None:
+        """基本トレンド分析（stats: trend_stats.get_trend_statistics の病院全体の行）"""
         st.markdown("**📈 基本トレンド指標**")
         
-        if len(summary) < 4:
+        if stats['週数'] < 4:
             st.info("基本トレンド分析には最低4週間のデータが必要です。")
             return
         
         # 最近4週 vs 前4週の比較
-        recent_4weeks = summary.tail(4)['平日1日平均件数'].mean()
-        previous_4weeks = summary.iloc[-8:-4]['平日1日平均件数'].mean() if len(summary) >= 8 else None
+        recent_4weeks = stats['直近4週平均']
+        previous_4weeks = stats['前4週平均']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -538,28 +543,23 @@ class HospitalPage:
             st.metric("📊 直近4週平均", f"{recent_4weeks:.1f}件/日")
         
         with col2:
-            if previous_4weeks:
+            if pd.notna(previous_4weeks) and previous_4weeks:
                 change = recent_4weeks - previous_4weeks
-                change_pct = (change / previous_4weeks * 100) if previous_4weeks > 0 else 0
                 st.metric("📈 前4週比較", f"{previous_4weeks:.1f}件/日", 
-                         delta=f"{change:+.1f} ({change_pct:+.1f}%)")
+                         delta=f"{change:+.1f} ({stats['前4週比(%)']:+.1f}%)")
             else:
                 st.metric("📈 前4週比較", "データ不足")
         
         with col3:
-            volatility = summary['平日1日平均件数'].std()
-            st.metric("📊 変動度", f"{volatility:.1f}")
+            st.metric("📊 変動度", f"{stats['標準偏差']:.1f}")
         
         with col4:
-            max_week = summary['平日1日平均件数'].max()
-            min_week = summary['平日1日平均件数'].min()
-            range_val = max_week - min_week
-            st.metric("📏 最大幅", f"{range_val:.1f}")
+            st.metric("📏 最大幅", f"{stats['最大幅']:.1f}")
         
         # トレンド方向
-        if len(summary) >= 6:
-            recent_trend = summary.tail(6)['平日1日平均件数'].mean()
-            earlier_trend = summary.head(6)['平日1日平均件数'].mean()
+        if stats['週数'] >= 6:
+            recent_trend = stats['直近6週平均']
+            earlier_trend = stats['前半6週平均']
             
             if recent_trend > earlier_trend * 1.05:
                 st.success("🔺 **明確な上昇トレンド** を検出")
@@ -574,51 +574,55 @@ class HospitalPage:
         st.markdown("**🗓️ 季節性・周期性分析**")
         
         try:
-            # 曜日別分析
-            if '手術実施日_dt' in df.columns:
-                df_copy = df.copy()
-                df_copy['曜日'] = df_copy['手術実施日_dt'].dt.day_name()
-                df_copy['曜日番号'] = df_copy['手術実施日_dt'].dt.dayofweek
-                
-                # 平日のみで曜日別件数
-                weekday_df = df_copy[df_copy['is_weekday'] == True]
-                
-                if not weekday_df.empty:
-                    dow_analysis = weekday_df.groupby(['曜日', '曜日番号']).size().reset_index(name='件数')
-                    dow_analysis = dow_analysis.sort_values('曜日番号')
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**曜日別傾向**")
-                        for _, row in dow_analysis.iterrows():
-                            st.write(f"• {row['曜日']}: {row['件数']}件")
-                    
-                    with col2:
-                        if len(dow_analysis) > 1:
-                            max_dow = dow_analysis.loc[dow_analysis['件数'].idxmax(), '曜日']
-                            min_dow = dow_analysis.loc[dow_analysis['件数'].idxmin(), '曜日']
-                            st.markdown("**パターン分析**")
-                            st.write(f"• 最多曜日: {max_dow}")
-                            st.write(f"• 最少曜日: {min_dow}")
-                            
-                            variance = dow_analysis['件数'].var()
-                            if variance > dow_analysis['件数'].mean() * 0.1:
-                                st.write("• 曜日による変動が大きい")
-                            else:
-                                st.write("• 曜日による変動は小さい")
-            
+            from analysis.seasonality import get_seasonality_profiles
+
+            profiles = get_seasonality_profiles(df)
+            dow_profile = profiles['weekday']
+
+            # 曜日別分析（平日1日平均と95%信頼区間）
+            if not dow_profile.empty:
+                col1, col2 = st.columns([2, 1])
+
+                with col1:
+                    import plotly.graph_objects as go
+                    fig = go.Figure(go.Bar(
+                        x=dow_profile.index.to_numpy(),
+                        y=dow_profile['1日平均'].to_numpy(),
+                        error_y=dict(
+                            type='data', symmetric=False,
+                            array=(dow_profile['CI上限'] - dow_profile['1日平均']).to_numpy(),
+                            arrayminus=(dow_profile['1日平均'] - dow_profile['CI下限']).to_numpy(),
+                        ),
+                        marker_color=sc.PRIMARY_COLOR,
+                        customdata=dow_profile[['合計件数', '日数']].to_numpy(),
+                        hovertemplate="%{x}: %{y:.1f}件/日（合計%{customdata[0]}件 / %{customdata[1]}日）<extra></extra>",
+                    ))
+                    fig.update_layout(title="曜日別傾向（平日1日平均・95%信頼区間）",
+                                      xaxis_title="曜日", yaxis_title="1日平均件数", **sc.LAYOUT_DEFAULTS)
+                    st.plotly_chart(fig, use_container_width=True)
+
+                with col2:
+                    if len(dow_profile) > 1:
+                        totals = dow_profile['合計件数']
+                        st.markdown("**パターン分析**")
+                        st.write(f"• 最多曜日: {totals.idxmax()}")
+                        st.write(f"• 最少曜日: {totals.idxmin()}")
+                        if totals.var() > totals.mean() * 0.1:
+                            st.write("• 曜日による変動が大きい")
+                        else:
+                            st.write("• 曜日による変動は小さい")
+
             # 月別傾向（データが複数月にわたる場合）
             if len(summary) >= 8:  # 約2ヶ月分
                 st.markdown("**📅 月次傾向分析**")
-                df_monthly = df.copy()
-                df_monthly['年月'] = df_monthly['手術実施日_dt'].dt.to_period('M')
-                monthly_counts = df_monthly.groupby('年月').size()
-                
-                if len(monthly_counts) >= 2:
-                    st.write("月別推移:")
-                    for period, count in monthly_counts.items():
-                        st.write(f"• {period}: {count}件")
+                monthly_totals = profiles['monthly_totals']
+
+                if len(monthly_totals) >= 2:
+                    st.dataframe(monthly_totals, hide_index=True, use_container_width=True)
+                    with st.expander("月別・年間週番号別プロファイル（平日1日平均）"):
+                        profile_format = {'1日平均': '{:.2f}', '標準偏差': '{:.2f}', 'CI下限': '{:.2f}', 'CI上限': '{:.2f}'}
+                        st.dataframe(profiles['month'].style.format(profile_format, na_rep='-'), use_container_width=True)
+                        st.dataframe(profiles['week_of_year'].style.format(profile_format, na_rep='-'), use_container_width=True)
                 else:
                     st.info("月次傾向分析には複数月のデータが必要です。")
             else:
@@ -629,28 +633,17 @@ class HospitalPage:
             st.warning("季節性分析でエラーが発生しました。")
     
     @staticmethod
-    def _render_short_term_prediction(summary: pd.DataFrame) -> None:
-        """短期予測"""
+    def _render_short_term_prediction(stats: pd.Series) -> None:
+        """短期予測（stats: trend_stats.get_trend_statistics の病院全体の行）"""
         st.markdown("**🔮 短期予測（次週・次月）**")
         
-        if len(summary) < 4:
+        if stats['週数'] < 4:
             st.info("予測には最低4週間のデータが必要です。")
             return
         
         try:
-            # 単純移動平均による予測
-            recent_4weeks_avg = summary.tail(4)['平日1日平均件数'].mean()
-            recent_2weeks_avg = summary.tail(2)['平日1日平均件数'].mean()
-            
-            # トレンド調整
-            if len(summary) >= 6:
-                trend_factor = recent_2weeks_avg / recent_4weeks_avg if recent_4weeks_avg > 0 else 1
-            else:
-                trend_factor = 1
-            
-            # 予測値計算
-            next_week_prediction = recent_4weeks_avg * trend_factor
-            confidence_range = summary['平日1日平均件数'].std() * 0.5
+            # 直近4週の移動平均を直近2週の傾向で補正した予測値
+            next_week_prediction = stats['次週予測']
             
             col1, col2, col3 = st.columns(3)
             
@@ -659,7 +652,7 @@ class HospitalPage:
             
             with col2:
                 st.metric("📊 予測範囲", 
-                         f"{next_week_prediction-confidence_range:.1f} - {next_week_prediction+confidence_range:.1f}")
+                         f"{stats['予測下限']:.1f} - {stats['予測上限']:.1f}")
             
             with col3:
                 # 目標との比較
@@ -669,19 +662,17 @@ class HospitalPage:
                 st.metric("🎯 予測達成率", f"{predicted_achievement:.1f}%")
             
             # 予測の信頼性
-            data_points = len(summary)
-            variability = summary['平日1日平均件数'].std() / summary['平日1日平均件数'].mean()
-            
             st.markdown("**📊 予測の信頼性**")
             
-            if data_points >= 8 and variability < 0.2:
+            reliability = stats['予測信頼性']
+            if reliability == '高':
                 st.success("🟢 高い信頼性: 十分なデータと安定した傾向")
-            elif data_points >= 6 and variability < 0.3:
+            elif reliability == '中':
                 st.warning("🟡 中程度の信頼性: データまたは安定性に課題")
             else:
                 st.error("🔴 低い信頼性: データ不足または高い変動性")
             
-            st.caption(f"💡 データ期間: {data_points}週, 変動係数: {variability:.2f}")
+            st.caption(f"💡 データ期間: {stats['週数']}週, 変動係数: {stats['変動係数']:.2f}")
             
         except Exception as e:
             logger.error(f"短期予測エラー: {e}")
@@ -14,6 +14,9 @@ import logging
 from ui.session_manager import SessionManager
 from ui.error_handler import safe_streamlit_operation, safe_data_operation
 from ui.components.period_selector import PeriodSelector
+from ui.components.fragment import render_fragment
+from ui.components.data_table import display_paginated_table
+from ui.components.timeseries_chart import render_time_series_chart
 
 # 既存の分析モジュールをインポート
 from analysis import surgeon, weekly, ranking
@@ -38,6 +41,12 @@ class SurgeonPage:
             st.warning("⚠️ データが読み込まれていません")
             return
         
+        # 期間選択以降はフラグメントにし、期間変更時はこの範囲だけを再実行する
+        render_fragment(SurgeonPage._render_period_analysis, df)
+    
+    @staticmethod
+    def _render_period_analysis(df: pd.DataFrame) -> None:
+        """期間選択と選択期間の術者分析（フラグメントとして描画）"""
         # 期間選択セクション
         st.markdown("---")
         period_name, start_date, end_date = PeriodSelector.render(
@@ -394,7 +403,7 @@ class SurgeonPage:
                 display_df = dept_surgeon_summary.copy()
                 display_df['順位'] = range(1, len(display_df) + 1)
                 columns = ['順位'] + [col for col in display_df.columns if col != '順位']
-                st.dataframe(display_df[columns], use_container_width=True)
+                display_paginated_table(display_df[columns], page_size=50, search_columns=['実施術者'])
             
             if len(dept_df) >= 10:
                 SurgeonPage._render_department_time_series(dept_df, dept_name, period_name)
@@ -411,12 +420,12 @@ class SurgeonPage:
             
             daily_counts = dept_df.groupby('手術実施日_dt').size().reset_index(name='件数')
             if len(daily_counts) >= 7:
-                fig = px.line(
-                    daily_counts, x='手術実施日_dt', y='件数',
+                render_time_series_chart(
+                    daily_counts, '手術実施日_dt', '件数',
                     title=f"{dept_name} 日別手術件数推移 - {period_name}",
-                    labels={'手術実施日_dt': '日付', '件数': '手術件数'}
+                    labels={'手術実施日_dt': '日付', '件数': '手術件数'},
+                    key=f"surgeon_dept_daily_{dept_name}"
                 )
-                st.plotly_chart(fig, use_container_width=True)
             
             surgeon_counts = dept_df['実施術者'].value_counts()
             main_surgeons = surgeon_counts.head(5).index
@@ -429,12 +438,13 @@ class SurgeonPage:
                 
                 if surgeon_daily_list:
                     all_surgeon_daily = pd.concat(surgeon_daily_list, ignore_index=True)
-                    fig = px.line(
-                        all_surgeon_daily, x='手術実施日_dt', y='件数', color='実施術者',
+                    render_time_series_chart(
+                        all_surgeon_daily, '手術実施日_dt', '件数',
                         title=f"{dept_name} 主要術者別推移 - {period_name}",
-                        labels={'手術実施日_dt': '日付', '件数': '手術件数'}
+                        labels={'手術実施日_dt': '日付', '件数': '手術件数'},
+                        key=f"surgeon_main_daily_{dept_name}",
+                        color_col='実施術者'
                     )
-                    st.plotly_chart(fig, use_container_width=True)
                     
         except Exception as e:
             logger.error(f"診療科時系列分析エラー: {e}", exc_info=True)
@@ -11,6 +11,8 @@ from typing import Optional, Dict, Any, Tuple
 import logging
 
 from data_persistence import auto_load_data
+from data_processing.dataset_version import assign_version, derive_version, get_version_info
+from utils import date_helpers
 
 logger = logging.getLogger(__name__)
 
@@ -109,11 +111,19 @@ class SessionManager:
     
     @staticmethod
     def set_processed_df(df: pd.DataFrame) -> None:
+        # 取り込み・読み込み時に割り当て済みでなければここでデータセットバージョンを割り当てる
+        if not df.empty and get_version_info(df) is None:
+            assign_version(df, source=SessionManager.get_data_source())
         st.session_state[SessionManager.SESSION_KEYS['processed_df']] = df
         if not df.empty and '手術実施日_dt' in df.columns:
             st.session_state[SessionManager.SESSION_KEYS['latest_date']] = df['手術実施日_dt'].max()
         SessionManager.clear_period_cache()
 
+    @staticmethod
+    def get_dataset_version() -> Optional[Dict[str, Any]]:
+        """現在のデータのデータセットバージョン（version / fingerprint）"""
+        return get_version_info(SessionManager.get_processed_df())
+
     @staticmethod
     def get_target_dict() -> Dict[str, Any]:
         return st.session_state.get(SessionManager.SESSION_KEYS['target_dict'], {})
@@ -175,13 +185,17 @@ class SessionManager:
                          start_date: Optional[pd.Timestamp], 
                          end_date: Optional[pd.Timestamp]) -> pd.DataFrame:
         try:
-            cache_key = f"{page_name}_{start_date}_{end_date}"
+            df = SessionManager.get_processed_df()
+            version_info = get_version_info(df)
+            # データセットバージョンをキーに含め、データが差し替わった後の古いキャッシュは使わない
+            version = version_info['version'] if version_info else None
+            cache_key = f"{page_name}_{start_date}_{end_date}_v{version}"
             period_cache = st.session_state.get(SessionManager.SESSION_KEYS['period_cache'], {})
             
             if cache_key in period_cache:
                 return period_cache[cache_key]
             
-            df = SessionManager.get_processed_df()
+            period_cache = {key: value for key, value in period_cache.items() if key.endswith(f"_v{version}")}
             
             if df.empty or start_date is None or end_date is None:
                 filtered_df = df
@@ -190,6 +204,7 @@ class SessionManager:
                     (df['手術実施日_dt'] >= start_date) & 
                     (df['手術実施日_dt'] <= end_date)
                 ]
+                derive_version(filtered_df, df, 'period', start_date, end_date)
             
             period_cache[cache_key] = filtered_df
             st.session_state[SessionManager.SESSION_KEYS['period_cache']] = period_cache
@@ -245,8 +260,7 @@ class SessionManager:
             weekday_cases = len(filtered_df[filtered_df['is_weekday']]) if 'is_weekday' in filtered_df.columns else total_cases
             
             period_days = (end_date - start_date).days + 1
-            weekdays = sum(1 for i in range(period_days) 
-                          if (start_date + pd.Timedelta(days=i)).weekday() < 5)
+            weekdays = date_helpers.count_weekdays(start_date, end_date)
             
             daily_avg = weekday_cases / weekdays if weekdays > 0 else 0.0
             
@@ -284,6 +298,7 @@ class SessionManager:
             'has_target': bool(target_dict),
             'latest_date': latest_date.strftime('%Y/%m/%d') if latest_date else None,
             'data_source': data_source,
+            'dataset_version': (SessionManager.get_dataset_version() or {}).get('version'),
             'columns': list(df.columns) if df is not None and not df.empty else []
         }
 
@@ -0,0 +1,281 @@
+# utils/business_calendar.py
+"""
+病院の営業日カレンダー
+- 祝日（jpholiday、未インストール時は内蔵の祝日表）と病院の休診日（config/hospital_calendar.json）を
+  「日番号（1970-01-01 からの日数） - 初日」で引けるNumPyのbool配列に一度だけ展開する
+- 平日（営業日）・祝日・休診日の判定は配列の参照だけで行い、行ごとに判定関数を呼ばない
+- 対象範囲外の日付が来た場合は範囲を広げて作り直す
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import jpholiday
+    JPHOLIDAY_AVAILABLE = True
+except ImportError:
+    JPHOLIDAY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'config', 'hospital_calendar.json')
+DEFAULT_CONFIG = {
+    'recurring_closures': [{'name': '年末年始', 'start': '12-29', 'end': '01-03'}],
+    'closures': [],
+    'calendar_range': {'start_year': 2015, 'end_year': 2035},
+}
+EPOCH = date(1970, 1, 1)
+
+
+def _day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def _nth_monday(year: int, month: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(7 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def builtin_holidays(year: int) -> List[date]:
+    """
+    内蔵の祝日表（jpholiday を使わない。2000年以降の祝日法に基づく。振替休日・国民の休日を含む）
+    """
+    equinox_base = 0.242194 * (year - 1980) - int((year - 1980) / 4)
+    holidays = {
+        date(year, 1, 1),                                   # 元日
+        _nth_monday(year, 1, 2),                            # 成人の日
+        date(year, 2, 11),                                  # 建国記念の日
+        date(year, 3, int(20.8431 + equinox_base)),         # 春分の日
+        date(year, 4, 29),                                  # 昭和の日（2006年まではみどりの日）
+        date(year, 5, 3),                                   # 憲法記念日
+        date(year, 5, 5),                                   # こどもの日
+        date(year, 9, int(23.2488 + equinox_base)),         # 秋分の日
+        date(year, 11, 3),                                  # 文化の日
+        date(year, 11, 23),                                 # 勤労感謝の日
+    }
+    if year >= 2007:
+        holidays.add(date(year, 5, 4))                      # みどりの日
+    if year <= 2018:
+        holidays.add(date(year, 12, 23))                    # 天皇誕生日（平成）
+    elif year >= 2020:
+        holidays.add(date(year, 2, 23))                     # 天皇誕生日（令和）
+    if year == 2019:
+        holidays.update({date(2019, 5, 1), date(2019, 10, 22)})  # 即位の日・即位礼正殿の儀
+
+    # 海の日・山の日・スポーツの日（東京五輪の2020・2021年は特例日）
+    special = {2020: (date(2020, 7, 23), date(2020, 8, 10), date(2020, 7, 24)),
+               2021: (date(2021, 7, 22), date(2021, 8, 8), date(2021, 7, 23))}
+    if year in special:
+        holidays.update(special[year])
+    else:
+        holidays.add(date(year, 7, 20) if year <= 2002 else _nth_monday(year, 7, 3))  # 海の日
+        if year >= 2016:
+            holidays.add(date(year, 8, 11))                 # 山の日
+        holidays.add(_nth_monday(year, 10, 2))              # 体育の日・スポーツの日
+    holidays.add(date(year, 9, 15) if year <= 2002 else _nth_monday(year, 9, 3))  # 敬老の日
+
+    # 国民の休日（祝日に挟まれた平日）
+    for day in sorted(holidays):
+        between = day + timedelta(days=1)
+        if between not in holidays and between + timedelta(days=1) in holidays and between.weekday() != 6:
+            holidays.add(between)
+
+    # 振替休日（日曜の祝日の後の最初の祝日でない日）
+    for day in sorted(holidays):
+        if day.weekday() == 6:
+            substitute = day + timedelta(days=1)
+            while substitute in holidays:
+                substitute += timedelta(days=1)
+            holidays.add(substitute)
+
+    return sorted(d for d in holidays if d.year == year)
+
+
+def _national_holidays(start: date, end: date) -> List[date]:
+    if JPHOLIDAY_AVAILABLE:
+        try:
+            return [day for day, _name in jpholiday.between(start, end)]
+        except Exception as e:
+            logger.warning(f"jpholiday での祝日取得に失敗したため内蔵の祝日表を使用します: {e}")
+    return [day for year in range(start.year, end.year + 1) for day in builtin_holidays(year)]
+
+
+def _closure_days(config: Dict[str, Any], start_year: int, end_year: int) -> List[date]:
+    """休診日設定（毎年の休診期間 + 特定日）を日付のリストに展開"""
+    days = []
+    for entry in config.get('recurring_closures', []):
+        try:
+            start_month, start_day = (int(part) for part in entry['start'].split('-'))
+            end_month, end_day = (int(part) for part in entry.get('end', entry['start']).split('-'))
+        except (KeyError, ValueError, AttributeError) as e:
+            logger.warning(f"休診期間の設定を読み込めません: {entry} ({e})")
+            continue
+        # 前年から年をまたぐ期間も含めるため、1年前から展開する
+        for year in range(start_year - 1, end_year + 1):
+            try:
+                first = date(year, start_month, start_day)
+                last = date(year + ((end_month, end_day) < (start_month, start_day)), end_month, end_day)
+            except ValueError:
+                continue  # 2月29日など、その年に存在しない日付
+            days.extend(first + timedelta(days=offset) for offset in range((last - first).days + 1))
+
+    for value in config.get('closures', []):
+        try:
+            days.append(pd.Timestamp(value).date())
+        except (ValueError, TypeError) as e:
+            logger.warning(f"休診日の設定を読み込めません: {value} ({e})")
+    return days
+
+
+def load_calendar_config(path: str = CALENDAR_CONFIG_FILE) -> Dict[str, Any]:
+    """休診日設定ファイルを読み込む（読み込めない場合は年末年始のみの既定値）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return {**DEFAULT_CONFIG, **config}
+    except FileNotFoundError:
+        logger.info(f"休診日設定ファイルがないため既定値を使用します: {path}")
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"休診日設定ファイルの読み込みに失敗したため既定値を使用します: {e}")
+    return dict(DEFAULT_CONFIG)
+
+
+class BusinessCalendar:
+    """日番号で引く祝日・休診日・営業日（平日）のbool配列"""
+
+    def __init__(self, start_year: int, end_year: int, config: Optional[Dict[str, Any]] = None):
+        config = config if config is not None else DEFAULT_CONFIG
+        self.start_year, self.end_year = start_year, end_year
+        self.first_day = _day_number(date(start_year, 1, 1))
+        self.last_day = _day_number(date(end_year, 12, 31))
+        size = self.last_day - self.first_day + 1
+
+        weekday = (np.arange(self.first_day, self.last_day + 1) + 3) % 7  # 1970-01-01 は木曜（月曜 = 0）
+        self.holiday = self._mask(_national_holidays(date(start_year, 1, 1), date(end_year, 12, 31)), size)
+        self.closed = self._mask(_closure_days(config, start_year, end_year), size)
+        self.business = (weekday < 5) & ~self.holiday & ~self.closed
+        self._business_cumsum = np.concatenate([[0], np.cumsum(self.business)])
+        logger.info(
+            f"営業日カレンダー作成: {start_year}-{end_year}年 / 祝日{int(self.holiday.sum())}日 / "
+            f"休診日{int(self.closed.sum())}日（祝日: {'jpholiday' if JPHOLIDAY_AVAILABLE else '内蔵の祝日表'}）"
+        )
+
+    def _mask(self, days: Iterable[date], size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        positions = np.array([_day_number(day) for day in days], dtype=np.int64) - self.first_day
+        mask[positions[(positions >= 0) & (positions < size)]] = True
+        return mask
+
+    def covers(self, first_day: int, last_day: int) -> bool:
+        return self.first_day <= first_day and last_day <= self.last_day
+
+    def lookup(self, table: np.ndarray, day_numbers: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """日番号の配列に対する table の値（無効な日付は False）"""
+        result = np.zeros(len(day_numbers), dtype=bool)
+        result[valid] = table[day_numbers[valid] - self.first_day]
+        return result
+
+    def count_business_days(self, first_day: int, last_day: int) -> int:
+        """[first_day, last_day] の営業日数（日番号で指定）"""
+        if last_day < first_day:
+            return 0
+        return int(self._business_cumsum[last_day - self.first_day + 1] - self._business_cumsum[first_day - self.first_day])
+
+
+_calendar: Optional[BusinessCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar(first_day: Optional[int] = None, last_day: Optional[int] = None) -> BusinessCalendar:
+    """共有カレンダー（指定した日番号の範囲を含まなければ範囲を広げて作り直す）"""
+    global _calendar
+    with _calendar_lock:
+        calendar = _calendar
+        if calendar is not None and (first_day is None or calendar.covers(first_day, last_day)):
+            return calendar
+
+        config = load_calendar_config()
+        calendar_range = config.get('calendar_range', {})
+        start_year = int(calendar_range.get('start_year', DEFAULT_CONFIG['calendar_range']['start_year']))
+        end_year = int(calendar_range.get('end_year', DEFAULT_CONFIG['calendar_range']['end_year']))
+        if calendar is not None:
+            start_year, end_year = min(start_year, calendar.start_year), max(end_year, calendar.end_year)
+        if first_day is not None:
+            start_year = min(start_year, (EPOCH + timedelta(days=int(first_day))).year)
+            end_year = max(end_year, (EPOCH + timedelta(days=int(last_day))).year)
+
+        _calendar = BusinessCalendar(start_year, end_year, config)
+        return _calendar
+
+
+def reload_calendar() -> BusinessCalendar:
+    """休診日設定ファイルを読み直してカレンダーを作り直す"""
+    global _calendar
+    with _calendar_lock:
+        _calendar = None
+    return get_calendar()
+
+
+def _as_day_numbers(dates: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """日付の配列（Series・DatetimeIndex・ndarray・リスト）を日番号と有効フラグに変換"""
+    values = np.asarray(pd.to_datetime(dates, errors='coerce'), dtype='datetime64[D]')
+    values = np.atleast_1d(values)
+    valid = ~np.isnat(values)
+    return values.astype(np.int64), valid
+
+
+def _masked(attribute: str, dates: Any) -> np.ndarray:
+    day_numbers, valid = _as_day_numbers(dates)
+    if not valid.any():
+        return np.zeros(len(day_numbers), dtype=bool)
+    calendar = get_calendar(int(day_numbers[valid].min()), int(day_numbers[valid].max()))
+    return calendar.lookup(getattr(calendar, attribute), day_numbers, valid)
+
+
+def business_day_mask(dates: Any) -> np.ndarray:
+    """営業日（土日・祝日・休診日以外）かどうかの配列"""
+    return _masked('business', dates)
+
+
+def holiday_mask(dates: Any) -> np.ndarray:
+    """祝日（振替休日・国民の休日を含む）かどうかの配列"""
+    return _masked('holiday', dates)
+
+
+def closure_mask(dates: Any) -> np.ndarray:
+    """病院の休診日かどうかの配列"""
+    return _masked('closed', dates)
+
+
+def _day_flag(attribute: str, day: date) -> bool:
+    day_number = _day_number(day)
+    calendar = get_calendar(day_number, day_number)
+    return bool(getattr(calendar, attribute)[day_number - calendar.first_day])
+
+
+def is_business_day(day: date) -> bool:
+    """1日分の営業日判定"""
+    return _day_flag('business', day)
+
+
+def is_holiday(day: date) -> bool:
+    """1日分の祝日判定"""
+    return _day_flag('holiday', day)
+
+
+def count_business_days(start: Any, end: Any) -> int:
+    """期間 [start, end] の営業日数"""
+    if start is None or end is None or pd.isna(start) or pd.isna(end):
+        return 0
+    first_day = _day_number(pd.Timestamp(start).date())
+    last_day = _day_number(pd.Timestamp(end).date())
+    if last_day < first_day:
+        return 0
+    return get_calendar(first_day, last_day).count_business_days(first_day, last_day)
@@ -3,17 +3,28 @@ import pandas as pd
 from datetime import datetime, date
 import warnings
 
-# jpholidayのインポートを安全に行う
-try:
-    import jpholiday
-    JPHOLIDAY_AVAILABLE = True
-except ImportError:
-    JPHOLIDAY_AVAILABLE = False
-    warnings.warn("jpholiday が利用できません。平日判定は土日のみで行います。", UserWarning)
+from utils import business_calendar
+from utils.business_calendar import JPHOLIDAY_AVAILABLE
+
+if not JPHOLIDAY_AVAILABLE:
+    warnings.warn("jpholiday が利用できません。祝日判定は内蔵の祝日表で行います。", UserWarning)
+
+def _to_date(date_input):
+    """datetime / date / str を date に変換（変換できない場合は None）"""
+    if isinstance(date_input, str):
+        return pd.to_datetime(date_input).date()
+    elif isinstance(date_input, datetime):
+        return date_input.date()
+    elif isinstance(date_input, date):
+        return date_input
+    try:
+        return pd.to_datetime(date_input).date()
+    except:
+        return None
 
 def is_weekday(date_input):
     """
-    平日かどうかを判定する（祝日を考慮）
+    平日かどうかを判定する（祝日・病院の休診日を考慮）
     
     Args:
         date_input: datetime, date, or str
@@ -21,28 +32,10 @@ def is_weekday(date_input):
     Returns:
         bool: 平日の場合True
     """
-    if isinstance(date_input, str):
-        date_obj = pd.to_datetime(date_input).date()
-    elif isinstance(date_input, datetime):
-        date_obj = date_input.date()
-    elif isinstance(date_input, date):
-        date_obj = date_input
-    else:
-        try:
-            date_obj = pd.to_datetime(date_input).date()
-        except:
-            return False
-    
-    # 土日の場合は平日ではない
-    if date_obj.weekday() >= 5:  # 5=土曜, 6=日曜
+    date_obj = _to_date(date_input)
+    if date_obj is None or pd.isna(date_obj):
         return False
-    
-    # jpholidayが利用可能な場合は祝日もチェック
-    if JPHOLIDAY_AVAILABLE:
-        return not jpholiday.is_holiday(date_obj)
-    else:
-        # jpholidayが利用できない場合は土日のみで判定
-        return True
+    return business_calendar.is_business_day(date_obj)
 
 def is_holiday(date_input):
     """
@@ -54,64 +47,59 @@ def is_holiday(date_input):
     Returns:
         bool: 祝日の場合True
     """
-    if isinstance(date_input, str):
-        date_obj = pd.to_datetime(date_input).date()
-    elif isinstance(date_input, datetime):
-        date_obj = date_input.date()
-    elif isinstance(date_input, date):
-        date_obj = date_input
-    else:
-        try:
-            date_obj = pd.to_datetime(date_input).date()
-        except:
-            return False
-    
-    if JPHOLIDAY_AVAILABLE:
-        return jpholiday.is_holiday(date_obj)
-    else:
-        # jpholidayが利用できない場合は主要な祝日のみ手動で定義
-        return is_major_holiday(date_obj)
+    date_obj = _to_date(date_input)
+    if date_obj is None or pd.isna(date_obj):
+        return False
+    return business_calendar.is_holiday(date_obj)
 
 def is_major_holiday(date_obj):
     """
-    主要な祝日を手動で判定（jpholidayのフォールバック）
+    内蔵の祝日表で祝日かどうかを判定（jpholidayのフォールバック）
     
     Args:
         date_obj: date object
         
     Returns:
-        bool: 主要祝日の場合True
+        bool: 祝日の場合True
     """
-    month = date_obj.month
-    day = date_obj.day
-    year = date_obj.year
-    
-    # 固定祝日
-    fixed_holidays = [
-        (1, 1),   # 元旦
-        (2, 11),  # 建国記念の日
-        (4, 29),  # 昭和の日
-        (5, 3),   # 憲法記念日
-        (5, 4),   # みどりの日
-        (5, 5),   # こどもの日
-        (8, 11),  # 山の日
-        (11, 3),  # 文化の日
-        (11, 23), # 勤労感謝の日
-        (12, 23), # 天皇誕生日（2019年以降）
-    ]
-    
-    if (month, day) in fixed_holidays:
-        return True
+    return date_obj in business_calendar.builtin_holidays(date_obj.year)
+
+def weekday_mask(dates):
+    """
+    平日（土日・祝日・休診日以外）かどうかを配列で判定する（カレンダー配列の参照のみ）
     
-    # 年末年始
-    if (month == 12 and day >= 29) or (month == 1 and day <= 3):
-        return True
+    Args:
+        dates: Series, DatetimeIndex, ndarray, or list
+        
+    Returns:
+        np.ndarray: 平日の場合True（日付が欠損の場合False）
+    """
+    return business_calendar.business_day_mask(dates)
+
+def holiday_mask(dates):
+    """
+    祝日かどうかを配列で判定する（カレンダー配列の参照のみ）
     
-    # ゴールデンウィーク期間の追加考慮
-    if month == 5 and 1 <= day <= 5:
-        return True
+    Args:
+        dates: Series, DatetimeIndex, ndarray, or list
+        
+    Returns:
+        np.ndarray: 祝日の場合True
+    """
+    return business_calendar.holiday_mask(dates)
+
+def count_weekdays(start_date, end_date):
+    """
+    期間内（両端を含む）の平日数を数える
     
-    return False
+    Args:
+        start_date: 開始日
+        end_date: 終了日
+        
+    Returns:
+        int: 平日数
+    """
+    return business_calendar.count_business_days(start_date, end_date)
 
 def get_fiscal_year(date_input):
     """
@@ -202,8 +190,8 @@ def add_date_features(df, date_col='手術実施日_dt'):
     df['quarter'] = df[date_col].dt.quarter
     
     # 平日・休日判定
-    df['is_weekday'] = df[date_col].apply(is_weekday)
-    df['is_holiday'] = df[date_col].apply(is_holiday)
+    df['is_weekday'] = weekday_mask(df[date_col])
+    df['is_holiday'] = holiday_mask(df[date_col])
     
     # 週の開始日（月曜日）
     df['week_start'] = df[date_col].dt.to_period('W-MON').dt.start_time
@@ -253,5 +241,5 @@ def format_date_range(start_date, end_date):
 
 # モジュール読み込み時に状態を報告
 if not JPHOLIDAY_AVAILABLE:
-    print("⚠️ jpholiday が利用できません。祝日判定は主要祝日のみで行います。")
+    print("⚠️ jpholiday が利用できません。祝日判定は内蔵の祝日表で行います。")
     print("完全な祝日対応には 'pip install jpholiday' を実行してください。")
\ No newline at end of file
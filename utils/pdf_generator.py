@@ -7,13 +7,14 @@ PDF レポート生成モジュール
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.io as pio
 from typing import Dict, Any, Optional, List
 import logging
 from datetime import datetime
 import base64
 from io import BytesIO
 
+from reporting.chart_renderer import get_chart_rasterizer
+
 # PDF生成ライブラリ
 try:
     from reportlab.lib import colors
@@ -310,25 +311,24 @@ class PDFReportGenerator:
         # セクションタイトル
         story.append(Paragraph("📊 グラフ・チャート", self.styles['CustomHeading']))
         
-        for chart_name, fig in charts.items():
-            try:
-                # Plotlyグラフを画像に変換
-                img_bytes = pio.to_image(fig, format="png", width=800, height=400)
-                img_buffer = BytesIO(img_bytes)
-                
-                # レポートラブImage作成
-                img = Image(img_buffer, width=6*inch, height=3*inch)
-                story.append(img)
-                
-                # キャプション
-                caption = Paragraph(f"図: {chart_name}", self.styles['CustomNormal'])
-                story.append(caption)
-                story.append(Spacer(1, 0.2*inch))
-                
-            except Exception as e:
-                logger.error(f"グラフ変換エラー ({chart_name}): {e}")
+        # Plotlyグラフをまとめて画像に変換（並列 + キャッシュ）
+        images = get_chart_rasterizer().to_images(charts, width=800, height=400)
+        
+        for chart_name in charts:
+            img_bytes = images.get(chart_name)
+            if img_bytes is None:
                 error_text = Paragraph(f"グラフ '{chart_name}' の生成でエラーが発生しました", self.styles['CustomNormal'])
                 story.append(error_text)
+                continue
+            
+            # レポートラブImage作成
+            img = Image(BytesIO(img_bytes), width=6*inch, height=3*inch)
+            story.append(img)
+            
+            # キャプション
+            caption = Paragraph(f"図: {chart_name}", self.styles['CustomNormal'])
+            story.append(caption)
+            story.append(Spacer(1, 0.2*inch))
         
         return story
     